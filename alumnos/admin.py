@@ -1,11 +1,105 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+import json
+import tempfile
+
 from django.contrib import admin
-from .models import Alumno, Materia, Calificacion
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.admin.options import get_content_type_for_model
+from django.core.exceptions import ValidationError
+from django.db import router, transaction
+from django.db.models import F, FloatField
+from django.forms import BaseModelFormSet, ModelChoiceField
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.db.models.functions import Cast, Coalesce, NullIf
+from .catalogo import invalidar_catalogo
+from .exportacion import csv_por_partes, escribir_xlsx, filas_calificaciones
+from .importacion import CAMPOS_CALCULADOS, CAMPOS_CALIFICACION
+from .models import Alumno, Materia, MateriaPlan, Calificacion
+from .resumen import recalcular_resumenes
+
+
+def _promedio_parciales(*parciales):
+    """Expresión SQL para ordenar: promedio conjunto de los parciales indicados (desde el resumen)"""
+    suma = sum(Coalesce(Cast(F(f'resumen__suma_{p}'), FloatField()), 0.0) for p in parciales)
+    cantidad = sum(Coalesce(F(f'resumen__n_{p}'), 0) for p in parciales)
+    return suma / Cast(NullIf(cantidad, 0), FloatField())
+
+class _IdPrecargado(ModelChoiceField):
+    """Campo oculto 'id' del formset de list_editable que busca el objeto entre los ya leídos
+       (ModelChoiceField haría un SELECT por fila)"""
+
+    def __init__(self, objetos, *args, **kwargs):
+        self.objetos = objetos
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        try:
+            return self.objetos[self.queryset.model._meta.pk.to_python(value)]
+        except (KeyError, ValueError, TypeError, ValidationError):
+            return super().to_python(value)
+
+
+class FormsetPrecargado(BaseModelFormSet):
+    """Formset de list_editable que valida todas las filas con una sola consulta"""
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        nombre = self.model._meta.pk.name
+        campo = form.fields[nombre]
+        if not hasattr(self, '_por_pk'):
+            self._por_pk = {obj.pk: obj for obj in self.get_queryset()}
+        form.fields[nombre] = _IdPrecargado(
+            self._por_pk, campo.queryset, widget=campo.widget, required=campo.required,
+        )
 
 @admin.register(Materia)
 class MateriaAdmin(admin.ModelAdmin):
-    list_display = ['codigo', 'nombre']
+    list_display = ['codigo', 'nombre', 'cuenta_promedio', 'muestra_acreditada']
+    list_filter = ['cuenta_promedio', 'muestra_acreditada']
     search_fields = ['codigo', 'nombre']
     ordering = ['codigo']
+    # Política de la materia: al guardarla se recalculan los promedios de quienes la llevan
+    list_editable = ['cuenta_promedio', 'muestra_acreditada']
+
+    def changelist_view(self, request, extra_context=None):
+        # Guardado de list_editable: cada Materia.save con banderas cambiadas recalcularía a sus
+        # alumnos; se juntan los de todas las filas y se recalculan una sola vez al final
+        if request.method != 'POST' or '_save' not in request.POST:
+            return super().changelist_view(request, extra_context)
+        request.alumnos_afectados = set()
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            respuesta = super().changelist_view(request, extra_context)
+            if request.alumnos_afectados:
+                recalcular_resumenes(request.alumnos_afectados)
+        return respuesta
+
+    def save_model(self, request, obj, form, change):
+        afectados = getattr(request, 'alumnos_afectados', None)
+        if afectados is None:
+            return super().save_model(request, obj, form, change)
+        obj.save(alumnos_afectados=afectados)
+
+    def delete_queryset(self, request, queryset):
+        # El borrado masivo no pasa por Materia.delete: catálogo y resúmenes de quienes las llevaban
+        alumno_ids = list(
+            Calificacion.objects.filter(materia__in=queryset).values_list('alumno_id', flat=True).distinct()
+        )
+        super().delete_queryset(request, queryset)
+        invalidar_catalogo()
+        recalcular_resumenes(alumno_ids)
+
+@admin.register(MateriaPlan)
+class MateriaPlanAdmin(admin.ModelAdmin):
+    list_display = ['semestre', 'carrera', 'orden', 'codigo', 'nombre']
+    list_filter = ['semestre', 'carrera']
+    search_fields = ['codigo', 'nombre']
+    list_editable = ['orden', 'nombre']
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        invalidar_catalogo()
 
 @admin.register(Alumno)
 class AlumnoAdmin(admin.ModelAdmin):
@@ -19,8 +113,10 @@ class AlumnoAdmin(admin.ModelAdmin):
         'prom_2do_parcial_general_display',
         'prom_3er_parcial_general_display',
         'prom_final_general_display',
+        'materias_reprobadas_display',
         'activo'
     ]
+    list_select_related = ['resumen']
     
     list_filter = ['semestre', 'grupo', 'sexo', 'activo', 'carrera']
     search_fields = ['matricula', 'primer_nombre', 'primer_apellido', 'segundo_apellido']
@@ -30,34 +126,62 @@ class AlumnoAdmin(admin.ModelAdmin):
     # Solo el campo 'activo' es editable en la lista
     list_editable = ['activo']
     
+    def get_queryset(self, request):
+        """Los promedios salen de ResumenAlumno (list_select_related), calculado con la
+           misma política de materias que la página del alumno; aquí solo se anotan
+           las expresiones para ordenar las columnas"""
+        qs = super().get_queryset(request)
+        return qs.annotate(
+            _orden_1er=_promedio_parciales('p1'),
+            _orden_2do=_promedio_parciales('p1', 'p2'),
+            _orden_3er=_promedio_parciales('p1', 'p2', 'p3'),
+            _orden_final=F('resumen__promedio_final'),
+        )
+    
+    def _promedio_parcial(self, obj, *parciales):
+        """Promedio conjunto de parciales a partir de las sumas del resumen.
+           Se calcula en Decimal (las sumas son exactas en décimas) para que los
+           empates .x5 siempre suban en lugar de depender del error de float"""
+        resumen = getattr(obj, 'resumen', None)
+        if resumen is None:
+            return "-"
+        suma = sum((getattr(resumen, f'suma_{p}') for p in parciales), Decimal('0'))
+        cantidad = sum(getattr(resumen, f'n_{p}') for p in parciales)
+        if cantidad == 0:
+            return "-"
+        return f"{(suma / cantidad).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP)}"
+    
     # Métodos para mostrar promedios en la lista
     def prom_1er_parcial_general_display(self, obj):
-        promedio = obj.prom_1er_parcial_general
-        if promedio is not None:
-            return f"{promedio:.1f}"
-        return "-"
+        return self._promedio_parcial(obj, 'p1')
     prom_1er_parcial_general_display.short_description = "1er Parcial"
+    prom_1er_parcial_general_display.admin_order_field = '_orden_1er'
     
     def prom_2do_parcial_general_display(self, obj):
-        promedio = obj.prom_2do_parcial_general
-        if promedio is not None:
-            return f"{promedio:.1f}"
-        return "-"
+        return self._promedio_parcial(obj, 'p1', 'p2')
     prom_2do_parcial_general_display.short_description = "2do Parcial"
+    prom_2do_parcial_general_display.admin_order_field = '_orden_2do'
     
     def prom_3er_parcial_general_display(self, obj):
-        promedio = obj.prom_3er_parcial_general
-        if promedio is not None:
-            return f"{promedio:.1f}"
-        return "-"
+        return self._promedio_parcial(obj, 'p1', 'p2', 'p3')
     prom_3er_parcial_general_display.short_description = "3er Parcial"
+    prom_3er_parcial_general_display.admin_order_field = '_orden_3er'
     
     def prom_final_general_display(self, obj):
-        promedio = obj.prom_final_general
-        if promedio is not None:
-            return f"{promedio:.1f}"
-        return "-"
+        resumen = getattr(obj, 'resumen', None)
+        if resumen is None or resumen.promedio_final is None:
+            return "-"
+        # Misma precisión que Alumno.prom_final_general
+        return f"{resumen.promedio_final:.1f}"
     prom_final_general_display.short_description = "Final"
+    prom_final_general_display.admin_order_field = '_orden_final'
+    
+    def materias_reprobadas_display(self, obj):
+        # Leído de ResumenAlumno (select_related), sin consultas extra
+        resumen = getattr(obj, 'resumen', None)
+        return resumen.materias_reprobadas if resumen is not None else "-"
+    materias_reprobadas_display.short_description = "Reprobadas"
+    materias_reprobadas_display.admin_order_field = 'resumen__materias_reprobadas'
     
     # Campos en el formulario de edición
     fieldsets = (
@@ -96,6 +220,7 @@ class CalificacionAdmin(admin.ModelAdmin):
     
     # Ahora estos campos SÍ están en list_display
     list_editable = ['p1', 'p2', 'p3', 'examen_final']
+    list_select_related = ['alumno', 'materia']
     
     # Métodos para mostrar en la lista
     def alumno_matricula(self, obj):
@@ -139,6 +264,88 @@ class CalificacionAdmin(admin.ModelAdmin):
     )
     
     readonly_fields = ['promedio_parciales', 'calificacion_final', 'estado', 'fecha_registro', 'fecha_actualizacion']
+
+    def get_queryset(self, request):
+        # También lo usa el guardado de list_editable: __str__ lee la matrícula y el código
+        return super().get_queryset(request).select_related('alumno', 'materia')
+
+    def get_changelist_formset(self, request, **kwargs):
+        kwargs.setdefault('formset', FormsetPrecargado)
+        return super().get_changelist_formset(request, **kwargs)
+
+    def changelist_view(self, request, extra_context=None):
+        # Guardado de list_editable: Django valida todo el formset y luego llama save_model
+        # y log_change fila por fila; aquí solo se acumulan y se escriben juntas al final
+        if request.method != 'POST' or '_save' not in request.POST:
+            return super().changelist_view(request, extra_context)
+        request.calificaciones_pendientes = []
+        request.cambios_pendientes = []
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            respuesta = super().changelist_view(request, extra_context)
+            self.guardar_pendientes(request)
+        return respuesta
+
+    def save_model(self, request, obj, form, change):
+        pendientes = getattr(request, 'calificaciones_pendientes', None)
+        if pendientes is None:
+            return super().save_model(request, obj, form, change)
+        pendientes.append(obj)
+
+    def log_change(self, request, obj, message):
+        pendientes = getattr(request, 'cambios_pendientes', None)
+        if pendientes is None:
+            return super().log_change(request, obj, message)
+        pendientes.append(LogEntry(
+            user_id=request.user.pk,
+            content_type_id=get_content_type_for_model(obj).pk,
+            object_id=str(obj.pk),
+            object_repr=str(obj)[:200],
+            action_flag=CHANGE,
+            change_message=json.dumps(message) if isinstance(message, list) else message,
+        ))
+
+    def guardar_pendientes(self, request):
+        """Recalcula PP y CF de las filas modificadas como Calificacion.save y las guarda
+           con un solo bulk_update; los resúmenes y la bitácora, también de una vez"""
+        calificaciones = request.calificaciones_pendientes
+        if not calificaciones:
+            return
+        ahora = timezone.now()
+        for calificacion in calificaciones:
+            calificacion.actualizar_calculados()
+            calificacion.fecha_actualizacion = ahora
+        Calificacion.objects.bulk_update(
+            calificaciones, CAMPOS_CALIFICACION + CAMPOS_CALCULADOS + ['fecha_actualizacion']
+        )
+        recalcular_resumenes({calificacion.alumno_id for calificacion in calificaciones})
+        LogEntry.objects.bulk_create(request.cambios_pendientes)
+    
+    def delete_queryset(self, request, queryset):
+        # El borrado masivo no pasa por Calificacion.delete: actualizar los resúmenes aquí
+        alumno_ids = set(queryset.values_list('alumno_id', flat=True))
+        super().delete_queryset(request, queryset)
+        recalcular_resumenes(alumno_ids)
+
+    actions = ['exportar_csv', 'exportar_xlsx']
+
+    @admin.action(description='Exportar a CSV')
+    def exportar_csv(self, request, queryset):
+        # Se envía conforme se lee la BD: el navegador recibe el encabezado de inmediato
+        respuesta = StreamingHttpResponse(
+            csv_por_partes(filas_calificaciones(queryset)), content_type='text/csv; charset=utf-8'
+        )
+        respuesta['Content-Disposition'] = 'attachment; filename="calificaciones.csv"'
+        return respuesta
+
+    @admin.action(description='Exportar a Excel (XLSX)')
+    def exportar_xlsx(self, request, queryset):
+        # Un XLSX es un zip que solo se puede cerrar al final: se arma completo en un archivo
+        # temporal (write_only, memoria constante) y después se envía por partes. Pasando el límite
+        # de filas de Excel sigue en hojas nuevas (alumnos.exportacion.escribir_xlsx)
+        archivo = tempfile.TemporaryFile()
+        escribir_xlsx(filas_calificaciones(queryset), archivo)
+        archivo.seek(0)
+        return FileResponse(archivo, as_attachment=True, filename='calificaciones.xlsx')
     
     # Personalizar cómo se muestran los campos en la lista (opcional)
     def formfield_for_dbfield(self, db_field, request, **kwargs):
@@ -0,0 +1,92 @@
+# alumnos/cache.py
+"""Caché versionada de la página de calificaciones del alumno.
+
+La llave incluye la matrícula, ResumenAlumno.version, que cambia cada vez
+que se guarda una calificación o el alumno (save, importaciones, admin), y la
+versión del catálogo de materias (nombres del plan de estudios, alumnos.catalogo).
+Así no hace falta borrar entradas: una versión nueva simplemente no encuentra
+la anterior, y esta expira sola. Funciona igual con cualquier backend de
+caché de Django (memoria local, archivos o base de datos).
+
+El tablero de estadísticas (alumnos.tablero) usa la misma idea con una sola
+versión global, que cambia cada vez que se escriben resúmenes. Con varios
+procesos hace falta un backend compartido ('file' o 'db') para que todos
+vean la versión nueva; con 'locmem' cada proceso ve solo sus propios cambios
+y el resto espera a que expire ESTADISTICAS_CACHE_TIMEOUT.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+_contadores = {'aciertos': 0, 'fallos': 0}
+_candado = threading.Lock()
+
+
+def _cache():
+    return caches[getattr(settings, 'CALIFICACIONES_CACHE_ALIAS', 'default')]
+
+
+def _contar(tipo):
+    with _candado:
+        _contadores[tipo] += 1
+
+
+# Cambia cuando cambia la forma del contexto guardado (p. ej. al agregar el modelo de presentación),
+# para no leer entradas viejas de una caché en archivos o BD
+FORMATO_CONTEXTO = 2
+
+
+def clave_calificaciones(matricula, version, version_catalogo):
+    """Llave de caché de la página de un alumno para una versión de sus datos y del catálogo"""
+    return f"calificaciones:{FORMATO_CONTEXTO}:{matricula}:{version}:{version_catalogo}"
+
+
+def obtener_contexto(clave):
+    """Devuelve el contexto guardado o None (y actualiza los contadores)"""
+    contexto = _cache().get(clave)
+    _contar('aciertos' if contexto is not None else 'fallos')
+    return contexto
+
+
+def guardar_contexto(clave, contexto):
+    _cache().set(clave, contexto, getattr(settings, 'CALIFICACIONES_CACHE_TIMEOUT', 3600))
+
+
+def version_estadisticas():
+    """Versión vigente de las estadísticas (se crea la primera vez)"""
+    version = _cache().get('estadisticas:version')
+    if version is None:
+        version = time.time_ns()
+        _cache().add('estadisticas:version', version, None)
+    return version
+
+
+def invalidar_estadisticas():
+    """Las estadísticas guardadas dejan de usarse (la llave cambia de versión)"""
+    _cache().set('estadisticas:version', time.time_ns(), None)
+
+
+def obtener_tablero(clave):
+    return _cache().get(clave)
+
+
+def guardar_tablero(clave, filas):
+    _cache().set(clave, filas, getattr(settings, 'ESTADISTICAS_CACHE_TIMEOUT', 600))
+
+
+def estadisticas():
+    """Aciertos/fallos de este proceso desde que arrancó"""
+    with _candado:
+        datos = dict(_contadores)
+    total = datos['aciertos'] + datos['fallos']
+    datos['total'] = total
+    datos['tasa_aciertos'] = round(datos['aciertos'] / total, 4) if total else None
+    return datos
+
+
+def reiniciar_estadisticas():
+    with _candado:
+        for tipo in _contadores:
+            _contadores[tipo] = 0
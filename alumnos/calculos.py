@@ -0,0 +1,180 @@
+# alumnos/calculos.py
+"""Versión vectorizada (NumPy/pandas) de las reglas de Calificacion para importaciones.
+
+Aplica sobre hojas completas las mismas reglas que
+Calificacion.calcular_promedio_parciales y Calificacion.calcular_calificacion_final:
+  - promedio de los parciales no nulos,
+  - si el promedio es < 6 queda en 5,
+  - en otro caso se redondea a entero (.5 sube).
+
+Todo se calcula en décimas enteras (7.3 -> 73) para que la aritmética sea exacta
+y el resultado idéntico al de Decimal. Los arreglos usan float64 con NaN como nulo.
+"""
+import re
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+TIPOS_CALIFICACION = {
+    'p1': 'P1',
+    'p2': 'P2',
+    'p3': 'P3',
+    'examen_final': 'EF',
+}
+
+_PATRON_COLUMNA = re.compile(r'^(C\d{4})_(P[1-3]|PP|EF|CF|PS|ES)$')
+
+
+def valor_a_decimas(valor):
+    """Convierte una celda a décimas con la misma lógica que convertir_a_decimal
+       de los comandos de importación (NaN si está vacía o no se puede leer)"""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return np.nan
+    try:
+        if isinstance(valor, (int, float, np.integer, np.floating)):
+            decimal = Decimal(str(valor)).quantize(Decimal('0.1'))
+        elif isinstance(valor, Decimal):
+            decimal = valor.quantize(Decimal('0.1'))
+        else:
+            valor_str = str(valor).strip()
+            if valor_str == '':
+                return np.nan
+            decimal = Decimal(valor_str.replace(',', '.')).quantize(Decimal('0.1'))
+        if not decimal.is_finite():
+            return np.nan
+        return float(decimal.scaleb(1))
+    except Exception:
+        return np.nan
+
+
+def columna_a_decimas(columna):
+    """Convierte una columna completa a décimas (float64 con NaN).
+
+    Las columnas numéricas cuyo valor ya es una décima exacta (el caso normal
+    en Excel) se convierten sin salir de NumPy; solo las celdas de texto o con
+    más decimales pasan por valor_a_decimas."""
+    serie = pd.Series(columna)
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        valores = serie.to_numpy(dtype='float64', na_value=np.nan)
+        decimas = valores * 10
+        redondeado = np.round(decimas)
+        exacto = np.isnan(valores) | (np.abs(decimas - redondeado) < 1e-6)
+        resultado = np.where(np.isnan(valores), np.nan, redondeado)
+        if not exacto.all():
+            indices = np.flatnonzero(~exacto)
+            resultado[indices] = [valor_a_decimas(v) for v in valores[indices]]
+        return resultado
+    return np.array([valor_a_decimas(v) for v in serie.tolist()], dtype='float64')
+
+
+def promedio_parciales(p1, p2, p3):
+    """Promedio de parciales en décimas.
+
+    Devuelve (promedio, recalcula). Igual que Calificacion.save, el promedio solo
+    se recalcula si hay al menos un parcial distinto de cero; donde recalcula es
+    False el promedio es NaN y debe conservarse el valor guardado."""
+    parciales = np.vstack([np.asarray(p, dtype='float64') for p in (p1, p2, p3)])
+    validos = ~np.isnan(parciales)
+    recalcula = (validos & (parciales != 0)).any(axis=0)
+
+    suma = np.where(validos, parciales, 0).sum(axis=0).astype('int64')
+    cantidad = validos.sum(axis=0).astype('int64')
+    divisor = np.maximum(cantidad, 1)
+
+    # promedio = suma / (10 * cantidad); redondeo .5 hacia arriba = floor(promedio + 0.5)
+    redondeado = np.floor_divide(suma + 5 * cantidad, 10 * divisor) * 10
+    promedio = np.where(suma < 60 * cantidad, 50, redondeado).astype('float64')
+    return np.where(recalcula, promedio, np.nan), recalcula
+
+
+def calificacion_final(promedio, examen_final):
+    """Calificación final en décimas a partir del promedio de parciales y el examen final"""
+    promedio = np.asarray(promedio, dtype='float64')
+    examen_final = np.asarray(examen_final, dtype='float64')
+    presentes = ~np.isnan(promedio) & ~np.isnan(examen_final)
+    suma = np.where(presentes, promedio + examen_final, 0).astype('int64')
+
+    # promedio = suma / 20; redondeo .5 hacia arriba = floor((suma + 10) / 20)
+    redondeado = np.floor_divide(suma + 10, 20) * 10
+    final = np.where(suma < 120, 50, redondeado).astype('float64')
+    return np.where(presentes, final, np.nan)
+
+
+def codigos_en_columnas(columnas):
+    """Códigos de materia (Cxxxx) presentes en columnas ya normalizadas (Cxxxx_P1, ...)"""
+    codigos = []
+    for col in columnas:
+        match = _PATRON_COLUMNA.match(str(col))
+        if match and match.group(1) not in codigos:
+            codigos.append(match.group(1))
+    return codigos
+
+
+def calcular_hoja(df, codigos=None, columnas_especiales=None):
+    """Calcula PP y CF de todas las materias de una hoja de una sola vez.
+
+    columnas_especiales permite cambiar el nombre de columna de un tipo para una
+    materia, p. ej. {'C5262': {'examen_final': 'C5262_ES'}} para QUINTO ILI.
+
+    Devuelve {codigo: DataFrame} con columnas p1, p2, p3, examen_final,
+    promedio_parciales, calificacion_final (en décimas) y recalcula_pp,
+    alineado con el índice de df."""
+    if codigos is None:
+        codigos = codigos_en_columnas(df.columns)
+    columnas_especiales = columnas_especiales or {}
+    vacia = np.full(len(df), np.nan)
+
+    resultado = {}
+    for codigo in codigos:
+        especiales = columnas_especiales.get(codigo, {})
+        datos = {}
+        for campo, tipo in TIPOS_CALIFICACION.items():
+            columna = especiales.get(campo, f'{codigo}_{tipo}')
+            datos[campo] = columna_a_decimas(df[columna]) if columna in df.columns else vacia
+        datos['promedio_parciales'], datos['recalcula_pp'] = promedio_parciales(
+            datos['p1'], datos['p2'], datos['p3']
+        )
+        datos['calificacion_final'] = calificacion_final(datos['promedio_parciales'], datos['examen_final'])
+        resultado[codigo] = pd.DataFrame(datos, index=df.index)
+    return resultado
+
+
+def decimas_a_decimal(decimas):
+    """Décimas -> Decimal con un decimal, igual que convertir_a_decimal (73 -> 7.3, 70 -> 7.0)"""
+    if decimas is None or np.isnan(decimas):
+        return None
+    return Decimal(int(decimas)).scaleb(-1)
+
+
+def decimas_a_calificacion(decimas):
+    """Décimas -> Decimal con la misma forma que devuelven los métodos del modelo:
+       Decimal('5.0') para reprobado y entero (Decimal('8')) para lo redondeado"""
+    if decimas is None or np.isnan(decimas):
+        return None
+    if decimas == 50:
+        return Decimal('5.0')
+    return Decimal(int(decimas) // 10)
+
+
+def filas_de_calificaciones(resultado):
+    """Convierte el resultado de calcular_hoja en una lista (una entrada por fila)
+       de {codigo: {'p1': Decimal, ..., 'promedio_parciales': ..., 'calificacion_final': ...}}"""
+    por_codigo = {}
+    total = 0
+    for codigo, datos in resultado.items():
+        total = len(datos)
+        columnas = {}
+        for campo in TIPOS_CALIFICACION:
+            columnas[campo] = [decimas_a_decimal(v) for v in datos[campo].to_numpy()]
+        for campo in ('promedio_parciales', 'calificacion_final'):
+            columnas[campo] = [decimas_a_calificacion(v) for v in datos[campo].to_numpy()]
+        por_codigo[codigo] = columnas
+
+    filas = []
+    for i in range(total):
+        filas.append({
+            codigo: {campo: valores[i] for campo, valores in columnas.items()}
+            for codigo, columnas in por_codigo.items()
+        })
+    return filas
@@ -0,0 +1,162 @@
+# alumnos/catalogo.py
+"""Catálogo de materias y plan de estudios en memoria del proceso.
+
+Las materias (código, nombre y banderas de política) y el plan de estudios
+(MateriaPlan: semestre y carrera -> materias) se leen con dos consultas y se
+guardan en un CatalogoMaterias inmutable. Las importaciones y la página del
+alumno resuelven las materias con él sin consultar la BD; la política de
+materias (alumnos.politica) se compila en el mismo paso.
+
+Invalidación por versión: guardar o borrar una Materia o un MateriaPlan (y el
+alta masiva de materias de la importación) descarta la copia de este proceso
+y publica una versión nueva en la caché de Django, al confirmar la transacción
+si la hay (si se revierte, nada cambia). Los demás procesos revisan
+esa versión cada CATALOGO_MATERIAS_TTL segundos y solo releen el catálogo si
+cambió. Si la caché no es compartida (locmem) no ven la versión y releen el
+catálogo en cada revisión.
+
+CatalogoMaterias.version entra en la llave de caché y en el ETag de la página
+del alumno (un nombre del plan cambia la página sin tocar sus calificaciones).
+Sin versión publicada, o con cambios de este hilo sin confirmar, la versión es
+una huella del contenido leído.
+"""
+import hashlib
+import threading
+import time
+from types import MappingProxyType
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .models import Materia, MateriaPlan
+from .politica import PoliticaMaterias
+
+CLAVE_VERSION = 'catalogo_materias:version'
+
+_candado = threading.Lock()
+_catalogo = None
+_revisado = 0.0
+# Cambios de este hilo al catálogo dentro de una transacción que sigue abierta
+_local = threading.local()
+
+
+class MateriaCatalogo(NamedTuple):
+    id: int
+    codigo: str
+    nombre: str
+    cuenta_promedio: bool
+    muestra_acreditada: bool
+
+
+class CatalogoMaterias:
+    """Materias por id y por código, y plan de estudios (inmutable)"""
+    __slots__ = ('version', 'por_id', 'por_codigo', 'planes', 'politica')
+
+    def __init__(self, materias=(), planes=(), version=None):
+        materias = tuple(materias)
+        por_plan = {}
+        for semestre, carrera, codigo, nombre in planes:
+            por_plan.setdefault((semestre, carrera), {})[codigo] = nombre
+        valores = {
+            'version': version,
+            'por_id': MappingProxyType({materia.id: materia for materia in materias}),
+            'por_codigo': MappingProxyType({materia.codigo: materia for materia in materias}),
+            # {(semestre, carrera): {código: nombre}} en el orden del plan
+            'planes': MappingProxyType({plan: MappingProxyType(codigos) for plan, codigos in por_plan.items()}),
+            'politica': PoliticaMaterias(
+                (materia.id for materia in materias if not materia.cuenta_promedio),
+                (materia.id for materia in materias if materia.muestra_acreditada),
+            ),
+        }
+        for nombre, valor in valores.items():
+            object.__setattr__(self, nombre, valor)
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError('CatalogoMaterias es inmutable')
+
+    def plan(self, semestre, carrera=None):
+        """{código: nombre} de las materias de un semestre (las comunes y las de la carrera), en orden"""
+        semestre = (semestre or '').strip().upper()
+        carrera = (carrera or '').strip().upper()
+        plan = dict(self.planes.get((semestre, ''), {}))
+        if carrera:
+            plan.update(self.planes.get((semestre, carrera), {}))
+        return plan
+
+
+def cargar_catalogo(version=None):
+    """Lee materias y plan de estudios con dos consultas.
+       Siempre de la primaria: una réplica atrasada dejaría el catálogo viejo hasta el siguiente cambio"""
+    materias = [MateriaCatalogo(*fila) for fila in Materia.objects.using(DEFAULT_DB_ALIAS).order_by(
+        'codigo'
+    ).values_list('id', 'codigo', 'nombre', 'cuenta_promedio', 'muestra_acreditada')]
+    planes = list(MateriaPlan.objects.using(DEFAULT_DB_ALIAS).order_by(
+        'semestre', 'carrera', 'orden', 'codigo'
+    ).values_list('semestre', 'carrera', 'codigo', 'nombre'))
+    if version is None:
+        version = 'h' + hashlib.blake2b(repr((materias, planes)).encode(), digest_size=8).hexdigest()
+    return CatalogoMaterias(materias, planes, version)
+
+
+def catalogo_materias():
+    """Catálogo vigente en este proceso (se lee en la primera llamada)"""
+    global _catalogo, _revisado
+    if _pendiente():
+        # Lo que este hilo aún no confirma no se comparte con los demás
+        return cargar_catalogo()
+    ttl = getattr(settings, 'CATALOGO_MATERIAS_TTL', 30)
+    catalogo = _catalogo
+    if catalogo is not None and time.monotonic() - _revisado < ttl:
+        return catalogo
+    with _candado:
+        if _catalogo is None or time.monotonic() - _revisado >= ttl:
+            version = cache.get(CLAVE_VERSION)
+            if _catalogo is None or version is None or version != _catalogo.version:
+                _catalogo = cargar_catalogo(version)
+            _revisado = time.monotonic()
+        return _catalogo
+
+
+def resolver_materias(ids):
+    """Catálogo que contiene todas las materias de `ids` (lo relee una vez si falta alguna)"""
+    catalogo = catalogo_materias()
+    if any(materia_id not in catalogo.por_id for materia_id in ids):
+        # Solo este proceso va atrasado: se relee sin publicar una versión nueva
+        _descartar(publicar=False)
+        catalogo = catalogo_materias()
+    return catalogo
+
+
+def _descartar(publicar=True):
+    global _catalogo
+    with _candado:
+        _catalogo = None
+    if publicar:
+        cache.set(CLAVE_VERSION, time.time_ns(), None)
+
+
+def _pendiente():
+    if not getattr(_local, 'pendiente', False):
+        return False
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return True
+    # La transacción terminó sin commit (rollback): el catálogo compartido nunca vio esos cambios
+    _local.pendiente = False
+    return False
+
+
+def _confirmar():
+    _local.pendiente = False
+    _descartar()
+
+
+def invalidar_catalogo():
+    """Descarta el catálogo y publica una versión nueva. Dentro de una transacción espera al
+       commit: hasta entonces los demás siguen con el catálogo confirmado y este hilo lee el suyo"""
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        _local.pendiente = True
+        transaction.on_commit(_confirmar)
+    else:
+        _descartar()
@@ -0,0 +1,179 @@
+# alumnos/exportacion.py
+"""Exportación de la tabla completa de calificaciones (CSV, XLSX y Parquet).
+
+Las filas se leen con values_list(...).iterator(chunk_size) en el orden del
+índice único (alumno, materia), así que la BD no tiene que ordenar la tabla
+antes de entregar la primera fila y en memoria solo hay un lote a la vez.
+Cada formato escribe conforme llegan las filas:
+  - CSV: generador de bloques de texto (StreamingHttpResponse o archivo),
+  - XLSX: openpyxl en modo write_only. Un XLSX es un zip que openpyxl solo
+    cierra al final, así que el archivo completo se arma antes de enviar el
+    primer byte (en disco, con memoria constante). Lo que no cabe en una hoja
+    de Excel (1,048,576 filas) sigue en hojas nuevas,
+  - Parquet: pyarrow (opcional) con un row group por lote.
+"""
+import csv
+import io
+from datetime import datetime, timezone
+
+from openpyxl import Workbook
+
+from .models import Calificacion
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # dependencia opcional
+    pa = pq = None
+
+TAMANO_LOTE = 2000
+# Filas de datos por hoja de Excel: su límite (1,048,576) menos el encabezado
+FILAS_POR_HOJA_XLSX = 1048576 - 1
+
+# (encabezado, campo de Calificacion)
+COLUMNAS = [
+    ('MATRÍCULA', 'alumno__matricula'),
+    ('PRIMER APELLIDO', 'alumno__primer_apellido'),
+    ('SEGUNDO APELLIDO', 'alumno__segundo_apellido'),
+    ('PRIMER NOMBRE', 'alumno__primer_nombre'),
+    ('SEGUNDO NOMBRE', 'alumno__segundo_nombre'),
+    ('SEMESTRE', 'alumno__semestre'),
+    ('GRUPO', 'alumno__grupo'),
+    ('CARRERA', 'alumno__carrera'),
+    ('MATERIA', 'materia__codigo'),
+    ('NOMBRE MATERIA', 'materia__nombre'),
+    ('P1', 'p1'),
+    ('P2', 'p2'),
+    ('P3', 'p3'),
+    ('PP', 'promedio_parciales'),
+    ('EF', 'examen_final'),
+    ('CF', 'calificacion_final'),
+    ('ACTUALIZACIÓN', 'fecha_actualizacion'),
+]
+ENCABEZADOS = [encabezado for encabezado, _ in COLUMNAS]
+
+FORMATOS = ('csv', 'xlsx', 'parquet')
+
+
+def filas_calificaciones(queryset=None, tamano_lote=TAMANO_LOTE):
+    """Tuplas de COLUMNAS para cada calificación, leídas por lotes"""
+    if queryset is None:
+        queryset = Calificacion.objects.all()
+    return queryset.order_by('alumno_id', 'materia_id').values_list(
+        *(campo for _, campo in COLUMNAS)
+    ).iterator(chunk_size=tamano_lote)
+
+
+def formato_de_ruta(ruta):
+    """Formato según la extensión del archivo (csv por defecto)"""
+    extension = str(ruta).rsplit('.', 1)[-1].lower()
+    return extension if extension in FORMATOS else 'csv'
+
+
+def csv_por_partes(filas, tamano_lote=TAMANO_LOTE):
+    """Genera el CSV en bloques de texto de tamano_lote filas.
+       El encabezado (con BOM para que Excel respete los acentos) sale antes de la primera consulta"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(ENCABEZADOS)
+    yield '\ufeff' + buffer.getvalue()
+
+    pendientes = 0
+    buffer.seek(0)
+    buffer.truncate()
+    for fila in filas:
+        escritor.writerow(fila)
+        pendientes += 1
+        if pendientes >= tamano_lote:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pendientes = 0
+    if pendientes:
+        yield buffer.getvalue()
+
+
+def escribir_csv(filas, destino, tamano_lote=TAMANO_LOTE):
+    """Escribe el CSV en un archivo de texto abierto. Devuelve las filas escritas"""
+    contador = _Contador(filas)
+    for parte in csv_por_partes(contador, tamano_lote):
+        destino.write(parte)
+    return contador.total
+
+
+def escribir_xlsx(filas, destino, filas_por_hoja=FILAS_POR_HOJA_XLSX):
+    """Escribe el XLSX con openpyxl en modo write_only (memoria constante).
+       destino es una ruta o un archivo binario abierto. Cada filas_por_hoja filas empieza
+       una hoja nueva (CALIFICACIONES, CALIFICACIONES 2, ...) con su encabezado"""
+    libro = Workbook(write_only=True)
+    hoja = None
+    total = 0
+    for fila in filas:
+        if total % filas_por_hoja == 0:
+            numero = total // filas_por_hoja + 1
+            hoja = libro.create_sheet('CALIFICACIONES' if numero == 1 else f'CALIFICACIONES {numero}')
+            hoja.append(ENCABEZADOS)
+        hoja.append([_celda_xlsx(valor) for valor in fila])
+        total += 1
+    if hoja is None:
+        libro.create_sheet('CALIFICACIONES').append(ENCABEZADOS)
+    libro.save(destino)
+    return total
+
+
+def escribir_parquet(filas, destino, tamano_lote=TAMANO_LOTE):
+    """Escribe el Parquet con pyarrow, un row group por lote. destino es una ruta o archivo binario"""
+    if pq is None:
+        raise ImportError('Para exportar a Parquet instala pyarrow')
+    esquema = _esquema_parquet()
+    total = 0
+    with pq.ParquetWriter(destino, esquema) as escritor:
+        lote = []
+        for fila in filas:
+            lote.append(fila)
+            if len(lote) >= tamano_lote:
+                escritor.write_batch(_lote_arrow(lote, esquema))
+                total += len(lote)
+                lote = []
+        if lote:
+            escritor.write_batch(_lote_arrow(lote, esquema))
+            total += len(lote)
+    return total
+
+
+class _Contador:
+    """Iterable que cuenta las filas que pasan por él"""
+
+    def __init__(self, filas):
+        self.filas = filas
+        self.total = 0
+
+    def __iter__(self):
+        for fila in self.filas:
+            self.total += 1
+            yield fila
+
+
+def _celda_xlsx(valor):
+    """Excel no guarda zona horaria: las fechas van en UTC sin tzinfo"""
+    if isinstance(valor, datetime) and valor.tzinfo is not None:
+        return valor.astimezone(timezone.utc).replace(tzinfo=None)
+    return valor
+
+
+def _esquema_parquet():
+    calificacion = pa.decimal128(4, 1)
+    tipos = {
+        'p1': calificacion, 'p2': calificacion, 'p3': calificacion,
+        'promedio_parciales': calificacion, 'examen_final': calificacion, 'calificacion_final': calificacion,
+        'fecha_actualizacion': pa.timestamp('us', tz='UTC'),
+    }
+    return pa.schema([(encabezado, tipos.get(campo, pa.string())) for encabezado, campo in COLUMNAS])
+
+
+def _lote_arrow(lote, esquema):
+    columnas = list(zip(*lote))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(columna, type=campo.type) for columna, campo in zip(columnas, esquema)],
+        schema=esquema,
+    )
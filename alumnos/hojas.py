@@ -0,0 +1,218 @@
+# alumnos/hojas.py
+"""Formatos de las hojas del archivo de calificaciones y su lectura.
+
+Cada hoja conocida se describe una sola vez en FORMATOS (nombre de la hoja,
+semestre y carrera del plan de estudios y alias de columnas). Con eso el mismo
+código lee PRIMER SEMESTRE, TERCER SEMESTRE y QUINTO SEMESTRE DC/ILI.
+
+Las materias de cada hoja salen del plan de estudios (MateriaPlan):
+FormatoHoja.materias_del_plan las toma del catálogo del proceso que llama.
+
+Este módulo no usa la BD: analizar_hoja corre en procesos hijos
+(importacion.importar_libro), recibe del padre las materias ya resueltas y
+solo devuelve registros listos para ImportadorMasivo.
+"""
+import re
+from decimal import Decimal
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from .calculos import calcular_hoja, filas_de_calificaciones
+from .lectura import TAMANO_BLOQUE, leer_hoja_por_bloques
+
+_PATRON_CALIFICACION = re.compile(r'^(C\d{4})[\s_]*(P[1-3]|PP|EF|CF|PS|ES)$')
+
+
+class FormatoHoja:
+    """Descripción de una hoja del libro de calificaciones"""
+
+    def __init__(self, nombre, plan, semestre=None, carrera=None, alias=None):
+        self.nombre = nombre
+        # Semestre del plan de estudios de la hoja (con la carrera elige sus materias)
+        self.plan = plan
+        # Semestre fijo de la hoja; si es None se toma de la columna SEMESTRE (QUINTO por defecto)
+        self.semestre = semestre
+        self.carrera = carrera
+        # {codigo: {campo: columna}} para materias con columnas distintas (p. ej. ILI C5262 usa ES)
+        self.alias = alias or {}
+
+    def materias_del_plan(self, catalogo):
+        """{codigo: nombre de la materia} de la hoja según el plan de estudios (alumnos.catalogo)"""
+        return catalogo.plan(self.plan, self.carrera)
+
+
+FORMATOS = {formato.nombre: formato for formato in (
+    FormatoHoja('PRIMER SEMESTRE', 'PRIMERO', semestre='PRIMERO'),
+    FormatoHoja('TERCER SEMESTRE', 'TERCERO', semestre='TERCERO'),
+    FormatoHoja('QUINTO SEMESTRE DC', 'QUINTO', carrera='DC'),
+    # En ILI, PROYECTO I trae PS/ES en lugar de PP/EF
+    FormatoHoja('QUINTO SEMESTRE ILI', 'QUINTO', carrera='ILI',
+                alias={'C5262': {'promedio_parciales': 'C5262_PS', 'examen_final': 'C5262_ES'}}),
+)}
+
+
+def normalizar_columnas(columnas):
+    """Normaliza encabezados: C1022P1, 'C3023 P1', 'C5300\\nP1' y 'C5300<br>P1' -> Cxxxx_P1.
+       En las demás columnas los saltos de línea pasan a '_' y se colapsan los espacios"""
+    nuevos_nombres = []
+    for col in columnas:
+        if not isinstance(col, str):
+            nuevos_nombres.append(str(col))
+            continue
+        col_limpia = col.strip().replace('<br>', '_').replace('\n', '_').replace('\r', '_').strip()
+        col_limpia = re.sub(r'\s+', ' ', col_limpia)
+        match = _PATRON_CALIFICACION.match(col_limpia)
+        nuevos_nombres.append(f"{match.group(1)}_{match.group(2)}" if match else col_limpia)
+    return nuevos_nombres
+
+
+def obtener_matricula(valor):
+    """Convierte la matrícula a string"""
+    if pd.isna(valor):
+        return ''
+
+    try:
+        # Si es numérico
+        if isinstance(valor, (int, float)):
+            if isinstance(valor, float) and valor.is_integer():
+                return str(int(valor))
+            return str(valor)
+
+        # Si es string
+        valor_str = str(valor).strip()
+
+        # Remover .0 si está al final
+        if valor_str.endswith('.0'):
+            valor_str = valor_str[:-2]
+
+        return valor_str
+
+    except Exception:
+        return str(valor).strip()
+
+
+def convertir_a_decimal(valor):
+    """Convierte un valor a Decimal"""
+    if pd.isna(valor):
+        return None
+
+    try:
+        # Si ya es Decimal
+        if isinstance(valor, Decimal):
+            return valor
+
+        # Si es numérico
+        if isinstance(valor, (int, float)):
+            return Decimal(str(valor)).quantize(Decimal('0.1'))
+
+        # Si es string
+        valor_str = str(valor).strip()
+        if valor_str == '':
+            return None
+
+        # Reemplazar comas por puntos
+        valor_str = valor_str.replace(',', '.')
+
+        # Convertir a Decimal con 1 decimal
+        return Decimal(valor_str).quantize(Decimal('0.1'))
+
+    except Exception:
+        return None
+
+
+def limpiar_dataframe(df):
+    """Elimina filas vacías y filas sin matrícula válida"""
+    # dropna ya devuelve una copia
+    df_limpio = df.dropna(how='all')
+
+    mask = df_limpio['MATRÍCULA'].apply(
+        lambda x: not pd.isna(x) and str(x).strip() != '' and not str(x).strip().startswith('C')
+    )
+    return df_limpio[mask]
+
+
+def datos_alumno(row, formato):
+    """Extrae de la fila los campos del alumno (sin la matrícula)"""
+    # Parsear nombres
+    primer_apellido = str(row.get('PRIMER APELLIDO', '')).strip()
+    segundo_apellido = str(row.get('SEGUNDO APELLIDO', '')).strip()
+    nombres_completos = str(row.get('NOMBRE (S)', '')).strip()
+
+    # Dividir nombres
+    nombres = nombres_completos.split() if nombres_completos else []
+    primer_nombre = nombres[0] if len(nombres) > 0 else ''
+    segundo_nombre = ' '.join(nombres[1:]) if len(nombres) > 1 else ''
+
+    # Grupo y sexo
+    grupo = str(row.get('GRUPO', '')).strip()
+    sexo_raw = row.get('SEXO', '')
+    sexo = str(sexo_raw).strip().upper() if not pd.isna(sexo_raw) else ''
+
+    datos = {
+        'primer_apellido': primer_apellido,
+        'segundo_apellido': segundo_apellido,
+        'primer_nombre': primer_nombre,
+        'segundo_nombre': segundo_nombre,
+        'semestre': formato.semestre or str(row.get('SEMESTRE', 'QUINTO')).strip(),
+        'grupo': grupo,
+        'sexo': sexo,
+        'activo': True,
+    }
+    if formato.carrera:
+        datos['carrera'] = formato.carrera
+    return datos
+
+
+def leer_hoja(ruta, formato):
+    """Lee la hoja completa con pandas y normaliza sus columnas"""
+    df = pd.read_excel(ruta, sheet_name=formato.nombre)
+    df.columns = normalizar_columnas(df.columns)
+    return df
+
+
+def bloques_de_hoja(ruta, formato, streaming=False, tamano_bloque=TAMANO_BLOQUE):
+    """La hoja como iterable de DataFrames: completa o por bloques (memoria acotada)"""
+    if streaming:
+        return leer_hoja_por_bloques(ruta, formato.nombre, normalizar_columnas, tamano_bloque)
+    return [leer_hoja(ruta, formato)]
+
+
+def registros_de_bloques(bloques, formato, materias, limite=0):
+    """Convierte bloques de filas en registros para ImportadorMasivo (PP y CF ya calculados).
+       `materias` es {codigo: nombre} (FormatoHoja.materias_del_plan)"""
+    restantes = limite if limite > 0 else None
+    for df in bloques:
+        df_limpio = limpiar_dataframe(df)
+        if restantes is not None:
+            df_limpio = df_limpio.head(restantes)
+            restantes -= len(df_limpio)
+
+        # PP y CF de todas las materias del bloque de una sola vez (vectorizado)
+        calificaciones = filas_de_calificaciones(
+            calcular_hoja(df_limpio, list(materias), columnas_especiales=formato.alias)
+        )
+        for row, califs in zip(df_limpio.to_dict('records'), calificaciones):
+            yield {
+                'matricula': obtener_matricula(row.get('MATRÍCULA')),
+                'alumno': datos_alumno(row, formato),
+                'calificaciones': califs,
+            }
+        if restantes == 0:
+            break
+
+
+def analizar_hoja(ruta, nombre_hoja, materias, limite=0):
+    """Lee y prepara una hoja completa. Corre en un proceso hijo: no toca la BD
+       (las materias llegan del padre como un dict simple)"""
+    formato = FORMATOS[nombre_hoja]
+    return list(registros_de_bloques([leer_hoja(ruta, formato)], formato, materias, limite))
+
+
+def hojas_del_libro(ruta):
+    """Nombres de las hojas del libro, en su orden"""
+    libro = load_workbook(ruta, read_only=True)
+    try:
+        return list(libro.sheetnames)
+    finally:
+        libro.close()
@@ -0,0 +1,329 @@
+# alumnos/importacion.py
+"""Motor de importación masiva (por lotes) compartido por los comandos de importación.
+
+En lugar de hacer un update_or_create por alumno y por materia, cada lote:
+  1. lee en una sola consulta los alumnos existentes de las matrículas del lote,
+  2. lee en una sola consulta sus calificaciones existentes,
+  3. escribe todo con bulk_create/bulk_update dentro de una transacción,
+  4. recalcula el ResumenAlumno de los alumnos del lote.
+
+Si el motor lo soporta (PostgreSQL, SQLite >= 3.24) las actualizaciones se hacen
+como upsert (INSERT ... ON CONFLICT DO UPDATE), que es mucho más barato que el
+CASE WHEN que genera bulk_update.
+
+Con incremental=True (importación delta) se compara cada fila del libro con
+lo guardado y solo se escriben los alumnos y calificaciones que cambiaron: una
+recarga del mismo libro no escribe nada, no mueve fecha_actualizacion y no
+invalida los resúmenes ni la caché de las páginas de los alumnos.
+
+importar_libro es el punto de entrada de los comandos: lee las hojas descritas
+en alumnos.hojas.FORMATOS (en paralelo, una por proceso) y un solo escritor
+(este proceso) las guarda con ImportadorMasivo. Las materias de cada hoja se
+resuelven aquí con el plan de estudios del catálogo y viajan a los procesos
+hijos como dicts simples.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .hojas import FORMATOS, analizar_hoja, bloques_de_hoja, registros_de_bloques
+from .catalogo import catalogo_materias, invalidar_catalogo
+from .lectura import TAMANO_BLOQUE
+from .models import Alumno, Materia, Calificacion, banderas_iniciales, normalizar_matricula
+from .resumen import recalcular_resumenes
+
+CAMPOS_CALIFICACION = ['p1', 'p2', 'p3', 'examen_final']
+CAMPOS_CALCULADOS = ['promedio_parciales', 'calificacion_final']
+
+
+class ImportadorMasivo:
+    """Importa registros de alumnos y calificaciones por lotes.
+
+    Cada registro es un diccionario con la forma:
+        {
+            'matricula': '2023001',
+            'alumno': {'primer_apellido': ..., 'grupo': ..., ...},
+            'calificaciones': {'C1022': {'p1': Decimal, 'p2': ..., 'p3': ..., 'examen_final': ...}},
+        }
+
+    Si cada materia trae además 'promedio_parciales' y 'calificacion_final'
+    (calculados por hoja con alumnos.calculos), se usan tal cual en lugar de
+    recalcular fila por fila con los métodos del modelo.
+
+    Con incremental=True los alumnos y calificaciones cuya huella (los valores
+    que se guardarían) coincide con la de la BD no se escriben.
+    """
+
+    def __init__(self, nombres_materias, tamano_lote=500, incremental=False):
+        self.nombres_materias = nombres_materias
+        self.tamano_lote = tamano_lote
+        self.incremental = incremental
+        self.usar_upsert = connection.features.supports_update_conflicts_with_target
+        self.materias = {}
+        self.stats = {
+            'alumnos_creados': 0,
+            'alumnos_actualizados': 0,
+            'materias_creadas': 0,
+            'calificaciones_creadas': 0,
+            'calificaciones_actualizadas': 0,
+            'alumnos_sin_cambios': 0,
+            'calificaciones_sin_cambios': 0,
+            'filas': 0,
+            'segundos': 0.0,
+        }
+
+    def cargar_materias(self):
+        """Resuelve las materias con el catálogo del proceso (sin consultas), creando las que falten"""
+        catalogo = catalogo_materias()
+        faltantes = [
+            Materia(codigo=codigo, nombre=nombre, **banderas_iniciales(codigo))
+            for codigo, nombre in self.nombres_materias.items()
+            if codigo not in catalogo.por_codigo
+        ]
+        if faltantes:
+            Materia.objects.bulk_create(faltantes, ignore_conflicts=True)
+            # bulk_create no pasa por Materia.save
+            invalidar_catalogo()
+            self.stats['materias_creadas'] += len(faltantes)
+            catalogo = catalogo_materias()
+        self.materias = {
+            codigo: catalogo.por_codigo[codigo] for codigo in self.nombres_materias if codigo in catalogo.por_codigo
+        }
+        return self.materias
+
+    def importar(self, registros):
+        """Procesa todos los registros en lotes de tamano_lote"""
+        inicio = time.perf_counter()
+        if not self.materias:
+            self.cargar_materias()
+
+        lote = []
+        for registro in registros:
+            lote.append(registro)
+            if len(lote) >= self.tamano_lote:
+                self.guardar_lote(lote)
+                lote = []
+        if lote:
+            self.guardar_lote(lote)
+
+        self.stats['segundos'] = time.perf_counter() - inicio
+        return self.stats
+
+    @property
+    def filas_por_segundo(self):
+        if self.stats['segundos'] <= 0:
+            return 0.0
+        return self.stats['filas'] / self.stats['segundos']
+
+    def guardar_lote(self, lote):
+        """Guarda un lote de registros en una sola transacción"""
+        # Si una matrícula se repite en la hoja gana la última fila (igual que update_or_create)
+        por_matricula = {}
+        for registro in lote:
+            if registro['matricula']:
+                por_matricula[registro['matricula']] = registro
+
+        with transaction.atomic():
+            alumnos, cambiados = self.guardar_alumnos(por_matricula)
+            cambiados |= self.guardar_calificaciones(por_matricula, alumnos)
+            if cambiados:
+                recalcular_resumenes(cambiados, tamano_lote=self.tamano_lote)
+
+        self.stats['alumnos_sin_cambios'] += len(set(alumnos.values()) - cambiados)
+        self.stats['filas'] += len(lote)
+
+    def guardar_alumnos(self, por_matricula):
+        """Crea/actualiza los alumnos del lote.
+           Devuelve ({matricula: alumno_id}, ids de los alumnos creados o modificados)"""
+        existentes = {
+            a.matricula: a
+            for a in Alumno.objects.filter(matricula__in=por_matricula.keys())
+        }
+        ids = {matricula: alumno.pk for matricula, alumno in existentes.items()}
+
+        nuevos = []
+        actualizados = []
+        campos = set()
+        for matricula, registro in por_matricula.items():
+            datos = registro['alumno']
+            campos.update(datos.keys())
+            alumno = existentes.get(matricula)
+            if alumno is None:
+                nuevos.append(Alumno(
+                    matricula=matricula, matricula_normalizada=normalizar_matricula(matricula), **datos
+                ))
+            elif not self.incremental or huella_alumno(alumno, datos) != tuple(datos.values()):
+                for campo, valor in datos.items():
+                    setattr(alumno, campo, valor)
+                actualizados.append(alumno)
+
+        if self.usar_upsert and campos:
+            # El upsert resuelve por matrícula; sin pk para no chocar también con la llave primaria
+            for alumno in actualizados:
+                alumno.pk = None
+            Alumno.objects.bulk_create(
+                nuevos + actualizados,
+                batch_size=self.tamano_lote,
+                update_conflicts=True,
+                unique_fields=['matricula'],
+                update_fields=sorted(campos | {'matricula_normalizada'}),
+            )
+        else:
+            if nuevos:
+                Alumno.objects.bulk_create(nuevos, batch_size=self.tamano_lote)
+            if actualizados and campos:
+                Alumno.objects.bulk_update(actualizados, sorted(campos), batch_size=self.tamano_lote)
+
+        self.stats['alumnos_creados'] += len(nuevos)
+        self.stats['alumnos_actualizados'] += len(actualizados)
+        cambiados = {ids[alumno.matricula] for alumno in actualizados}
+
+        if nuevos:
+            # No todos los motores devuelven el id en bulk_create: releer los ids de los nuevos
+            creados = dict(
+                Alumno.objects.filter(matricula__in=[a.matricula for a in nuevos]).values_list('matricula', 'id')
+            )
+            ids.update(creados)
+            cambiados.update(creados.values())
+        return ids, cambiados
+
+    def guardar_calificaciones(self, por_matricula, alumnos):
+        """Crea/actualiza las calificaciones del lote calculando PP y CF como Calificacion.save.
+           Devuelve los ids de los alumnos con calificaciones creadas o modificadas"""
+        existentes = {
+            (c.alumno_id, c.materia_id): c
+            for c in Calificacion.objects.filter(
+                alumno_id__in=alumnos.values(),
+                materia_id__in=[m.id for m in self.materias.values()],
+            )
+        }
+
+        ahora = timezone.now()
+        nuevas = []
+        actualizadas = []
+        for matricula, registro in por_matricula.items():
+            alumno_id = alumnos.get(matricula)
+            if alumno_id is None:
+                continue
+            for codigo, valores in registro['calificaciones'].items():
+                materia = self.materias.get(codigo)
+                if materia is None:
+                    continue
+                # Solo se guardan materias con al menos un dato
+                if all(valores.get(campo) is None for campo in CAMPOS_CALIFICACION):
+                    continue
+
+                calificacion = existentes.get((alumno_id, materia.id))
+                nueva = calificacion is None
+                if nueva:
+                    calificacion = Calificacion(alumno_id=alumno_id, materia_id=materia.id)
+                    antes = None
+                else:
+                    antes = huella_calificacion(calificacion)
+
+                for campo in CAMPOS_CALIFICACION:
+                    setattr(calificacion, campo, valores.get(campo))
+                if 'promedio_parciales' in valores:
+                    aplicar_calculados(calificacion, valores)
+                else:
+                    calificacion.actualizar_calculados()
+
+                if nueva:
+                    nuevas.append(calificacion)
+                elif self.incremental and huella_calificacion(calificacion) == antes:
+                    self.stats['calificaciones_sin_cambios'] += 1
+                else:
+                    calificacion.fecha_actualizacion = ahora
+                    actualizadas.append(calificacion)
+
+        campos = CAMPOS_CALIFICACION + CAMPOS_CALCULADOS + ['fecha_actualizacion']
+        cambiados = {calificacion.alumno_id for calificacion in nuevas + actualizadas}
+        if self.usar_upsert:
+            for calificacion in actualizadas:
+                calificacion.pk = None
+            Calificacion.objects.bulk_create(
+                nuevas + actualizadas,
+                batch_size=self.tamano_lote,
+                update_conflicts=True,
+                unique_fields=['alumno', 'materia'],
+                update_fields=campos,
+            )
+        else:
+            if nuevas:
+                Calificacion.objects.bulk_create(nuevas, batch_size=self.tamano_lote)
+            if actualizadas:
+                Calificacion.objects.bulk_update(actualizadas, campos, batch_size=self.tamano_lote)
+
+        self.stats['calificaciones_creadas'] += len(nuevas)
+        self.stats['calificaciones_actualizadas'] += len(actualizadas)
+        return cambiados
+
+
+def huella_alumno(alumno, datos):
+    """Valores guardados del alumno en los campos (y el orden) que trae la fila"""
+    return tuple(getattr(alumno, campo) for campo in datos)
+
+
+def huella_calificacion(calificacion):
+    """Valores guardados de la calificación (Decimal('8') == Decimal('8.0'))"""
+    return tuple(getattr(calificacion, campo) for campo in CAMPOS_CALIFICACION + CAMPOS_CALCULADOS)
+
+
+def aplicar_calculados(calificacion, valores):
+    """Asigna PP y CF precalculados respetando las reglas de Calificacion.save:
+       un PP en None significa que no se recalcula y se conserva el guardado"""
+    if valores['promedio_parciales'] is not None:
+        calificacion.promedio_parciales = valores['promedio_parciales']
+    if valores['calificacion_final'] is not None:
+        calificacion.calificacion_final = valores['calificacion_final']
+    elif calificacion.promedio_parciales is not None and calificacion.examen_final is not None:
+        # PP conservado de la BD: caso poco común, se calcula con el modelo
+        calificacion.calificacion_final = calificacion.calcular_calificacion_final()
+
+
+def importar_libro(ruta, nombres_hojas, limite=0, tamano_lote=500, procesos=None,
+                   streaming=False, tamano_bloque=TAMANO_BLOQUE, incremental=False):
+    """Importa varias hojas del libro. Genera (formato, importador) conforme termina cada hoja.
+
+    Con más de un proceso, cada hoja se lee y prepara en un proceso hijo
+    (analizar_hoja) y este proceso es el único que escribe en la BD.
+    Con streaming las hojas se leen por bloques aquí mismo, una tras otra,
+    para que la memoria no dependa del tamaño de la hoja."""
+    if procesos is None:
+        procesos = min(len(nombres_hojas), os.cpu_count() or 1)
+    materias = materias_de_hojas(nombres_hojas)
+
+    if streaming or procesos <= 1 or len(nombres_hojas) <= 1:
+        for nombre in nombres_hojas:
+            formato = FORMATOS[nombre]
+            bloques = bloques_de_hoja(ruta, formato, streaming, tamano_bloque)
+            registros = registros_de_bloques(bloques, formato, materias[nombre], limite)
+            yield formato, _escribir_hoja(materias[nombre], registros, tamano_lote, incremental)
+        return
+
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = {
+            pool.submit(analizar_hoja, ruta, nombre, materias[nombre], limite): nombre for nombre in nombres_hojas
+        }
+        for futuro in as_completed(futuros):
+            nombre = futuros[futuro]
+            yield FORMATOS[nombre], _escribir_hoja(materias[nombre], futuro.result(), tamano_lote, incremental)
+
+
+def materias_de_hojas(nombres_hojas):
+    """{hoja: {codigo: nombre}} según el plan de estudios. Una hoja sin materias en el plan es un error"""
+    catalogo = catalogo_materias()
+    materias = {nombre: FORMATOS[nombre].materias_del_plan(catalogo) for nombre in nombres_hojas}
+    vacias = [nombre for nombre, codigos in materias.items() if not codigos]
+    if vacias:
+        raise ValueError(f"El plan de estudios (MateriaPlan) no tiene materias para: {', '.join(vacias)}")
+    return materias
+
+
+def _escribir_hoja(materias, registros, tamano_lote, incremental=False):
+    importador = ImportadorMasivo(materias, tamano_lote=tamano_lote, incremental=incremental)
+    importador.importar(registros)
+    return importador
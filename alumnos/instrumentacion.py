@@ -0,0 +1,175 @@
+# alumnos/instrumentacion.py
+"""Instrumentación ligera de las vistas del alumno.
+
+Con INSTRUMENTACION_ACTIVA = False (por defecto) el decorador solo asigna un
+objeto nulo a request.medicion y las secciones no miden nada.
+
+Activa, cada solicitud registra:
+  - tiempo total y por sección (p. ej. 'calculo' y 'render'),
+  - número de consultas y tiempo total en la BD (execute_wrapper en todas las
+    conexiones: las lecturas pueden ir a una réplica, ver calificaciones.replicas),
+y se guarda en un buffer circular en memoria del proceso. Las solicitudes que
+superan INSTRUMENTACION_UMBRAL_MS además se envían al logger como WARNING.
+
+La medición viaja en una ContextVar y una envoltura fija de cada conexión del
+hilo la encuentra. En las vistas asíncronas las consultas corren en el hilo de
+sync_to_async de la solicitud, con otras conexiones: la envoltura se instala ahí.
+"""
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_registros = deque(maxlen=getattr(settings, 'INSTRUMENTACION_TAMANO', 200))
+_candado = threading.Lock()
+_medicion_actual = ContextVar('medicion', default=None)
+
+
+def activa():
+    return getattr(settings, 'INSTRUMENTACION_ACTIVA', False)
+
+
+class MedicionNula:
+    """Se usa cuando la instrumentación está apagada: no mide nada"""
+    _contexto = nullcontext()
+
+    def seccion(self, nombre):
+        return self._contexto
+
+
+MEDICION_NULA = MedicionNula()
+
+
+class Medicion:
+    """Tiempos y consultas de una solicitud"""
+
+    def __init__(self, vista, ruta):
+        self.vista = vista
+        self.ruta = ruta
+        self.secciones = {}
+        self.consultas = 0
+        self.db_ms = 0.0
+
+    @contextmanager
+    def seccion(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            transcurrido = (time.perf_counter() - inicio) * 1000
+            self.secciones[nombre] = self.secciones.get(nombre, 0.0) + transcurrido
+
+    def __call__(self, execute, sql, params, many, context):
+        """Envoltura de consultas (execute_wrapper)"""
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas += 1
+            self.db_ms += (time.perf_counter() - inicio) * 1000
+
+
+def registrar(registro):
+    with _candado:
+        _registros.append(registro)
+
+
+def registros_recientes(minimo_ms=0):
+    """Solicitudes recientes (más nuevas primero) con total_ms >= minimo_ms"""
+    with _candado:
+        registros = list(_registros)
+    return [r for r in reversed(registros) if r['total_ms'] >= minimo_ms]
+
+
+def limpiar_registros():
+    with _candado:
+        _registros.clear()
+
+
+def _medir_consulta(execute, sql, params, many, context):
+    """Envoltura fija de las conexiones: mide con la medición del contexto"""
+    medicion = _medicion_actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    return medicion(execute, sql, params, many, context)
+
+
+def _instalar_medidor():
+    # Corre en el hilo que hace las consultas (en las vistas asíncronas, el de sync_to_async).
+    # Todos los alias: el router puede mandar las lecturas a una réplica
+    for conexion in connections.all():
+        if _medir_consulta not in conexion.execute_wrappers:
+            conexion.execute_wrappers.append(_medir_consulta)
+
+
+def _terminar(medicion, respuesta, inicio):
+    total_ms = (time.perf_counter() - inicio) * 1000
+    registro = {
+        'fecha': timezone.now().isoformat(timespec='seconds'),
+        'vista': medicion.vista,
+        'ruta': medicion.ruta,
+        'estado': getattr(respuesta, 'status_code', None),
+        'total_ms': round(total_ms, 2),
+        'db_ms': round(medicion.db_ms, 2),
+        'consultas': medicion.consultas,
+        'secciones': {k: round(v, 2) for k, v in medicion.secciones.items()},
+    }
+    registrar(registro)
+    if total_ms >= getattr(settings, 'INSTRUMENTACION_UMBRAL_MS', 500):
+        logger.warning("Solicitud lenta: %s", registro)
+    else:
+        logger.debug("Solicitud: %s", registro)
+
+
+def instrumentar(vista):
+    """Decorador de vistas (síncronas o asíncronas): mide la solicitud si la instrumentación está activa"""
+    def decorador(funcion):
+        if iscoroutinefunction(funcion):
+            @functools.wraps(funcion)
+            async def envoltura_asincrona(request, *args, **kwargs):
+                if not activa():
+                    request.medicion = MEDICION_NULA
+                    return await funcion(request, *args, **kwargs)
+
+                medicion = Medicion(vista, request.path)
+                request.medicion = medicion
+                inicio = time.perf_counter()
+                token = _medicion_actual.set(medicion)
+                try:
+                    await sync_to_async(_instalar_medidor)()
+                    respuesta = await funcion(request, *args, **kwargs)
+                finally:
+                    _medicion_actual.reset(token)
+                _terminar(medicion, respuesta, inicio)
+                return respuesta
+            return envoltura_asincrona
+
+        @functools.wraps(funcion)
+        def envoltura(request, *args, **kwargs):
+            if not activa():
+                request.medicion = MEDICION_NULA
+                return funcion(request, *args, **kwargs)
+
+            medicion = Medicion(vista, request.path)
+            request.medicion = medicion
+            inicio = time.perf_counter()
+            token = _medicion_actual.set(medicion)
+            try:
+                _instalar_medidor()
+                respuesta = funcion(request, *args, **kwargs)
+            finally:
+                _medicion_actual.reset(token)
+            _terminar(medicion, respuesta, inicio)
+            return respuesta
+        return envoltura
+    return decorador
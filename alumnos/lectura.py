@@ -0,0 +1,95 @@
+# alumnos/lectura.py
+"""Lectura de hojas de Excel por bloques con openpyxl en modo solo lectura.
+
+pd.read_excel carga la hoja completa (y todo el libro) en memoria antes de
+devolver la primera fila. Aquí las filas se leen en streaming y se entregan
+en DataFrames de tamano_bloque filas, con las columnas ya normalizadas, así
+que la memoria depende del tamaño del bloque y no del de la hoja.
+
+Las celdas conservan el tipo de Python que devuelve openpyxl (vacías = NaN):
+a diferencia de pd.read_excel, una columna entera con celdas vacías no se
+convierte a float (p. ej. GRUPO 101 sigue siendo '101' y no '101.0'). Las
+columnas de calificación (Cxxxx_P1, ...) sí se convierten a numéricas cuando
+se puede, para que alumnos.calculos use su camino rápido.
+
+Con motor='calamine' las filas se leen con python-calamine (opcional, en Rust,
+unas diez veces más rápido que openpyxl). Calamine carga la hoja completa en
+memoria y devuelve los números enteros como float, así que solo se usa donde
+importa la velocidad y no el tipo exacto de la celda (alumnos.validacion).
+"""
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from .calculos import codigos_en_columnas
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # dependencia opcional
+    CalamineWorkbook = None
+
+TAMANO_BLOQUE = 2000
+
+# Motor más rápido disponible para leer hojas completas
+MOTOR_RAPIDO = 'calamine' if CalamineWorkbook is not None else 'openpyxl'
+
+
+def _bloque_a_dataframe(filas, columnas, columnas_calificacion):
+    df = pd.DataFrame(filas, columns=columnas, dtype=object)
+    for columna in columnas_calificacion:
+        df[columna] = df[columna].infer_objects()
+    return df
+
+
+def _filas_openpyxl(ruta, hoja):
+    libro = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        yield from libro[hoja].iter_rows(values_only=True)
+    finally:
+        libro.close()
+
+
+def _filas_calamine(ruta, hoja):
+    if CalamineWorkbook is None:
+        raise ImportError('Para motor="calamine" instala python-calamine')
+    libro = CalamineWorkbook.from_path(ruta)
+    try:
+        # Calamine devuelve '' en las celdas vacías; openpyxl, None
+        for fila in libro.get_sheet_by_name(hoja).iter_rows():
+            yield [None if valor == '' else valor for valor in fila]
+    finally:
+        libro.close()
+
+
+def leer_hoja_por_bloques(ruta, hoja, normalizar_columnas=None, tamano_bloque=TAMANO_BLOQUE, motor='openpyxl'):
+    """Genera DataFrames de hasta tamano_bloque filas de la hoja indicada.
+
+    normalizar_columnas recibe la lista de encabezados y devuelve los nombres
+    normalizados (p. ej. alumnos.hojas.normalizar_columnas)."""
+    filas = _filas_calamine(ruta, hoja) if motor == 'calamine' else _filas_openpyxl(ruta, hoja)
+    try:
+        encabezados = next(filas, None)
+        if encabezados is None:
+            return
+        columnas = [
+            f'Unnamed: {i}' if valor is None else valor
+            for i, valor in enumerate(encabezados)
+        ]
+        if normalizar_columnas is not None:
+            columnas = list(normalizar_columnas(columnas))
+        codigos = codigos_en_columnas(columnas)
+        columnas_calificacion = [c for c in columnas if isinstance(c, str) and c[:5] in codigos]
+
+        ancho = len(columnas)
+        bloque = []
+        for fila in filas:
+            # Sin dimensiones en el libro las filas pueden venir más cortas
+            fila = list(fila[:ancho]) + [None] * (ancho - len(fila))
+            bloque.append([np.nan if valor is None else valor for valor in fila])
+            if len(bloque) >= tamano_bloque:
+                yield _bloque_a_dataframe(bloque, columnas, columnas_calificacion)
+                bloque = []
+        if bloque:
+            yield _bloque_a_dataframe(bloque, columnas, columnas_calificacion)
+    finally:
+        filas.close()
@@ -0,0 +1,274 @@
+# alumnos/limites.py
+"""Límites del login del alumno: cubetas de fichas (token bucket) y descarte de carga.
+
+Dos cubetas por intento:
+  - por IP (LOGIN_LIMITE_IP): reintentos desde una misma dirección,
+  - por prefijo de matrícula (LOGIN_LIMITE_PREFIJO, los primeros
+    LOGIN_PREFIJO_LONGITUD caracteres): barridos de matrículas aunque vengan
+    de muchas direcciones.
+El formato es 'intentos/segundos': la cubeta guarda hasta `intentos` fichas y
+se vuelve a llenar en `segundos`. Solo los intentos fallidos (matrícula vacía o
+que no existe) gastan una ficha. Así un alumno que entra a la primera nunca
+cuenta.
+
+La cubeta de la IP se revisa antes de buscar la matrícula (sin consultas). La
+del prefijo no puede rechazar así: un barrido la agota para todo un bloque de
+alumnos reales. Con el prefijo agotado se busca la matrícula (una consulta por
+índice, sin plantilla) y solo las que no existen reciben 429.
+
+Además, con más de LOGIN_CONCURRENCIA_MAXIMA logins en curso en el proceso
+(sobre todo con ASGI, donde nada limita las solicitudes simultáneas) los que
+sobran se descartan sin llegar a la BD.
+
+Las respuestas rechazadas son 429 de texto con Retry-After, sin plantilla ni
+consultas. Por defecto las cubetas viven en la memoria del proceso; con
+LOGIN_LIMITE_COMPARTIDO = True se guardan en la caché de Django (compartida
+entre procesos con CACHE_BACKEND 'db' o 'file'). En la caché la lectura y la
+escritura de una cubeta no son atómicas: con mucha concurrencia se pueden
+colar algunos intentos de más, que para este uso basta.
+"""
+import functools
+import math
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .models import Alumno, normalizar_matricula
+
+_candado = threading.Lock()
+_limites = None
+
+
+def leer_limite(texto):
+    """'intentos/segundos' -> (capacidad, fichas por segundo)"""
+    intentos, segundos = texto.split('/')
+    intentos, segundos = int(intentos), float(segundos)
+    if intentos < 1 or segundos <= 0:
+        raise ValueError(f"Límite inválido: {texto!r} (formato 'intentos/segundos')")
+    return intentos, intentos / segundos
+
+
+class Cubetas:
+    """Cubetas de fichas por clave en la memoria del proceso.
+       Una cubeta llena equivale a no tenerla: esas se purgan cuando hay más de `maximo`"""
+
+    def __init__(self, capacidad, tasa, maximo=10000):
+        self.capacidad = capacidad
+        self.tasa = tasa
+        self.maximo = maximo
+        self._cubetas = {}  # clave: (fichas, instante)
+        self._candado = threading.Lock()
+
+    def _fichas(self, clave, ahora):
+        fichas, instante = self._cubetas.get(clave, (self.capacidad, ahora))
+        return min(self.capacidad, fichas + (ahora - instante) * self.tasa)
+
+    def espera(self, clave):
+        """Segundos hasta que la cubeta tenga una ficha (0 si ya la tiene)"""
+        with self._candado:
+            fichas = self._fichas(clave, time.monotonic())
+        return 0 if fichas >= 1 else (1 - fichas) / self.tasa
+
+    def cobrar(self, clave):
+        with self._candado:
+            ahora = time.monotonic()
+            fichas = self._fichas(clave, ahora)
+            self._cubetas.pop(clave, None)  # al final: las menos recientes quedan primero
+            self._cubetas[clave] = (max(fichas - 1, 0), ahora)
+            if len(self._cubetas) > self.maximo:
+                self._purgar(ahora)
+
+    def _purgar(self, ahora):
+        for clave in [c for c in self._cubetas if self._fichas(c, ahora) >= self.capacidad]:
+            del self._cubetas[clave]
+        while len(self._cubetas) > self.maximo:
+            del self._cubetas[next(iter(self._cubetas))]
+
+
+class CubetasCompartidas:
+    """Las mismas cubetas guardadas en la caché de Django (reloj de pared, común a los procesos)"""
+
+    def __init__(self, nombre, capacidad, tasa):
+        self.nombre = nombre
+        self.capacidad = capacidad
+        self.tasa = tasa
+        self.timeout = math.ceil(capacidad / tasa)  # después de eso estaría llena
+
+    def _fichas(self, clave, ahora):
+        fichas, instante = cache.get(f'limite:{self.nombre}:{clave}', (self.capacidad, ahora))
+        return min(self.capacidad, fichas + (ahora - instante) * self.tasa)
+
+    def espera(self, clave):
+        fichas = self._fichas(clave, time.time())
+        return 0 if fichas >= 1 else (1 - fichas) / self.tasa
+
+    def cobrar(self, clave):
+        ahora = time.time()
+        fichas = self._fichas(clave, ahora)
+        cache.set(f'limite:{self.nombre}:{clave}', (max(fichas - 1, 0), ahora), self.timeout)
+
+
+class Carga:
+    """Logins en curso en el proceso"""
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self.en_curso = 0
+        self._candado = threading.Lock()
+
+    def entrar(self):
+        with self._candado:
+            if self.en_curso >= self.maximo:
+                return False
+            self.en_curso += 1
+            return True
+
+    def salir(self):
+        with self._candado:
+            self.en_curso -= 1
+
+
+class Limites:
+    """Cubetas y carga del login según la configuración"""
+
+    def __init__(self):
+        compartido = getattr(settings, 'LOGIN_LIMITE_COMPARTIDO', False)
+        self.compartido = compartido
+        self.cubetas = {}
+        for nombre, ajuste, defecto in (('ip', 'LOGIN_LIMITE_IP', '300/60'),
+                                         ('prefijo', 'LOGIN_LIMITE_PREFIJO', '60/60')):
+            capacidad, tasa = leer_limite(getattr(settings, ajuste, defecto))
+            self.cubetas[nombre] = (CubetasCompartidas(nombre, capacidad, tasa) if compartido
+                                    else Cubetas(capacidad, tasa))
+        self.carga = Carga(getattr(settings, 'LOGIN_CONCURRENCIA_MAXIMA', 16))
+        self.longitud_prefijo = getattr(settings, 'LOGIN_PREFIJO_LONGITUD', 6)
+        self.campo_ip = getattr(settings, 'LOGIN_IP_META', 'REMOTE_ADDR')
+
+    def claves(self, request):
+        """{cubeta: clave} del intento"""
+        # Detrás de un proxy (LOGIN_IP_META = 'HTTP_X_FORWARDED_FOR') la última dirección es la que agregó él;
+        # sin el encabezado se usa REMOTE_ADDR para no juntar a todos en la clave vacía
+        ip = request.META.get(self.campo_ip, '').rsplit(',', 1)[-1].strip()
+        claves = {'ip': ip or request.META.get('REMOTE_ADDR', '')}
+        prefijo = normalizar_matricula(request.POST.get('matricula'))[:self.longitud_prefijo]
+        if prefijo:
+            claves['prefijo'] = prefijo
+        return claves
+
+    def espera(self, claves, nombre):
+        """Segundos hasta que la cubeta `nombre` del intento tenga ficha (0 si no aplica)"""
+        return self.cubetas[nombre].espera(claves[nombre]) if nombre in claves else 0
+
+    def cobrar(self, claves):
+        for nombre, clave in claves.items():
+            self.cubetas[nombre].cobrar(clave)
+
+
+def limites():
+    """Límites vigentes en este proceso (se leen de settings en la primera llamada)"""
+    global _limites
+    if _limites is None:
+        with _candado:
+            if _limites is None:
+                _limites = Limites()
+    return _limites
+
+
+def reiniciar_limites():
+    """Olvida cubetas y configuración (pruebas, cambios de settings)"""
+    global _limites
+    with _candado:
+        _limites = None
+
+
+def demasiados_intentos(espera):
+    """429 sin plantilla: el navegador (o el script) sabe cuándo volver"""
+    segundos = max(1, math.ceil(espera))
+    respuesta = HttpResponse(
+        f"Demasiados intentos de inicio de sesión. Intenta de nuevo en {segundos} s.",
+        status=429, content_type='text/plain; charset=utf-8',
+    )
+    respuesta['Retry-After'] = str(segundos)
+    return respuesta
+
+
+def _revisar(request):
+    """(claves, respuesta 429 o None) antes de buscar la matrícula: solo la cubeta de la IP"""
+    actuales = limites()
+    claves = actuales.claves(request)
+    espera = actuales.espera(claves, 'ip')
+    return claves, (demasiados_intentos(espera) if espera else None)
+
+
+def _consulta_matricula(request):
+    return Alumno.objects.filter(matricula_normalizada=normalizar_matricula(request.POST.get('matricula')))
+
+
+def _rechazo_por_prefijo(claves, existe):
+    """429 si el prefijo está agotado y la matrícula no existe (el intento se cobra)"""
+    if existe:
+        return None
+    limites().cobrar(claves)
+    return demasiados_intentos(limites().espera(claves, 'prefijo'))
+
+
+def _cobrar_si_fallo(claves, respuesta):
+    # El login exitoso redirige a la página de calificaciones; cualquier otra respuesta es un fallo
+    if respuesta.status_code != 302:
+        limites().cobrar(claves)
+
+
+def limitar_login(vista):
+    """Decorador de las vistas de login (síncrona o asíncrona): aplica los límites a los POST"""
+    if iscoroutinefunction(vista):
+        @functools.wraps(vista)
+        async def envoltura_asincrona(request, *args, **kwargs):
+            if request.method != 'POST' or not getattr(settings, 'LOGIN_LIMITES', True):
+                return await vista(request, *args, **kwargs)
+            carga = limites().carga
+            if not carga.entrar():
+                return demasiados_intentos(1)
+            try:
+                # En memoria son microsegundos; con la caché compartida puede haber E/S
+                compartido = limites().compartido
+                claves, rechazo = await sync_to_async(_revisar)(request) if compartido else _revisar(request)
+                if rechazo is None and (await sync_to_async(limites().espera)(claves, 'prefijo') if compartido
+                                        else limites().espera(claves, 'prefijo')):
+                    existe = await _consulta_matricula(request).aexists()
+                    rechazo = (await sync_to_async(_rechazo_por_prefijo)(claves, existe) if compartido
+                               else _rechazo_por_prefijo(claves, existe))
+                if rechazo is not None:
+                    return rechazo
+                respuesta = await vista(request, *args, **kwargs)
+                if compartido:
+                    await sync_to_async(_cobrar_si_fallo)(claves, respuesta)
+                else:
+                    _cobrar_si_fallo(claves, respuesta)
+                return respuesta
+            finally:
+                carga.salir()
+        return envoltura_asincrona
+
+    @functools.wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        if request.method != 'POST' or not getattr(settings, 'LOGIN_LIMITES', True):
+            return vista(request, *args, **kwargs)
+        carga = limites().carga
+        if not carga.entrar():
+            return demasiados_intentos(1)
+        try:
+            claves, rechazo = _revisar(request)
+            if rechazo is None and limites().espera(claves, 'prefijo'):
+                rechazo = _rechazo_por_prefijo(claves, _consulta_matricula(request).exists())
+            if rechazo is not None:
+                return rechazo
+            respuesta = vista(request, *args, **kwargs)
+            _cobrar_si_fallo(claves, respuesta)
+            return respuesta
+        finally:
+            carga.salir()
+    return envoltura
@@ -0,0 +1,208 @@
+# alumnos/management/commands/_importacion.py
+"""Base de los comandos de importación: cada comando solo declara qué hojas del libro importa (hojas)"""
+import json
+import os
+import time
+from collections import Counter
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from alumnos.hojas import FORMATOS
+from alumnos.importacion import importar_libro
+from alumnos.lectura import TAMANO_BLOQUE
+from alumnos.validacion import validar_libro
+
+class ComandoImportacion(BaseCommand):
+    help = 'Importa datos desde el archivo Excel PRUEBA CALIFICACIONES WEB.xlsx'
+    # Hojas (claves de FORMATOS) que puede importar el comando; cada subclase las declara
+    hojas = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.hojas:
+            raise ImproperlyConfigured(f'{type(self).__module__} debe declarar las hojas que importa')
+        desconocidas = [hoja for hoja in self.hojas if hoja not in FORMATOS]
+        if desconocidas:
+            raise ImproperlyConfigured(f"Hojas sin formato en alumnos.hojas.FORMATOS: {', '.join(desconocidas)}")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'archivo_excel',
+            nargs='?',
+            type=str,
+            default='PRUEBA CALIFICACIONES WEB.xlsx',
+            help='Ruta del archivo Excel a importar'
+        )
+        parser.add_argument(
+            '--test',
+            action='store_true',
+            help='Modo prueba: valida el archivo completo sin tocar la BD (termina con error si hay errores)'
+        )
+        parser.add_argument(
+            '--validar',
+            action='store_true',
+            help='Valida el archivo completo antes de importar y no importa nada si tiene errores'
+        )
+        parser.add_argument(
+            '--reporte',
+            type=str,
+            default='',
+            help='Guarda el reporte de validación (JSON) en esta ruta'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Límite de registros a procesar por hoja (0 para todos)'
+        )
+        parser.add_argument(
+            '--masivo',
+            action='store_true',
+            help='Obsoleto: la importación siempre es por lotes (se ignora con un aviso)'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Cantidad de alumnos por lote de escritura'
+        )
+        parser.add_argument(
+            '--streaming',
+            action='store_true',
+            help='Lee las hojas por bloques (openpyxl solo lectura), una tras otra; memoria acotada'
+        )
+        parser.add_argument(
+            '--bloque',
+            type=int,
+            default=TAMANO_BLOQUE,
+            help='Filas por bloque de lectura para el modo --streaming'
+        )
+        parser.add_argument(
+            '--procesos',
+            type=int,
+            default=None,
+            help='Procesos para leer las hojas en paralelo (por defecto una por hoja, hasta los núcleos disponibles)'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Importación delta: compara con la BD y solo escribe alumnos y calificaciones que cambiaron'
+        )
+
+    def hojas_a_importar(self, options):
+        """Hojas que importa esta ejecución (por defecto todas las declaradas)"""
+        return list(self.hojas)
+
+    def handle(self, *args, **options):
+        excel_path = options['archivo_excel']
+        modo_test = options['test']
+        limite = options['limit']
+        hojas = self.hojas_a_importar(options)
+        if options['masivo']:
+            self.stderr.write(self.style.WARNING(
+                'Aviso: --masivo está obsoleto y se ignora; la importación siempre es por lotes'
+            ))
+
+        self.stdout.write(f"Configuración:")
+        self.stdout.write(f"  Archivo: {excel_path}")
+        self.stdout.write(f"  Hojas: {', '.join(hojas)}")
+        self.stdout.write(f"  Modo test: {'SÍ' if modo_test else 'NO'}")
+        self.stdout.write(f"  Límite: {limite if limite > 0 else 'Todos'}")
+        self.stdout.write(f"  Lote: {options['lote']}")
+        self.stdout.write(f"  Streaming: {'SÍ (bloque ' + str(options['bloque']) + ')' if options['streaming'] else 'NO'}")
+        self.stdout.write(f"  Incremental: {'SÍ' if options['incremental'] else 'NO'}")
+
+        if not os.path.exists(excel_path):
+            self.stdout.write(self.style.ERROR(f'Archivo no encontrado: {excel_path}'))
+            return
+
+        if modo_test or options['validar']:
+            self.validar(excel_path, hojas, options['reporte'])
+            if modo_test:
+                self.stdout.write(self.style.SUCCESS('Modo prueba completado. No se guardó nada en la BD.'))
+                return
+
+        try:
+            inicio = time.perf_counter()
+            importados = importar_libro(
+                excel_path, hojas,
+                limite=limite,
+                tamano_lote=options['lote'],
+                procesos=options['procesos'],
+                streaming=options['streaming'],
+                tamano_bloque=options['bloque'],
+                incremental=options['incremental'],
+            )
+            totales = Counter()
+            for formato, importador in importados:
+                self.mostrar_estadisticas(formato, importador)
+                totales.update(importador.stats)
+            if options['incremental']:
+                self.mostrar_cambios(totales)
+            self.stdout.write(f"\nTiempo total: {time.perf_counter() - inicio:.2f} s")
+            self.stdout.write(self.style.SUCCESS('Importación completada exitosamente!'))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Error al importar: {str(e)}'))
+            import traceback
+            self.stdout.write(traceback.format_exc())
+
+    def mostrar_estadisticas(self, formato, importador):
+        stats = importador.stats
+        self.stdout.write(f"\n{'='*60}")
+        if stats['filas'] == 0:
+            self.stdout.write(self.style.WARNING(f"No hay datos válidos para procesar en la hoja {formato.nombre}"))
+            return
+        self.stdout.write(self.style.SUCCESS(f"ESTADÍSTICAS - {formato.nombre}"))
+        self.stdout.write(f"{'='*60}")
+        self.stdout.write(f"  ✓ Alumnos creados: {stats['alumnos_creados']}")
+        self.stdout.write(f"  ✓ Alumnos actualizados: {stats['alumnos_actualizados']}")
+        self.stdout.write(f"  ✓ Materias: {len(importador.nombres_materias)} ({stats['materias_creadas']} nuevas)")
+        self.stdout.write(f"  ✓ Calificaciones creadas: {stats['calificaciones_creadas']}")
+        self.stdout.write(f"  ✓ Calificaciones actualizadas: {stats['calificaciones_actualizadas']}")
+        if importador.incremental:
+            self.stdout.write(f"  ✓ Alumnos sin cambios: {stats['alumnos_sin_cambios']}")
+            self.stdout.write(f"  ✓ Calificaciones sin cambios: {stats['calificaciones_sin_cambios']}")
+        self.stdout.write(f"  ✓ Filas: {stats['filas']} escritas en {stats['segundos']:.2f} s "
+                          f"({importador.filas_por_segundo:.0f} filas/s)")
+
+    def mostrar_cambios(self, totales):
+        """Resumen de una línea de la importación delta (todas las hojas)"""
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write(self.style.SUCCESS(
+            f"CAMBIOS: {totales['alumnos_creados']} alumnos nuevos, "
+            f"{totales['alumnos_actualizados']} alumnos modificados, "
+            f"{totales['calificaciones_creadas']} calificaciones nuevas, "
+            f"{totales['calificaciones_actualizadas']} calificaciones cambiadas, "
+            f"{totales['alumnos_sin_cambios']} alumnos sin cambios"
+        ))
+
+    def validar(self, excel_path, hojas, ruta_reporte):
+        """Valida el libro completo; con errores termina el comando sin importar"""
+        inicio = time.perf_counter()
+        reporte = validar_libro(excel_path, hojas)
+        datos = reporte.como_dict()
+
+        self.stdout.write(f"\n{'='*60}")
+        self.stdout.write(f"VALIDACIÓN ({sum(reporte.filas.values())} filas en {time.perf_counter() - inicio:.2f} s)")
+        self.stdout.write(f"{'='*60}")
+        for tipo, cantidad in datos['resumen'].items():
+            self.stdout.write(f"  {tipo}: {cantidad}")
+        for problema in reporte.problemas[:20]:
+            ubicacion = f"{problema['hoja']}" + (f" fila {problema['fila']}" if problema['fila'] else '')
+            detalle = ', '.join(
+                f"{campo}={problema[campo]}" for campo in ('matricula', 'columna', 'valor', 'esperado')
+                if problema[campo] is not None
+            )
+            self.stdout.write(f"  [{problema['nivel']}] {problema['tipo']} - {ubicacion}: {detalle}")
+        if datos['errores'] + datos['avisos'] > 20:
+            self.stdout.write(f"  ... {datos['errores'] + datos['avisos'] - 20} más (ver --reporte)")
+
+        if ruta_reporte:
+            with open(ruta_reporte, 'w', encoding='utf-8') as archivo:
+                json.dump(datos, archivo, ensure_ascii=False, indent=2)
+            self.stdout.write(f"  Reporte guardado en {ruta_reporte}")
+
+        if not reporte.valido:
+            raise CommandError(f"El archivo tiene {datos['errores']} errores; no se importó nada")
+        self.stdout.write(self.style.SUCCESS(f"  Sin errores ({datos['avisos']} avisos)"))
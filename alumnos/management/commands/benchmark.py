@@ -0,0 +1,232 @@
+# alumnos/management/commands/benchmark.py
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+import django
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from alumnos.catalogo import invalidar_catalogo
+from alumnos.models import Alumno, Materia
+from alumnos.sinteticos import generar_libro, guardar_libro, repartir
+
+class Command(BaseCommand):
+    help = ('Suite de rendimiento: genera datos sintéticos en una BD desechable y mide los importadores, '
+            'login, calificaciones y los changelists del admin. Guarda los resultados en JSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tamanos',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 100000],
+            help='Cantidades de alumnos a probar'
+        )
+        parser.add_argument(
+            '--solicitudes',
+            type=int,
+            default=50,
+            help='Solicitudes a medir por vista'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Cantidad de alumnos por lote de escritura de los importadores (--lote de importar_*)'
+        )
+        parser.add_argument(
+            '--semilla',
+            type=int,
+            default=1,
+            help='Semilla de los datos sintéticos'
+        )
+        parser.add_argument(
+            '--salida',
+            type=str,
+            default='benchmark.json',
+            help='Archivo JSON de resultados'
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.directorio = tempfile.mkdtemp(prefix='benchmark_')
+        resultados = {
+            'fecha': timezone.now().isoformat(timespec='seconds'),
+            'commit': self.commit_actual(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'motor': connection.vendor,
+            'solicitudes': options['solicitudes'],
+            'tamanos': {},
+        }
+
+        # BD desechable (como la de las pruebas); en SQLite en disco para que se parezca a producción
+        nombre_anterior = connection.settings_dict['NAME']
+        if connection.vendor == 'sqlite':
+            connection.settings_dict['TEST']['NAME'] = os.path.join(self.directorio, 'benchmark.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=['testserver'],
+                STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+            ):
+                for tamano in sorted(options['tamanos']):
+                    self.stdout.write(f"\n=== {tamano} alumnos ===")
+                    resultados['tamanos'][str(tamano)] = self.medir_tamano(tamano)
+        finally:
+            connection.creation.destroy_test_db(nombre_anterior, verbosity=0)
+            shutil.rmtree(self.directorio, ignore_errors=True)
+
+        with open(options['salida'], 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f"\nResultados guardados en {options['salida']}"))
+
+    def commit_actual(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except Exception:
+            return None
+
+    def limpiar_datos(self):
+        """Borra lo que deja el tamaño anterior. Sin flush: el plan de estudios (MateriaPlan)
+           viene de una migración y los importadores lo necesitan"""
+        Alumno.objects.all().delete()  # calificaciones y resúmenes en cascada
+        Materia.objects.all().delete()
+        User.objects.filter(username='benchmark').delete()
+        Session.objects.all().delete()
+        invalidar_catalogo()
+        caches[settings.CALIFICACIONES_CACHE_ALIAS].clear()
+
+    def medir_tamano(self, tamano):
+        self.limpiar_datos()
+        resultado = {}
+
+        inicio = time.perf_counter()
+        hojas = generar_libro(tamano, semilla=self.options['semilla'])
+        ruta = os.path.join(self.directorio, f'sinteticos_{tamano}.xlsx')
+        guardar_libro(hojas, ruta)
+        resultado['generar_libro'] = {'segundos': round(time.perf_counter() - inicio, 3)}
+
+        por_hoja = repartir(tamano)
+        filas_excel = por_hoja['PRIMER SEMESTRE'] + por_hoja['TERCER SEMESTRE']
+        filas_quinto = por_hoja['QUINTO SEMESTRE DC'] + por_hoja['QUINTO SEMESTRE ILI']
+        lote = str(self.options['lote'])
+        # Primera carga (inserciones), hoja por hoja en un solo proceso
+        resultado['importar_excel'] = self.medir_comando(
+            'importar_excel', filas_excel, ruta, '--procesos', '1', '--lote', lote)
+        resultado['importar_quinto_semestre'] = self.medir_comando(
+            'importar_quinto_semestre', filas_quinto, ruta, '--procesos', '1', '--lote', lote)
+        # Recargas del libro completo (actualizaciones): hojas en paralelo y por bloques
+        resultado['importar_libro_paralelo'] = self.medir_comando(
+            'importar_libro', tamano, ruta, '--lote', lote)
+        resultado['importar_libro_streaming'] = self.medir_comando(
+            'importar_libro', tamano, ruta, '--streaming', '--lote', lote)
+        # Recarga del mismo libro en modo delta: no debería escribir nada
+        resultado['importar_libro_incremental'] = self.medir_comando(
+            'importar_libro', tamano, ruta, '--incremental', '--lote', lote)
+
+        resultado.update(self.medir_vistas())
+        resultado.update(self.medir_admin())
+        return resultado
+
+    def medir_comando(self, nombre, filas, *argumentos):
+        salida = io.StringIO()
+        inicio = time.perf_counter()
+        call_command(nombre, *argumentos, stdout=salida)
+        segundos = time.perf_counter() - inicio
+        if 'Error al importar' in salida.getvalue():
+            raise CommandError(f"{nombre} falló:\n{salida.getvalue()[-2000:]}")
+        datos = {
+            'segundos': round(segundos, 3),
+            'filas': filas,
+            'filas_por_segundo': round(filas / segundos, 1) if segundos else None,
+        }
+        opciones = ' '.join(a for a in argumentos if a.startswith('--') and a != '--lote')
+        self.stdout.write(f"  {nombre} {opciones}: "
+                          f"{datos['segundos']} s ({datos['filas_por_segundo']} filas/s)")
+        return datos
+
+    def medir_vistas(self):
+        matriculas = list(Alumno.objects.values_list('matricula', flat=True))
+        muestra = random.Random(self.options['semilla']).sample(
+            matriculas, min(self.options['solicitudes'], len(matriculas)))
+        clientes = [Client() for _ in muestra]
+
+        login = []
+        for cliente, matricula in zip(clientes, muestra):
+            login.append(self.cronometrar(lambda: cliente.post('/login/', {'matricula': matricula})))
+        # Primera visita de cada alumno: sin caché; la segunda ya sale de la caché
+        fria = [self.cronometrar(lambda: cliente.get('/calificaciones/')) for cliente in clientes]
+        caliente = [self.cronometrar(lambda: cliente.get('/calificaciones/')) for cliente in clientes]
+
+        # Consultas por solicitud en una solicitud aparte (medirlas agrega costo al cronómetro)
+        cliente = Client()
+        consultas_login = self.contar_consultas(lambda: cliente.post('/login/', {'matricula': muestra[0]}))
+        caches[settings.CALIFICACIONES_CACHE_ALIAS].clear()
+        consultas_fria = self.contar_consultas(lambda: cliente.get('/calificaciones/'))
+        consultas_caliente = self.contar_consultas(lambda: cliente.get('/calificaciones/'))
+
+        return {
+            'login': self.resumen('login', login, consultas_login),
+            'calificaciones_sin_cache': self.resumen('calificaciones (sin caché)', fria, consultas_fria),
+            'calificaciones_con_cache': self.resumen('calificaciones (con caché)', caliente, consultas_caliente),
+        }
+
+    def medir_admin(self):
+        usuario = User.objects.create_superuser('benchmark', 'benchmark@example.com', 'benchmark')
+        cliente = Client()
+        cliente.force_login(usuario)
+        repeticiones = max(5, self.options['solicitudes'] // 5)
+
+        resultado = {}
+        # El tablero se mide sobre todo desde la caché: solo la primera solicitud agrega en la BD
+        for clave, url in (('admin_alumnos', '/admin/alumnos/alumno/'),
+                           ('admin_calificaciones', '/admin/alumnos/calificacion/'),
+                           ('tablero', '/estadisticas/?por=materia')):
+            tiempos = [self.cronometrar(lambda: cliente.get(url)) for _ in range(repeticiones)]
+            consultas = self.contar_consultas(lambda: cliente.get(url))
+            resultado[clave] = self.resumen(clave, tiempos, consultas)
+        return resultado
+
+    def cronometrar(self, solicitud):
+        inicio = time.perf_counter()
+        respuesta = solicitud()
+        if respuesta.status_code >= 400:
+            raise RuntimeError(f"La solicitud respondió {respuesta.status_code}")
+        return (time.perf_counter() - inicio) * 1000
+
+    def contar_consultas(self, solicitud):
+        with CaptureQueriesContext(connection) as consultas:
+            solicitud()
+        return len(consultas)
+
+    def resumen(self, nombre, tiempos, consultas):
+        ordenados = sorted(tiempos)
+        datos = {
+            'n': len(tiempos),
+            'mediana_ms': round(statistics.median(tiempos), 2),
+            'p95_ms': round(ordenados[max(int(len(ordenados) * 0.95) - 1, 0)], 2),
+            'maximo_ms': round(ordenados[-1], 2),
+            'consultas': consultas,
+        }
+        self.stdout.write(f"  {nombre}: mediana {datos['mediana_ms']} ms, p95 {datos['p95_ms']} ms, "
+                          f"{consultas} consultas")
+        return datos
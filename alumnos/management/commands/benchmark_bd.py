@@ -0,0 +1,143 @@
+# alumnos/management/commands/benchmark_bd.py
+import random
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from alumnos.models import Alumno, Calificacion, normalizar_matricula
+from calificaciones.postgresql_pool import cerrar_pools, estadisticas_pools
+
+# perfil: (descripción, cambios a la configuración de la BD)
+PERFILES = {
+    'directo': ('una conexión nueva por solicitud', {'CONN_MAX_AGE': 0}),
+    'persistente': ('una conexión por hilo (perfil de DATABASE_URL)', {'CONN_MAX_AGE': 600}),
+    'preparadas': ('una conexión por hilo con sentencias preparadas', {
+        'CONN_MAX_AGE': 600, 'OPTIONS': {'server_side_binding': True, 'prepare_threshold': 2},
+    }),
+    'pool': ('pool por proceso con sentencias preparadas (DB_POOL=True)', {
+        'ENGINE': 'calificaciones.postgresql_pool', 'CONN_MAX_AGE': 0,
+        'OPTIONS': {'server_side_binding': True, 'prepare_threshold': 2},
+    }),
+}
+
+class Command(BaseCommand):
+    help = ('Compara perfiles de conexión a PostgreSQL (DATABASE_URL) con varios hilos que repiten las '
+            'consultas de una visita del alumno: búsqueda de la matrícula, alumno con su resumen y sus '
+            'calificaciones. Entre solicitudes cada hilo hace lo que Django al terminar una '
+            '(close_if_unusable_or_obsolete)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--perfiles',
+            nargs='+',
+            choices=list(PERFILES),
+            default=list(PERFILES),
+            help='Perfiles a comparar'
+        )
+        parser.add_argument(
+            '--hilos',
+            type=int,
+            default=8,
+            help='Solicitudes simultáneas (hilos del proceso)'
+        )
+        parser.add_argument(
+            '--solicitudes',
+            type=int,
+            default=200,
+            help='Solicitudes por hilo'
+        )
+        parser.add_argument(
+            '--pool',
+            type=int,
+            default=4,
+            help='Conexiones máximas del pool (perfil pool)'
+        )
+        parser.add_argument(
+            '--semilla',
+            type=int,
+            default=1,
+            help='Semilla de la muestra de matrículas'
+        )
+
+    def handle(self, *args, **options):
+        base = connections['default']
+        if base.vendor != 'postgresql':
+            raise CommandError('Este benchmark requiere PostgreSQL (DATABASE_URL=postgres://...)')
+        alumnos = list(Alumno.objects.filter(calificaciones__isnull=False).distinct().values_list('matricula', flat=True))
+        if not alumnos:
+            raise CommandError('No hay alumnos con calificaciones (importa un libro o usa generar_datos)')
+        azar = random.Random(options['semilla'])
+        muestras = [[azar.choice(alumnos) for _ in range(options['solicitudes'])] for _ in range(options['hilos'])]
+
+        self.stdout.write(f"{options['hilos']} hilos x {options['solicitudes']} solicitudes")
+        self.stdout.write(f"{'perfil':<12} {'sol/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'conexiones':>11}  descripción")
+        for perfil in options['perfiles']:
+            descripcion, cambios = PERFILES[perfil]
+            alias = f'benchmark_{perfil}'
+            configuracion = {**base.settings_dict, 'ENGINE': 'django.db.backends.postgresql', **cambios}
+            configuracion['OPTIONS'] = {
+                clave: valor for clave, valor in base.settings_dict['OPTIONS'].items()
+                if clave not in ('pool', 'server_side_binding', 'prepare_threshold')
+            }
+            configuracion['OPTIONS'].update(cambios.get('OPTIONS', {}))
+            if perfil == 'pool':
+                configuracion['OPTIONS']['pool'] = {'min_size': options['pool'], 'max_size': options['pool']}
+            connections.settings[alias] = configuracion
+            try:
+                tiempos, duracion, abiertas = self.cargar(alias, muestras)
+                metricas = estadisticas_pools().get(alias)
+            finally:
+                cerrar_pools(alias)
+                del connections.settings[alias]
+
+            ordenados = sorted(tiempos)
+            self.stdout.write(f"{perfil:<12} {len(tiempos) / duracion:>8.1f} {statistics.median(tiempos):>9.2f} "
+                              f"{ordenados[min(int(len(ordenados) * 0.99), len(ordenados) - 1)]:>9.2f} "
+                              f"{abiertas:>11}  {descripcion}")
+            if metricas:
+                self.stdout.write(f"{'':<12} pool: {metricas['prestamos']} préstamos, {metricas['esperas']} esperas "
+                                  f"({metricas['espera_ms']} ms), {metricas['agotados']} agotados")
+
+    def cargar(self, alias, muestras):
+        """Un hilo por muestra. Devuelve (ms por solicitud, segundos, conexiones abiertas en el servidor)"""
+        tiempos = []
+        candado = threading.Lock()
+        inicio_carga = threading.Barrier(len(muestras) + 1)
+        fin_carga = threading.Barrier(len(muestras) + 1)
+        cierre = threading.Event()
+
+        def hilo(muestra):
+            conexion = connections[alias]
+            propios = []
+            inicio_carga.wait()
+            for matricula in muestra:
+                inicio = time.perf_counter()
+                alumno = Alumno.objects.using(alias).get(matricula_normalizada=normalizar_matricula(matricula))
+                Alumno.objects.using(alias).select_related('resumen').filter(matricula=alumno.matricula).first()
+                list(Calificacion.objects.using(alias).filter(alumno_id=alumno.id).select_related('materia'))
+                conexion.close_if_unusable_or_obsolete()  # fin de la solicitud
+                propios.append((time.perf_counter() - inicio) * 1000)
+            with candado:
+                tiempos.extend(propios)
+            fin_carga.wait()
+            cierre.wait()
+            conexion.close()
+
+        hilos = [threading.Thread(target=hilo, args=(muestra,)) for muestra in muestras]
+        for h in hilos:
+            h.start()
+        inicio_carga.wait()
+        inicio = time.perf_counter()
+        fin_carga.wait()
+        duracion = time.perf_counter() - inicio
+        # Conexiones del servidor a la BD (sin la de este hilo) antes de que los hilos cierren las suyas
+        with connections['default'].cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM pg_stat_activity WHERE datname = current_database() '
+                           'AND pid <> pg_backend_pid()')
+            abiertas = cursor.fetchone()[0]
+        cierre.set()
+        for h in hilos:
+            h.join()
+        return tiempos, duracion, abiertas
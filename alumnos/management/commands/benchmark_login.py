@@ -0,0 +1,90 @@
+# alumnos/management/commands/benchmark_login.py
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from alumnos.models import Alumno, normalizar_matricula
+
+class Command(BaseCommand):
+    help = ('Mide la búsqueda de matrícula del login con distintos tamaños de la tabla de alumnos. '
+            'Los alumnos de prueba se crean dentro de una transacción que se revierte al final')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tamanos',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 100000],
+            help='Cantidades de alumnos a probar (p. ej. --tamanos 1000 1000000)'
+        )
+        parser.add_argument(
+            '--consultas',
+            type=int,
+            default=200,
+            help='Búsquedas a medir por tamaño'
+        )
+        parser.add_argument(
+            '--comparar',
+            action='store_true',
+            help='Mide también la búsqueda anterior (matricula__iexact)'
+        )
+
+    def handle(self, *args, **options):
+        tamanos = sorted(options['tamanos'])
+        consultas = options['consultas']
+
+        with transaction.atomic():
+            creados = 0
+            ya_existentes = Alumno.objects.count()
+
+            self.stdout.write(f"{'alumnos':>10} {'mediana (µs)':>14} {'p95 (µs)':>10}"
+                              + (f" {'iexact mediana (µs)':>21}" if options['comparar'] else ''))
+            for tamano in tamanos:
+                faltan = tamano - ya_existentes - creados
+                if faltan > 0:
+                    self.crear_alumnos(creados, faltan)
+                    creados += faltan
+                if not creados:
+                    self.stdout.write(self.style.WARNING(f"{tamano:>10} ya hay más alumnos en la BD; se omite"))
+                    continue
+
+                # Matrículas en minúsculas para ejercitar la búsqueda sin distinguir mayúsculas
+                muestra = [self.matricula(random.randrange(creados)).lower() for _ in range(consultas)]
+                tiempos = self.medir(muestra, lambda m: Alumno.objects.get(
+                    matricula_normalizada=normalizar_matricula(m)))
+                linea = f"{tamano:>10} {statistics.median(tiempos):>14.1f} {self.p95(tiempos):>10.1f}"
+                if options['comparar']:
+                    anteriores = self.medir(muestra, lambda m: Alumno.objects.get(matricula__iexact=m))
+                    linea += f" {statistics.median(anteriores):>21.1f}"
+                self.stdout.write(linea)
+
+            plan = Alumno.objects.filter(matricula_normalizada='B00000000').explain()
+            self.stdout.write(f"\nPlan de la consulta:\n{plan}")
+
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS(f"\n{creados} alumnos de prueba revertidos"))
+
+    def matricula(self, i):
+        return f"B{i:08d}"
+
+    def crear_alumnos(self, inicio, cantidad, tamano_lote=5000):
+        for i in range(inicio, inicio + cantidad, tamano_lote):
+            fin = min(i + tamano_lote, inicio + cantidad)
+            Alumno.objects.bulk_create([
+                Alumno(matricula=self.matricula(n), matricula_normalizada=self.matricula(n),
+                       primer_nombre='PRUEBA')
+                for n in range(i, fin)
+            ])
+
+    def medir(self, muestra, buscar):
+        tiempos = []
+        for matricula in muestra:
+            inicio = time.perf_counter()
+            buscar(matricula)
+            tiempos.append((time.perf_counter() - inicio) * 1_000_000)
+        return tiempos
+
+    def p95(self, tiempos):
+        return sorted(tiempos)[int(len(tiempos) * 0.95) - 1]
@@ -0,0 +1,77 @@
+# alumnos/management/commands/benchmark_render.py
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+from django.test import override_settings
+from alumnos.models import Alumno, ResumenAlumno
+from alumnos.resumen import recalcular_resumenes
+from alumnos.views import construir_datos_calificaciones
+
+CARGADORES = ['django.template.loaders.filesystem.Loader', 'django.template.loaders.app_directories.Loader']
+
+class Command(BaseCommand):
+    help = ('Mide el tiempo de render de la plantilla de calificaciones (sin consultas ni caché de datos) '
+            'con el cargador de plantillas con caché y sin él, usando alumnos de la BD')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--alumnos',
+            type=int,
+            default=50,
+            help='Alumnos de la muestra'
+        )
+        parser.add_argument(
+            '--repeticiones',
+            type=int,
+            default=20,
+            help='Veces que se genera la página de cada alumno'
+        )
+        parser.add_argument(
+            '--semilla',
+            type=int,
+            default=1,
+            help='Semilla de la muestra'
+        )
+
+    def handle(self, *args, **options):
+        ids = list(Alumno.objects.filter(calificaciones__isnull=False).distinct().values_list('id', flat=True))
+        if not ids:
+            raise CommandError('No hay alumnos con calificaciones (importa un libro o usa generar_datos)')
+        muestra = random.Random(options['semilla']).sample(ids, min(options['alumnos'], len(ids)))
+        recalcular_resumenes(
+            set(muestra) - set(ResumenAlumno.objects.filter(alumno_id__in=muestra).values_list('alumno_id', flat=True))
+        )
+
+        # Los contextos se arman antes: solo se mide la plantilla
+        contextos = []
+        for alumno in Alumno.objects.filter(id__in=muestra).select_related('resumen'):
+            contextos.append({'alumno': alumno, **construir_datos_calificaciones(alumno, alumno.resumen)})
+
+        plantilla = dict(settings.TEMPLATES[0])
+        plantilla['APP_DIRS'] = False
+        modos = [
+            ('con caché', [('django.template.loaders.cached.Loader', CARGADORES)]),
+            ('sin caché', CARGADORES),
+        ]
+        self.stdout.write(f"{len(contextos)} alumnos x {options['repeticiones']} repeticiones")
+        self.stdout.write(f"{'cargador':<12} {'mediana (ms)':>13} {'p95 (ms)':>10} {'bytes':>8}")
+        for nombre, cargadores in modos:
+            configuracion = {**plantilla, 'OPTIONS': {**plantilla.get('OPTIONS', {}), 'loaders': cargadores}}
+            with override_settings(
+                TEMPLATES=[configuracion],
+                STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+            ):
+                render_to_string('alumnos/calificaciones.html', contextos[0])  # compilar una vez
+                tiempos = []
+                for _ in range(options['repeticiones']):
+                    for contexto in contextos:
+                        inicio = time.perf_counter()
+                        html = render_to_string('alumnos/calificaciones.html', contexto)
+                        tiempos.append((time.perf_counter() - inicio) * 1000)
+            ordenados = sorted(tiempos)
+            self.stdout.write(f"{nombre:<12} {statistics.median(tiempos):>13.3f} "
+                              f"{ordenados[max(int(len(ordenados) * 0.95) - 1, 0)]:>10.3f} {len(html):>8}")
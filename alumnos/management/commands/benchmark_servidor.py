@@ -0,0 +1,229 @@
+# alumnos/management/commands/benchmark_servidor.py
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from http.client import HTTPConnection
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.utils import get_random_secret_key
+from alumnos.models import Alumno
+from calificaciones.servidor import SERVIDORES
+
+
+class Command(BaseCommand):
+    help = ('Prueba de carga del portal del alumno servido por gunicorn con WSGI (sync) y con ASGI '
+            '(vistas async), con los mismos procesos: cada usuario entra con su matrícula y consulta '
+            'sus calificaciones varias veces. Reporta p50/p99 y solicitudes por segundo. Con --ataque, '
+            'otros clientes intentan matrículas inexistentes durante toda la prueba (en esa fila, '
+            'errores son los intentos que no recibieron 429). '
+            'Usa la BD de DATABASE_URL y requiere collectstatic; los clientes corren en esta misma '
+            'máquina y comparten los núcleos con el servidor')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--servidores',
+            nargs='+',
+            choices=SERVIDORES,
+            default=list(SERVIDORES),
+            help='Servidores a comparar'
+        )
+        parser.add_argument(
+            '--trabajadores',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Procesos de gunicorn (WEB_CONCURRENCY), iguales para los dos servidores'
+        )
+        parser.add_argument(
+            '--usuarios',
+            type=int,
+            default=32,
+            help='Usuarios simultáneos'
+        )
+        parser.add_argument(
+            '--solicitudes',
+            type=int,
+            default=20,
+            help='Consultas de calificaciones por usuario (después del login)'
+        )
+        parser.add_argument(
+            '--ataque',
+            type=int,
+            default=0,
+            help='Clientes que envían logins con matrículas inexistentes mientras dura la prueba'
+        )
+        parser.add_argument(
+            '--sin-limites',
+            action='store_true',
+            help='Desactiva los límites del login en el servidor (LOGIN_LIMITES=False)'
+        )
+        parser.add_argument(
+            '--sesiones',
+            default='signed_cookies',
+            choices=list(settings.SESSION_ENGINES),
+            help='SESSION_MODE de los servidores (con cookies firmadas el login no escribe en la BD)'
+        )
+        parser.add_argument(
+            '--puerto',
+            type=int,
+            default=8765,
+            help='Puerto local para el servidor'
+        )
+        parser.add_argument(
+            '--semilla',
+            type=int,
+            default=1,
+            help='Semilla de la muestra de matrículas'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not os.path.exists(os.path.join(settings.STATIC_ROOT, 'staticfiles.json')):
+            raise CommandError('Falta el manifiesto de estáticos: python manage.py collectstatic --noinput')
+        matriculas = list(Alumno.objects.filter(calificaciones__isnull=False).distinct().values_list(
+            'matricula', flat=True))
+        if not matriculas:
+            raise CommandError('No hay alumnos con calificaciones (importa un libro o usa generar_datos)')
+        azar = random.Random(options['semilla'])
+        muestra = [azar.choice(matriculas) for _ in range(options['usuarios'])]
+
+        self.stdout.write(f"{options['trabajadores']} procesos, {options['usuarios']} usuarios x "
+                          f"{options['solicitudes']} consultas, sesiones {options['sesiones']}, "
+                          f"{options['ataque']} atacantes, límites {'no' if options['sin_limites'] else 'sí'}")
+        self.stdout.write(f"{'servidor':<9} {'vista':<15} {'n':>6} {'p50 (ms)':>9} {'p99 (ms)':>9} "
+                          f"{'sol/s':>8} {'errores':>8}")
+        for servidor in options['servidores']:
+            proceso = self.iniciar(servidor, options)
+            try:
+                tiempos, errores, duracion = self.cargar(options['puerto'], muestra, options['solicitudes'],
+                                                         options['ataque'])
+            finally:
+                proceso.terminate()
+                proceso.wait(timeout=30)
+            total = len(tiempos['login']) + len(tiempos['calificaciones'])
+            for vista, lista in tiempos.items():
+                if not lista and vista == 'ataque':
+                    continue
+                self.stdout.write(f"{servidor:<9} {vista:<15} {len(lista):>6} {self.percentil(lista, 0.50):>9.1f} "
+                                  f"{self.percentil(lista, 0.99):>9.1f} {'':>8} {errores[vista]:>8}")
+            self.stdout.write(f"{servidor:<9} {'total':<15} {total:>6} {'':>9} {'':>9} {total / duracion:>8.1f}")
+
+    def iniciar(self, servidor, options):
+        """Arranca gunicorn con calificaciones.servidor y espera a que responda"""
+        entorno = {
+            **os.environ,
+            'SERVIDOR': servidor,
+            'WEB_CONCURRENCY': str(options['trabajadores']),
+            'PORT': str(options['puerto']),
+            'SESSION_MODE': options['sesiones'],
+            'LOGIN_LIMITES': str(not options['sin_limites']),
+            # Cada cliente se presenta con su propia dirección
+            'LOGIN_IP_META': 'HTTP_X_FORWARDED_FOR',
+            # Todos los procesos deben firmar igual (sesiones en cookie, CSRF)
+            'SECRET_KEY': os.environ.get('SECRET_KEY') or get_random_secret_key(),
+        }
+        proceso = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'python:calificaciones.servidor', '--log-level', 'warning'],
+            cwd=settings.BASE_DIR, env=entorno,
+        )
+        limite = time.monotonic() + 30
+        while time.monotonic() < limite:
+            if proceso.poll() is not None:
+                raise CommandError(f'gunicorn ({servidor}) terminó con código {proceso.returncode}')
+            try:
+                conexion = HTTPConnection('127.0.0.1', options['puerto'], timeout=2)
+                conexion.request('GET', '/login/')
+                if conexion.getresponse().status == 200:
+                    conexion.close()
+                    return proceso
+            except OSError:
+                pass
+            time.sleep(0.2)
+        proceso.terminate()
+        raise CommandError(f'gunicorn ({servidor}) no respondió en 30 s')
+
+    def cargar(self, puerto, muestra, solicitudes, atacantes=0):
+        """Un hilo por usuario (y por atacante), todos a la vez.
+           Devuelve ({vista: [ms]}, {vista: errores}, segundos que tardaron los usuarios)"""
+        tiempos = {'login': [], 'calificaciones': [], 'ataque': []}
+        errores = {'login': 0, 'calificaciones': 0, 'ataque': 0}
+        candado = threading.Lock()
+        salida = threading.Barrier(len(muestra) + atacantes + 1)
+        terminado = threading.Event()
+
+        def usuario(matricula, ip, atacante=False):
+            conexion = HTTPConnection('127.0.0.1', puerto, timeout=60)
+            cookies = SimpleCookie()
+            propios = {vista: [] for vista in tiempos}
+            fallos = {vista: 0 for vista in tiempos}
+
+            def pedir(vista, metodo, ruta, cuerpo=None, esperado=200):
+                encabezados = {'Cookie': '; '.join(f'{k}={m.value}' for k, m in cookies.items()),
+                               'X-Forwarded-For': ip}
+                if cuerpo is not None:
+                    encabezados['Content-Type'] = 'application/x-www-form-urlencoded'
+                inicio = time.perf_counter()
+                conexion.request(metodo, ruta, body=cuerpo, headers=encabezados)
+                respuesta = conexion.getresponse()
+                respuesta.read()
+                if vista:
+                    propios[vista].append((time.perf_counter() - inicio) * 1000)
+                    fallos[vista] += respuesta.status != esperado
+                for cookie in respuesta.headers.get_all('Set-Cookie') or ():
+                    cookies.load(cookie)
+
+            try:
+                try:
+                    pedir(None, 'GET', '/login/')  # cookie de CSRF
+                except Exception:
+                    salida.abort()
+                    raise
+                salida.wait()
+                if atacante:
+                    intento = 0
+                    while not terminado.is_set():
+                        intento += 1
+                        pedir('ataque', 'POST', '/login/', urlencode({
+                            'csrfmiddlewaretoken': cookies['csrftoken'].value, 'matricula': f'99{intento:07d}',
+                        }), esperado=429)
+                    return
+                pedir('login', 'POST', '/login/', urlencode({
+                    'csrfmiddlewaretoken': cookies['csrftoken'].value, 'matricula': matricula,
+                }), esperado=302)
+                for _ in range(solicitudes):
+                    pedir('calificaciones', 'GET', '/calificaciones/')
+            finally:
+                conexion.close()
+                with candado:
+                    for vista in tiempos:
+                        tiempos[vista].extend(propios[vista])
+                        errores[vista] += fallos[vista]
+
+        hilos = [threading.Thread(target=usuario, args=(matricula, f'10.1.{i // 250}.{i % 250 + 1}'))
+                 for i, matricula in enumerate(muestra)]
+        ataque = [threading.Thread(target=usuario, args=(None, f'10.99.{i // 250}.{i % 250 + 1}', True))
+                  for i in range(atacantes)]
+        for hilo in hilos + ataque:
+            hilo.start()
+        try:
+            salida.wait()
+        except threading.BrokenBarrierError:
+            raise CommandError('Un usuario no pudo abrir la página de login')
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - inicio
+        terminado.set()
+        for hilo in ataque:
+            hilo.join()
+        return tiempos, errores, duracion
+
+    def percentil(self, tiempos, p):
+        if not tiempos:
+            return 0.0
+        ordenados = sorted(tiempos)
+        return ordenados[min(int(len(ordenados) * p), len(ordenados) - 1)]
@@ -0,0 +1,71 @@
+# alumnos/management/commands/benchmark_sesiones.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from alumnos.models import Alumno
+
+class Command(BaseCommand):
+    help = ('Compara logins por segundo con cada modo de sesión (SESSION_MODE). '
+            'Los alumnos y sesiones de prueba se crean dentro de una transacción que se revierte al final')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--logins',
+            type=int,
+            default=500,
+            help='Logins a medir por modo'
+        )
+        parser.add_argument(
+            '--modos',
+            nargs='+',
+            choices=sorted(settings.SESSION_ENGINES),
+            default=['db', 'cached_db', 'cache', 'signed_cookies'],
+            help='Modos de sesión a comparar'
+        )
+
+    def handle(self, *args, **options):
+        logins = options['logins']
+
+        with transaction.atomic():
+            Alumno.objects.bulk_create([
+                Alumno(matricula=f"S{i:06d}", matricula_normalizada=f"S{i:06d}", primer_nombre='PRUEBA')
+                for i in range(logins)
+            ])
+
+            self.stdout.write(f"{'modo':>15} {'logins/s':>10} {'consultas sesión/login':>24} "
+                              f"{'consultas sesión/logout':>25}")
+            for modo in options['modos']:
+                with override_settings(SESSION_ENGINE=settings.SESSION_ENGINES[modo],
+                                       ALLOWED_HOSTS=['testserver']):
+                    self.medir_modo(modo, logins)
+
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS("\nDatos de prueba revertidos"))
+
+    def medir_modo(self, modo, logins):
+        clientes = [Client() for _ in range(logins)]
+
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            for i, cliente in enumerate(clientes):
+                respuesta = cliente.post('/login/', {'matricula': f"s{i:06d}"})
+                if respuesta.status_code != 302:
+                    self.stdout.write(self.style.ERROR(f"  Login fallido en modo {modo}"))
+                    return
+            segundos = time.perf_counter() - inicio
+        de_login = self.consultas_de_sesion(consultas)
+
+        with CaptureQueriesContext(connection) as consultas:
+            for cliente in clientes:
+                cliente.get('/logout/')
+        de_logout = self.consultas_de_sesion(consultas)
+
+        self.stdout.write(f"{modo:>15} {logins / segundos:>10.0f} {de_login / logins:>24.2f} "
+                          f"{de_logout / logins:>25.2f}")
+
+    def consultas_de_sesion(self, consultas):
+        return sum(1 for c in consultas.captured_queries if 'django_session' in c['sql'])
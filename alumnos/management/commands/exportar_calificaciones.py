@@ -0,0 +1,83 @@
+# alumnos/management/commands/exportar_calificaciones.py
+import time
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+from alumnos.exportacion import (
+    FORMATOS, TAMANO_LOTE, escribir_csv, escribir_parquet, escribir_xlsx, filas_calificaciones, formato_de_ruta,
+)
+from alumnos.models import Calificacion
+from calificaciones.replicas import lecturas_en_replica, replicas
+
+class Command(BaseCommand):
+    help = ('Exporta todas las calificaciones (con alumno y materia) a CSV, XLSX o Parquet, '
+            'leyendo y escribiendo por lotes con memoria constante')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'salida',
+            type=str,
+            help='Archivo a generar (.csv, .xlsx o .parquet)'
+        )
+        parser.add_argument(
+            '--formato',
+            choices=FORMATOS,
+            default=None,
+            help='Formato del archivo (por defecto según la extensión)'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANO_LOTE,
+            help='Filas por lote de lectura (y por row group en Parquet)'
+        )
+        parser.add_argument(
+            '--semestre',
+            type=str,
+            default='',
+            help='Solo alumnos de este semestre'
+        )
+        parser.add_argument(
+            '--grupo',
+            type=str,
+            default='',
+            help='Solo alumnos de este grupo'
+        )
+        parser.add_argument(
+            '--replica',
+            action='store_true',
+            help='Lee de una réplica (DATABASE_REPLICA_URLS) en lugar de la primaria'
+        )
+
+    def handle(self, *args, **options):
+        ruta = options['salida']
+        formato = options['formato'] or formato_de_ruta(ruta)
+        tamano_lote = options['lote']
+        if options['replica'] and not replicas():
+            raise CommandError('No hay réplicas configuradas (DATABASE_REPLICA_URLS)')
+
+        queryset = Calificacion.objects.all()
+        if options['semestre']:
+            queryset = queryset.filter(alumno__semestre=options['semestre'])
+        if options['grupo']:
+            queryset = queryset.filter(alumno__grupo=options['grupo'])
+        filas = filas_calificaciones(queryset, tamano_lote)
+
+        inicio = time.perf_counter()
+        # Las filas se leen mientras se escriben: todo el recorrido va dentro del bloque
+        try:
+            with lecturas_en_replica() if options['replica'] else nullcontext():
+                if formato == 'csv':
+                    with open(ruta, 'w', encoding='utf-8', newline='') as archivo:
+                        total = escribir_csv(filas, archivo, tamano_lote)
+                elif formato == 'xlsx':
+                    total = escribir_xlsx(filas, ruta)
+                else:
+                    total = escribir_parquet(filas, ruta, tamano_lote)
+        except ImportError as e:
+            raise CommandError(str(e))
+
+        segundos = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} calificaciones exportadas a {ruta} ({formato}) en {segundos:.2f} s"
+        ))
@@ -0,0 +1,64 @@
+# alumnos/management/commands/generar_datos.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from alumnos.sinteticos import HOJAS, cargar_en_bd, generar_libro, guardar_libro, repartir
+
+class Command(BaseCommand):
+    help = ('Genera alumnos sintéticos de PRIMERO, TERCERO y QUINTO DC/ILI: '
+            'un libro de Excel con el formato real y/o los datos directamente en la BD')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--alumnos',
+            type=int,
+            default=1000,
+            help='Total de alumnos (se reparten entre las cuatro hojas)'
+        )
+        parser.add_argument(
+            '--excel',
+            type=str,
+            default='',
+            help='Ruta del .xlsx a generar'
+        )
+        parser.add_argument(
+            '--bd',
+            action='store_true',
+            help='Cargar los alumnos generados en la BD (modo masivo de los importadores)'
+        )
+        parser.add_argument(
+            '--semilla',
+            type=int,
+            default=1,
+            help='Semilla del generador (misma semilla = mismos datos)'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Tamaño de lote para la carga en la BD'
+        )
+
+    def handle(self, *args, **options):
+        if not options['excel'] and not options['bd']:
+            raise CommandError('Indica --excel RUTA, --bd o ambos')
+
+        total = options['alumnos']
+        for hoja, cantidad in repartir(total).items():
+            self.stdout.write(f"  {hoja}: {cantidad} alumnos")
+
+        inicio = time.perf_counter()
+        hojas = generar_libro(total, semilla=options['semilla'])
+        self.stdout.write(f"Datos generados en {time.perf_counter() - inicio:.2f} s")
+
+        if options['excel']:
+            inicio = time.perf_counter()
+            guardar_libro(hojas, options['excel'])
+            self.stdout.write(f"Libro guardado en {options['excel']} ({time.perf_counter() - inicio:.2f} s)")
+
+        if options['bd']:
+            inicio = time.perf_counter()
+            cargar_en_bd(hojas, tamano_lote=options['lote'])
+            self.stdout.write(f"Datos cargados en la BD ({time.perf_counter() - inicio:.2f} s)")
+
+        self.stdout.write(self.style.SUCCESS(f"{total} alumnos sintéticos en {len(HOJAS)} hojas"))
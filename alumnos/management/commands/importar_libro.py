@@ -0,0 +1,28 @@
+# alumnos/management/commands/importar_libro.py
+from django.core.management.base import CommandError
+from alumnos.hojas import FORMATOS, hojas_del_libro
+from ._importacion import ComandoImportacion
+
+class Command(ComandoImportacion):
+    help = ('Importa todas las hojas conocidas del archivo Excel (PRIMER, TERCER y QUINTO SEMESTRE DC/ILI), '
+            'leyéndolas en paralelo')
+
+    hojas = list(FORMATOS)
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--hojas',
+            nargs='+',
+            choices=self.hojas,
+            default=None,
+            help='Hojas a importar (por defecto todas las conocidas que tenga el libro)'
+        )
+
+    def hojas_a_importar(self, options):
+        if options['hojas']:
+            return options['hojas']
+        try:
+            return [hoja for hoja in hojas_del_libro(options['archivo_excel']) if hoja in self.hojas]
+        except FileNotFoundError:
+            raise CommandError(f"Archivo no encontrado: {options['archivo_excel']}")
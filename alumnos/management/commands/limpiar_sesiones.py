@@ -0,0 +1,44 @@
+# alumnos/management/commands/limpiar_sesiones.py
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+class Command(BaseCommand):
+    help = ('Borra por lotes las sesiones vencidas de la tabla django_session '
+            '(a diferencia de clearsessions, no hace un único DELETE sobre toda la tabla)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=1000,
+            help='Cantidad de sesiones a borrar por lote'
+        )
+        parser.add_argument(
+            '--pausa',
+            type=float,
+            default=0,
+            help='Segundos de espera entre lotes para no acaparar la BD'
+        )
+
+    def handle(self, *args, **options):
+        tamano_lote = options['lote']
+        ahora = timezone.now()
+
+        total = 0
+        while True:
+            claves = list(
+                Session.objects.filter(expire_date__lt=ahora).values_list('session_key', flat=True)[:tamano_lote]
+            )
+            if not claves:
+                break
+            borradas, _ = Session.objects.filter(session_key__in=claves).delete()
+            total += borradas
+            self.stdout.write(f"  {total} sesiones borradas...")
+            if options['pausa']:
+                time.sleep(options['pausa'])
+
+        restantes = Session.objects.count()
+        self.stdout.write(self.style.SUCCESS(f"{total} sesiones vencidas borradas; quedan {restantes}"))
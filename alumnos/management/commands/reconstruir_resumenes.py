@@ -0,0 +1,62 @@
+# alumnos/management/commands/reconstruir_resumenes.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from alumnos.models import Alumno, ResumenAlumno
+from alumnos.resumen import CAMPOS_RESUMEN, calcular_resumenes, guardar_resumenes
+
+class Command(BaseCommand):
+    help = 'Recalcula la tabla ResumenAlumno a partir de las calificaciones y corrige diferencias'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verificar',
+            action='store_true',
+            help='Solo reporta las diferencias, sin escribir en la BD'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Cantidad de alumnos por lote'
+        )
+
+    def handle(self, *args, **options):
+        solo_verificar = options['verificar']
+        tamano_lote = options['lote']
+        
+        alumno_ids = list(Alumno.objects.order_by('id').values_list('id', flat=True))
+        self.stdout.write(f"Revisando {len(alumno_ids)} alumnos (lotes de {tamano_lote})...")
+        
+        stats = {'faltantes': 0, 'diferentes': 0, 'correctos': 0}
+        for i in range(0, len(alumno_ids), tamano_lote):
+            lote = alumno_ids[i:i + tamano_lote]
+            calculados = calcular_resumenes(lote)
+            guardados = {
+                r['alumno_id']: r
+                for r in ResumenAlumno.objects.filter(alumno_id__in=lote).values('alumno_id', *CAMPOS_RESUMEN)
+            }
+            
+            por_corregir = {}
+            for alumno_id, datos in calculados.items():
+                guardado = guardados.get(alumno_id)
+                if guardado is None:
+                    stats['faltantes'] += 1
+                elif any(guardado[campo] != datos[campo] for campo in CAMPOS_RESUMEN):
+                    stats['diferentes'] += 1
+                else:
+                    stats['correctos'] += 1
+                    continue
+                por_corregir[alumno_id] = datos
+            
+            if por_corregir and not solo_verificar:
+                with transaction.atomic():
+                    guardar_resumenes(por_corregir)
+        
+        self.stdout.write(f"  Correctos: {stats['correctos']}")
+        self.stdout.write(f"  Faltantes: {stats['faltantes']}")
+        self.stdout.write(f"  Con diferencias: {stats['diferentes']}")
+        if solo_verificar:
+            self.stdout.write(self.style.WARNING('Modo verificación: no se escribió nada en la BD.'))
+        else:
+            corregidos = stats['faltantes'] + stats['diferentes']
+            self.stdout.write(self.style.SUCCESS(f'Resúmenes corregidos: {corregidos}'))
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0012_alter_calificacion_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenAlumno',
+            fields=[
+                ('alumno', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resumen', serialize=False, to='alumnos.alumno')),
+                ('suma_p1', models.DecimalField(decimal_places=1, default=0, max_digits=7)),
+                ('n_p1', models.PositiveIntegerField(default=0)),
+                ('suma_p2', models.DecimalField(decimal_places=1, default=0, max_digits=7)),
+                ('n_p2', models.PositiveIntegerField(default=0)),
+                ('suma_p3', models.DecimalField(decimal_places=1, default=0, max_digits=7)),
+                ('n_p3', models.PositiveIntegerField(default=0)),
+                ('suma_final', models.DecimalField(decimal_places=1, default=0, max_digits=7)),
+                ('n_final', models.PositiveIntegerField(default=0)),
+                ('promedio_final', models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=5, null=True)),
+                ('materias_contadas', models.PositiveIntegerField(default=0)),
+                ('materias_reprobadas', models.PositiveIntegerField(default=0)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Resumen de alumno',
+                'verbose_name_plural': 'Resúmenes de alumnos',
+            },
+        ),
+    ]
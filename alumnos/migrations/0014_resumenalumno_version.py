@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0013_resumenalumno'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumenalumno',
+            name='version',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:16
+
+from django.db import migrations, models
+
+
+def llenar_matricula_normalizada(apps, schema_editor):
+    # Misma regla que alumnos.models.normalizar_matricula (los modelos
+    # históricos no tienen las funciones del módulo)
+    Alumno = apps.get_model('alumnos', 'Alumno')
+    lote = []
+    for alumno in Alumno.objects.only('id', 'matricula').iterator(chunk_size=2000):
+        alumno.matricula_normalizada = (alumno.matricula or '').strip().upper()
+        lote.append(alumno)
+        if len(lote) == 2000:
+            Alumno.objects.bulk_update(lote, ['matricula_normalizada'])
+            lote = []
+    if lote:
+        Alumno.objects.bulk_update(lote, ['matricula_normalizada'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0014_resumenalumno_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alumno',
+            name='matricula_normalizada',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=20),
+        ),
+        migrations.RunPython(llenar_matricula_normalizada, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:50
+
+from django.db import migrations, models
+
+
+def materias_acreditadas(apps, schema_editor):
+    # Regla que estaba escrita en la vista: formación socioemocional (C1301 y
+    # C3303) no cuenta para el promedio y se muestra como 'A'
+    Materia = apps.get_model('alumnos', 'Materia')
+    Materia.objects.filter(codigo__in=['C1301', 'C3303']).update(cuenta_promedio=False, muestra_acreditada=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0015_alumno_matricula_normalizada'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='materia',
+            name='cuenta_promedio',
+            field=models.BooleanField(default=True, verbose_name='Cuenta para el promedio'),
+        ),
+        migrations.AddField(
+            model_name='materia',
+            name='muestra_acreditada',
+            field=models.BooleanField(default=False, verbose_name="Se muestra como 'A'"),
+        ),
+        migrations.RunPython(materias_acreditadas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:38
+
+from django.db import migrations, models
+
+# Plan de estudios que estaba escrito en alumnos.hojas (las materias de cada hoja del libro),
+# copiado aquí para que la migración no dependa del código: (semestre, carrera, [(código, nombre)])
+PLANES = [
+    ('PRIMERO', '', [
+        ('C1022', 'CIENCIAS NATURALES I'),
+        ('C1081', 'CIENCIAS SOCIALES I'),
+        ('C1041', 'CULTURA DIGITAL I'),
+        ('C1061', 'PENSAMIENTO MATEMÁTICO I'),
+        ('C1072', 'LENGUA Y COMUNICACIÓN I'),
+        ('C1111', 'LENGUAS INDÍGENAS I'),
+        ('C1071', 'INGLÉS I'),
+        ('C1083', 'PENSAMIENTO FILOSÓFICO Y HUMANIDADES I'),
+        ('C1181', 'LABORATORIO DE INVESTIGACIÓN'),
+        ('C1131', 'DESARROLLO COMUNITARIO I'),
+        ('C1301', 'FORMACIÓN SOCIOEMOCIONAL I'),
+    ]),
+    ('TERCERO', '', [
+        ('C3023', 'CIENCIAS NATURALES III'),
+        ('C3063', 'PENSAMIENTO MATEMÁTICO III'),
+        ('C3076', 'LENGUA Y COMUNICACIÓN III'),
+        ('C3113', 'LENGUAS INDÍGENAS III'),
+        ('C3075', 'INGLÉS III'),
+        ('C3085', 'PENSAMIENTO FILOSÓFICO Y HUMANIDADES III'),
+        ('C3122', 'DESARROLLO COMUNITARIO III'),
+        ('C3133', 'CULTURA DIGITAL III'),
+        ('C3231', 'CIENCIAS SOCIALES III'),
+        ('C3232', 'PROYECTO DE INVESTIGACIÓN'),
+        ('C3303', 'FORMACIÓN SOCIOEMOCIONAL III'),
+    ]),
+    ('QUINTO', 'DC', [
+        ('C5300', 'ORGANIZACIÓN PARA LA PRODUCCIÓN RURAL'),
+        ('C5301', 'FUNDAMENTOS PARA LA ADMINISTRACIÓN RURAL'),
+        ('C5302', 'SISTEMAS DE PRODUCCIÓN COMUNITARIA'),
+        ('C5303', 'EDUCACIÓN AMBIENTAL'),
+        ('C5024', 'MÉXICO EN LA HISTORIA UNIVERSAL'),
+        ('C5125', 'DERECHO DE LOS PUEBLOS INDÍGENAS'),
+        ('C5135', 'ECOLOGÍA'),
+        ('C5142', 'CÁLCULO INTEGRAL'),
+        ('C5262', 'PROYECTO I'),
+    ]),
+    ('QUINTO', 'ILI', [
+        ('C5100', 'EXPRESIÓN ORAL Y ESCRITA EN LENGUA INDÍGENA I'),
+        ('C5101', 'PRINCIPIOS BÁSICOS DE INTERPRETACIÓN'),
+        ('C5102', 'EXPRESIÓN ORAL Y ESCRITA EN ESPAÑOL I'),
+        ('C5103', 'ESPECIALIZACIÓN EN EL ÁMBITO JURÍDICO'),
+        ('C5024', 'MÉXICO EN LA HISTORIA UNIVERSAL'),
+        ('C5125', 'DERECHOS DE LOS PUEBLOS INDÍGENAS'),
+        ('C5135', 'ECOLOGÍA'),
+        ('C5142', 'CÁLCULO INTEGRAL'),
+        ('C5262', 'PROYECTO I'),
+    ]),
+]
+
+
+def cargar_planes(apps, schema_editor):
+    MateriaPlan = apps.get_model('alumnos', 'MateriaPlan')
+    MateriaPlan.objects.bulk_create([
+        MateriaPlan(semestre=semestre, carrera=carrera, codigo=codigo, nombre=nombre, orden=orden)
+        for semestre, carrera, materias in PLANES
+        for orden, (codigo, nombre) in enumerate(materias)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0016_materia_politica'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MateriaPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semestre', models.CharField(max_length=50)),
+                ('carrera', models.CharField(blank=True, default='', max_length=100)),
+                ('codigo', models.CharField(max_length=10)),
+                ('nombre', models.CharField(max_length=200)),
+                ('orden', models.PositiveSmallIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Materia del plan de estudios',
+                'verbose_name_plural': 'Plan de estudios',
+                'ordering': ['semestre', 'carrera', 'orden'],
+                'unique_together': {('semestre', 'carrera', 'codigo')},
+            },
+        ),
+        migrations.RunPython(cargar_planes, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,98 @@
 from django.db import models
 from decimal import Decimal, ROUND_HALF_UP
 
+# Materias que al darse de alta no cuentan para el promedio y se muestran como 'A'
+# (formación socioemocional). Después la regla se cambia en el admin.
+MATERIAS_ACREDITADAS = {'C1301', 'C3303'}
+
+def banderas_iniciales(codigo):
+    """Banderas de política con las que se crea una materia nueva"""
+    acreditada = codigo in MATERIAS_ACREDITADAS
+    return {'cuenta_promedio': not acreditada, 'muestra_acreditada': acreditada}
+
 class Materia(models.Model):
     codigo = models.CharField(max_length=10, unique=True)
     nombre = models.CharField(max_length=200)
     descripcion = models.TextField(blank=True, null=True)
+    # Política de la materia (alumnos.politica): se compila una vez por proceso
+    cuenta_promedio = models.BooleanField("Cuenta para el promedio", default=True)
+    muestra_acreditada = models.BooleanField("Se muestra como 'A'", default=False)
     
     def __str__(self):
         return f"{self.codigo} - {self.nombre}"
+    
+    def save(self, *args, alumnos_afectados=None, **kwargs):
+        """Con alumnos_afectados (un set) los alumnos a recalcular se agregan ahí en lugar de
+           recalcularse: quien guarda varias materias juntas recalcula una sola vez"""
+        if self._state.adding:
+            if self.codigo in MATERIAS_ACREDITADAS:
+                for campo, valor in banderas_iniciales(self.codigo).items():
+                    setattr(self, campo, valor)
+            cambio_politica = False
+        else:
+            anterior = Materia.objects.filter(pk=self.pk).values_list('cuenta_promedio', 'muestra_acreditada').first()
+            cambio_politica = anterior is not None and anterior != (self.cuenta_promedio, self.muestra_acreditada)
+        super().save(*args, **kwargs)
+        from .catalogo import invalidar_catalogo
+        invalidar_catalogo()
+        if cambio_politica:
+            # Cambian los promedios (cuenta_promedio) o lo que muestra la página (muestra_acreditada)
+            # de todos los alumnos que llevan la materia: el resumen recalculado trae una versión
+            # nueva, que invalida su página en caché y su ETag
+            alumno_ids = Calificacion.objects.filter(materia=self).values_list('alumno_id', flat=True).distinct()
+            if alumnos_afectados is not None:
+                alumnos_afectados.update(alumno_ids)
+                return
+            from .resumen import recalcular_resumenes
+            recalcular_resumenes(alumno_ids)
+
+    def delete(self, *args, **kwargs):
+        # Las calificaciones se borran en cascada sin pasar por Calificacion.delete: los resúmenes
+        # de quienes llevaban la materia se recalculan aquí (versión nueva para su página y su ETag)
+        alumno_ids = list(Calificacion.objects.filter(materia=self).values_list('alumno_id', flat=True).distinct())
+        resultado = super().delete(*args, **kwargs)
+        from .catalogo import invalidar_catalogo
+        from .resumen import recalcular_resumenes
+        invalidar_catalogo()
+        recalcular_resumenes(alumno_ids)
+        return resultado
+
+class MateriaPlan(models.Model):
+    """Plan de estudios: qué materias lleva cada semestre (y carrera), en el orden de la hoja.
+       Se relaciona con Materia por código (la materia puede crearse después, al importar).
+       Lo leen las importaciones y la página del alumno desde alumnos.catalogo"""
+    semestre = models.CharField(max_length=50)
+    # '' = todas las carreras del semestre (tronco común)
+    carrera = models.CharField(max_length=100, blank=True, default='')
+    codigo = models.CharField(max_length=10)
+    # Nombre con el que aparece la materia en este plan
+    nombre = models.CharField(max_length=200)
+    orden = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['semestre', 'carrera', 'codigo']
+        ordering = ['semestre', 'carrera', 'orden']
+        verbose_name = "Materia del plan de estudios"
+        verbose_name_plural = "Plan de estudios"
+
+    def __str__(self):
+        plan = f"{self.semestre} {self.carrera}".strip()
+        return f"{plan} - {self.codigo} {self.nombre}"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from .catalogo import invalidar_catalogo
+        invalidar_catalogo()
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        from .catalogo import invalidar_catalogo
+        invalidar_catalogo()
+        return resultado
+
+def normalizar_matricula(matricula):
+    """Forma canónica de la matrícula para búsquedas sin distinguir mayúsculas"""
+    return (matricula or '').strip().upper()
 
 class Alumno(models.Model):
     SEXO_CHOICES = [
@@ -16,6 +101,9 @@ class Alumno(models.Model):
     ]
     
     matricula = models.CharField(max_length=20, unique=True)
+    # Copia en mayúsculas de la matrícula: el login la busca con el índice
+    # (matricula__iexact no puede usarlo y recorre toda la tabla)
+    matricula_normalizada = models.CharField(max_length=20, db_index=True, editable=False, default='')
     primer_nombre = models.CharField(max_length=100, blank=True, null=True)
     segundo_nombre = models.CharField(max_length=100, blank=True, null=True)
     primer_apellido = models.CharField(max_length=100, blank=True, null=True)
@@ -30,6 +118,16 @@ class Alumno(models.Model):
     def __str__(self):
         return f"{self.matricula} - {self.nombre_completo()}"
     
+    def save(self, *args, **kwargs):
+        self.matricula_normalizada = normalizar_matricula(self.matricula)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'matricula' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'matricula_normalizada'}
+        super().save(*args, **kwargs)
+        # Mantener el resumen al día (lo crea para los alumnos nuevos y cambia su versión)
+        from .resumen import recalcular_resumenes
+        recalcular_resumenes([self.pk])
+    
     def nombre_completo(self):
         """Devuelve el nombre completo del alumno"""
         nombre = f"{self.primer_nombre}"
@@ -40,82 +138,45 @@ class Alumno(models.Model):
             nombre += f" {self.segundo_apellido}"
         return nombre.strip()
     
+    def _resumen_calculado(self):
+        """Sumas y cantidades de las materias que cuentan, leídas del ResumenAlumno
+           (sin consultas con select_related('resumen')). Sin resumen se calculan con
+           la misma función que lo mantiene"""
+        from .resumen import CAMPOS_RESUMEN, calcular_resumenes
+        try:
+            resumen = self.resumen
+        except ResumenAlumno.DoesNotExist:
+            return calcular_resumenes([self.pk]).get(self.pk)
+        return {campo: getattr(resumen, campo) for campo in CAMPOS_RESUMEN}
+    
+    def _promedio_parciales(self, *parciales):
+        datos = self._resumen_calculado()
+        if datos is None:
+            return None
+        suma = sum(datos[f'suma_{p}'] for p in parciales)
+        cantidad = sum(datos[f'n_{p}'] for p in parciales)
+        return float(suma) / cantidad if cantidad > 0 else None
+    
     @property
     def prom_1er_parcial_general(self):
-        """Promedio general del 1er parcial de todas sus materias"""
-        califs = self.calificaciones.all()
-        if not califs:
-            return None
-        
-        suma = 0
-        count = 0
-        for c in califs:
-            if c.p1 is not None:
-                suma += float(c.p1)
-                count += 1
-        
-        return suma / count if count > 0 else None
+        """Promedio general del 1er parcial de las materias que cuentan"""
+        return self._promedio_parciales('p1')
     
     @property
     def prom_2do_parcial_general(self):
-        """Promedio general del 1er y 2do parcial"""
-        califs = self.calificaciones.all()
-        if not califs:
-            return None
-        
-        suma = 0
-        count = 0
-        for c in califs:
-            if c.p1 is not None:
-                suma += float(c.p1)
-                count += 1
-            if c.p2 is not None:
-                suma += float(c.p2)
-                count += 1
-        
-        return suma / count if count > 0 else None
+        """Promedio general del 1er y 2do parcial de las materias que cuentan"""
+        return self._promedio_parciales('p1', 'p2')
     
     @property
     def prom_3er_parcial_general(self):
-        """Promedio general de los 3 parciales"""
-        califs = self.calificaciones.all()
-        if not califs:
-            return None
-        
-        suma = 0
-        count = 0
-        for c in califs:
-            for nota in [c.p1, c.p2, c.p3]:
-                if nota is not None:
-                    suma += float(nota)
-                    count += 1
-        
-        return suma / count if count > 0 else None
+        """Promedio general de los 3 parciales de las materias que cuentan"""
+        return self._promedio_parciales('p1', 'p2', 'p3')
     
     @property
     def prom_final_general(self):
-        """Promedio general de calificaciones finales (con precisión decimal)"""
-        califs = self.calificaciones.all()
-        if not califs:
-            return None
-        
-        suma = Decimal('0.0')
-        count = 0
-        
-        for c in califs:
-            if c.calificacion_final is not None and c.materia.codigo != 'C1301':
-                # Convertir a Decimal para precisión
-                suma += Decimal(str(c.calificacion_final))
-                count += 1
-        
-        if count == 0:
-            return None
-        
-        # Calcular promedio con Decimal
-        promedio = suma / Decimal(str(count))
-        
-        # Redondear a 2 decimales internamente
-        return promedio.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        """Promedio general de calificaciones finales (con precisión decimal, 2 decimales)"""
+        datos = self._resumen_calculado()
+        return datos['promedio_final'] if datos is not None else None
 
 class Calificacion(models.Model):
     alumno = models.ForeignKey(Alumno, on_delete=models.CASCADE, related_name='calificaciones')
@@ -180,7 +241,9 @@ class Calificacion(models.Model):
         # Redondear normalmente
         return Decimal(str(promedio)).quantize(Decimal('1'), rounding=ROUND_HALF_UP)
     
-    def save(self, *args, **kwargs):
+    def actualizar_calculados(self):
+        """Recalcula promedio_parciales y calificacion_final sin guardar.
+           La usan save() y la importación masiva (bulk_create/bulk_update)"""
         # Calcular promedio de parciales si hay al menos una nota
         if any([self.p1, self.p2, self.p3]):
             self.promedio_parciales = self.calcular_promedio_parciales()
@@ -188,8 +251,19 @@ class Calificacion(models.Model):
         # Calcular calificación final si hay promedio parciales y examen
         if self.promedio_parciales is not None and self.examen_final is not None:
             self.calificacion_final = self.calcular_calificacion_final()
-        
+    
+    def save(self, *args, **kwargs):
+        self.actualizar_calculados()
         super().save(*args, **kwargs)
+        from .resumen import recalcular_resumenes
+        recalcular_resumenes([self.alumno_id])
+    
+    def delete(self, *args, **kwargs):
+        alumno_id = self.alumno_id
+        resultado = super().delete(*args, **kwargs)
+        from .resumen import recalcular_resumenes
+        recalcular_resumenes([alumno_id])
+        return resultado
     
     @property
     def estado(self):
@@ -202,4 +276,61 @@ class Calificacion(models.Model):
         elif self.p1 is not None:
             return "En proceso"
         else:
-            return "Sin calificar"
\ No newline at end of file
+            return "Sin calificar"
+
+class ResumenAlumno(models.Model):
+    """Promedios precalculados de un alumno (tabla desnormalizada).
+       Se mantiene desde Calificacion.save, las importaciones masivas y el admin;
+       'reconstruir_resumenes' corrige cualquier diferencia."""
+    alumno = models.OneToOneField(Alumno, on_delete=models.CASCADE, primary_key=True, related_name='resumen')
+    
+    # Sumas exactas y cantidades de las materias que cuentan para promedios
+    suma_p1 = models.DecimalField(max_digits=7, decimal_places=1, default=0)
+    n_p1 = models.PositiveIntegerField(default=0)
+    suma_p2 = models.DecimalField(max_digits=7, decimal_places=1, default=0)
+    n_p2 = models.PositiveIntegerField(default=0)
+    suma_p3 = models.DecimalField(max_digits=7, decimal_places=1, default=0)
+    n_p3 = models.PositiveIntegerField(default=0)
+    suma_final = models.DecimalField(max_digits=7, decimal_places=1, default=0)
+    n_final = models.PositiveIntegerField(default=0)
+    
+    # Promedio final con 2 decimales (para ordenar y reportes)
+    promedio_final = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, db_index=True)
+    materias_contadas = models.PositiveIntegerField(default=0)
+    materias_reprobadas = models.PositiveIntegerField(default=0)
+    
+    # Cambia cada vez que se recalcula (llave de la caché de la página del alumno)
+    version = models.BigIntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Resumen de alumno"
+        verbose_name_plural = "Resúmenes de alumnos"
+    
+    def __str__(self):
+        return f"Resumen {self.alumno_id}"
+    
+    def _promedio(self, suma, cantidad):
+        if not cantidad:
+            return None
+        return Decimal(suma) / cantidad
+    
+    @property
+    def prom_1er_parcial(self):
+        """Promedio exacto de P1 de las materias que cuentan"""
+        return self._promedio(self.suma_p1, self.n_p1)
+    
+    @property
+    def prom_2do_parcial(self):
+        """Promedio exacto de P2 de las materias que cuentan"""
+        return self._promedio(self.suma_p2, self.n_p2)
+    
+    @property
+    def prom_3er_parcial(self):
+        """Promedio exacto de P3 de las materias que cuentan"""
+        return self._promedio(self.suma_p3, self.n_p3)
+    
+    @property
+    def prom_final(self):
+        """Promedio exacto de calificaciones finales de las materias que cuentan"""
+        return self._promedio(self.suma_final, self.n_final)
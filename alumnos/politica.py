@@ -0,0 +1,44 @@
+# alumnos/politica.py
+"""Política de materias: cuáles cuentan para los promedios y cuáles se muestran como 'A'.
+
+Las reglas son banderas de Materia (cuenta_promedio, muestra_acreditada) y
+se editan desde el admin. Se compilan junto con el catálogo de materias
+(alumnos.catalogo) en conjuntos inmutables de ids, de modo que la página del
+alumno, el admin, las propiedades de Alumno y las importaciones preguntan por
+materia_id sin comparar códigos ni consultar la BD en cada fila.
+
+Materia.save (y el alta masiva de materias de la importación) invalidan el
+catálogo; ver alumnos.catalogo para cómo se enteran los demás procesos.
+"""
+
+
+class PoliticaMaterias:
+    """Reglas compiladas de las materias (inmutable)"""
+    __slots__ = ('sin_promedio', 'acreditadas')
+
+    def __init__(self, sin_promedio=(), acreditadas=()):
+        object.__setattr__(self, 'sin_promedio', frozenset(sin_promedio))
+        object.__setattr__(self, 'acreditadas', frozenset(acreditadas))
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError('PoliticaMaterias es inmutable')
+
+    def cuenta(self, materia_id):
+        """La materia cuenta para los promedios del alumno"""
+        return materia_id not in self.sin_promedio
+
+    def acreditada(self, materia_id):
+        """La calificación final de la materia se muestra como 'A'"""
+        return materia_id in self.acreditadas
+
+
+def politica_materias():
+    """Política vigente en este proceso (la del catálogo de materias)"""
+    from .catalogo import catalogo_materias  # alumnos.catalogo importa PoliticaMaterias
+    return catalogo_materias().politica
+
+
+def invalidar_politica():
+    """Descarta la política compilada (con todo el catálogo); la siguiente llamada la vuelve a leer"""
+    from .catalogo import invalidar_catalogo
+    invalidar_catalogo()
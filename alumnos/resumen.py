@@ -0,0 +1,113 @@
+# alumnos/resumen.py
+"""Cálculo y mantenimiento de ResumenAlumno (promedios precalculados por alumno).
+
+calcular_resumenes es la única función que decide qué calificaciones entran
+en los promedios: la usan el resumen (y con él la página del alumno y el
+admin), las propiedades de Alumno y las importaciones. Las materias que no
+cuentan salen de la política compilada (alumnos.politica), así que el ciclo
+por calificación solo consulta un frozenset por materia_id.
+"""
+import time
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import invalidar_estadisticas
+from .models import Alumno, Calificacion, ResumenAlumno
+from .politica import politica_materias
+
+CAMPOS_RESUMEN = [
+    'suma_p1', 'n_p1', 'suma_p2', 'n_p2', 'suma_p3', 'n_p3',
+    'suma_final', 'n_final', 'promedio_final',
+    'materias_contadas', 'materias_reprobadas',
+]
+
+
+def calcular_resumen(calificaciones, politica=None):
+    """Calcula los campos de ResumenAlumno.
+
+    calificaciones es un iterable de tuplas (materia_id, p1, p2, p3, calificacion_final).
+    Las sumas se guardan exactas para que los promedios salgan idénticos a
+    los que calculaba la vista (suma / cantidad en Decimal)."""
+    sin_promedio = (politica or politica_materias()).sin_promedio
+    datos = {campo: 0 for campo in CAMPOS_RESUMEN}
+    for campo in ('suma_p1', 'suma_p2', 'suma_p3', 'suma_final'):
+        datos[campo] = Decimal('0.0')
+
+    for materia_id, p1, p2, p3, calificacion_final in calificaciones:
+        if materia_id in sin_promedio:
+            continue
+        datos['materias_contadas'] += 1
+        for nombre, nota in (('p1', p1), ('p2', p2), ('p3', p3), ('final', calificacion_final)):
+            if nota is not None:
+                datos[f'suma_{nombre}'] += nota
+                datos[f'n_{nombre}'] += 1
+        if calificacion_final is not None and calificacion_final < 6:
+            datos['materias_reprobadas'] += 1
+
+    if datos['n_final']:
+        promedio = datos['suma_final'] / datos['n_final']
+        datos['promedio_final'] = promedio.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    else:
+        datos['promedio_final'] = None
+    return datos
+
+
+def calcular_resumenes(alumno_ids):
+    """Promedios de uno o muchos alumnos (p. ej. un grupo completo) con dos consultas.
+       Devuelve {alumno_id: datos} para cada alumno existente"""
+    alumno_ids = list(alumno_ids)
+    politica = politica_materias()
+    por_alumno = {
+        alumno_id: [] for alumno_id in Alumno.objects.filter(id__in=alumno_ids).values_list('id', flat=True)
+    }
+    filas = Calificacion.objects.filter(alumno_id__in=alumno_ids).values_list(
+        'alumno_id', 'materia_id', 'p1', 'p2', 'p3', 'calificacion_final'
+    )
+    for alumno_id, *calificacion in filas:
+        por_alumno[alumno_id].append(calificacion)
+    return {
+        alumno_id: calcular_resumen(calificaciones, politica)
+        for alumno_id, calificaciones in por_alumno.items()
+    }
+
+
+def guardar_resumenes(resumenes):
+    """Escribe {alumno_id: datos} en ResumenAlumno (upsert cuando el motor lo soporta).
+       Cada escritura asigna una versión nueva, lo que invalida la caché del alumno
+       y las estadísticas del tablero"""
+    version = time.time_ns()
+    objetos = [
+        ResumenAlumno(alumno_id=alumno_id, version=version, **datos)
+        for alumno_id, datos in resumenes.items()
+    ]
+    if not objetos:
+        return
+    invalidar_estadisticas()
+    if connection.features.supports_update_conflicts_with_target:
+        ResumenAlumno.objects.bulk_create(
+            objetos,
+            update_conflicts=True,
+            unique_fields=['alumno'],
+            update_fields=CAMPOS_RESUMEN + ['version', 'fecha_actualizacion'],
+        )
+        return
+    ahora = timezone.now()
+    with transaction.atomic():
+        existentes = set(
+            ResumenAlumno.objects.filter(alumno_id__in=resumenes.keys()).values_list('alumno_id', flat=True)
+        )
+        ResumenAlumno.objects.bulk_create([o for o in objetos if o.alumno_id not in existentes])
+        for objeto in objetos:
+            if objeto.alumno_id in existentes:
+                ResumenAlumno.objects.filter(alumno_id=objeto.alumno_id).update(
+                    **resumenes[objeto.alumno_id], version=version, fecha_actualizacion=ahora
+                )
+
+
+def recalcular_resumenes(alumno_ids, tamano_lote=500):
+    """Recalcula y guarda el resumen de los alumnos indicados"""
+    alumno_ids = list(alumno_ids)
+    for i in range(0, len(alumno_ids), tamano_lote):
+        guardar_resumenes(calcular_resumenes(alumno_ids[i:i + tamano_lote]))
@@ -0,0 +1,108 @@
+# alumnos/sinteticos.py
+"""Datos sintéticos (libros de Excel y alumnos en la BD) para pruebas de rendimiento.
+
+Las hojas tienen el mismo formato que el archivo real de calificaciones:
+  - PRIMER SEMESTRE: columnas C1022P1, C1022P2, ... (sin separador)
+  - TERCER SEMESTRE: columnas 'C3023 P1', ... (con espacio)
+  - QUINTO SEMESTRE DC / ILI: columnas 'C5300\\nP1', ... (en ILI, C5262 usa PS/ES)
+Los códigos de materia salen del plan de estudios con alumnos.hojas.FORMATOS,
+igual que en los importadores, así que los datos generados siempre coinciden con
+lo que importan.
+"""
+import numpy as np
+import pandas as pd
+
+from .calculos import calificacion_final, promedio_parciales
+from .hojas import FORMATOS, normalizar_columnas, registros_de_bloques
+
+# hoja -> (separador de columnas, prefijo de matrícula, semestre del grupo)
+HOJAS = {
+    'PRIMER SEMESTRE': ('', 25, 1),
+    'TERCER SEMESTRE': (' ', 24, 3),
+    'QUINTO SEMESTRE DC': ('\n', 23, 5),
+    'QUINTO SEMESTRE ILI': ('\n', 33, 5),
+}
+
+APELLIDOS = ['HERNÁNDEZ', 'GARCÍA', 'MARTÍNEZ', 'LÓPEZ', 'GONZÁLEZ', 'PÉREZ', 'RODRÍGUEZ',
+             'SÁNCHEZ', 'RAMÍREZ', 'CRUZ', 'GÓMEZ', 'MÉNDEZ', 'SANTIAGO', 'JIMÉNEZ']
+NOMBRES = ['ANA', 'MARÍA', 'JOSÉ', 'JUAN', 'LUIS', 'CARLOS', 'GUADALUPE', 'FERNANDA',
+           'MIGUEL', 'ÁNGEL', 'SOFÍA', 'DANIEL', 'ITZEL', 'JESÚS']
+
+# Probabilidad de que una celda de calificación venga vacía
+PROBABILIDAD_VACIA = 0.08
+
+
+def materias_por_hoja():
+    """{hoja: {codigo: nombre}} según el plan de estudios, como en los importadores"""
+    from .importacion import materias_de_hojas
+
+    return materias_de_hojas(HOJAS)
+
+
+def repartir(total):
+    """Reparte el total de alumnos entre las hojas (el residuo va a las primeras)"""
+    base, residuo = divmod(total, len(HOJAS))
+    return {hoja: base + (1 if i < residuo else 0) for i, hoja in enumerate(HOJAS)}
+
+
+def _calificaciones(rng, cantidad):
+    """Columna de calificaciones en décimas (NaN = vacía), centrada en 8"""
+    decimas = np.clip(np.round(rng.normal(80, 13, cantidad)), 40, 100)
+    decimas[rng.random(cantidad) < PROBABILIDAD_VACIA] = np.nan
+    return decimas
+
+
+def generar_hoja(hoja, cantidad, materias, rng):
+    """DataFrame de una hoja con el formato del archivo real"""
+    formato = FORMATOS[hoja]
+    separador, prefijo, semestre = HOJAS[hoja]
+    columnas = {
+        'MATRÍCULA': prefijo * 10_000_000 + np.arange(1, cantidad + 1),
+        'PRIMER APELLIDO': rng.choice(APELLIDOS, cantidad),
+        'SEGUNDO APELLIDO': rng.choice(APELLIDOS, cantidad),
+        'NOMBRE (S)': np.char.add(np.char.add(rng.choice(NOMBRES, cantidad), ' '), rng.choice(NOMBRES, cantidad)),
+        'GRUPO': [f"{semestre}0{g}" for g in rng.integers(1, 7, cantidad)],
+        'SEXO': rng.choice(['H', 'M'], cantidad),
+    }
+    if formato.semestre is None:
+        columnas['SEMESTRE'] = 'QUINTO'
+
+    for codigo in materias:
+        p1, p2, p3, ef = (_calificaciones(rng, cantidad) for _ in range(4))
+        pp, _ = promedio_parciales(p1, p2, p3)
+        cf = calificacion_final(pp, ef)
+        # Materias con alias (ILI, PROYECTO I) traen PS/ES en lugar de PP/EF
+        tipo_pp, tipo_ef = ('PS', 'ES') if codigo in formato.alias else ('PP', 'EF')
+        for tipo, decimas in (('P1', p1), ('P2', p2), ('P3', p3), (tipo_pp, pp), (tipo_ef, ef), ('CF', cf)):
+            columnas[f"{codigo}{separador}{tipo}"] = decimas / 10
+    return pd.DataFrame(columnas)
+
+
+def generar_libro(total, semilla=1):
+    """Genera {hoja: DataFrame} con total alumnos repartidos entre las cuatro hojas"""
+    rng = np.random.default_rng(semilla)
+    materias = materias_por_hoja()
+    return {
+        hoja: generar_hoja(hoja, cantidad, materias[hoja], rng)
+        for hoja, cantidad in repartir(total).items()
+    }
+
+
+def guardar_libro(hojas, ruta):
+    """Escribe las hojas en un .xlsx que pueden leer importar_excel e importar_quinto_semestre"""
+    with pd.ExcelWriter(ruta, engine='openpyxl') as writer:
+        for hoja, df in hojas.items():
+            df.to_excel(writer, sheet_name=hoja, index=False)
+
+
+def cargar_en_bd(hojas, tamano_lote=500):
+    """Carga las hojas en la BD con el mismo motor que los comandos de importación"""
+    from .importacion import ImportadorMasivo
+
+    materias = materias_por_hoja()
+    for hoja, df in hojas.items():
+        df = df.copy()
+        df.columns = normalizar_columnas(df.columns)
+        ImportadorMasivo(materias[hoja], tamano_lote=tamano_lote).importar(
+            registros_de_bloques([df], FORMATOS[hoja], materias[hoja])
+        )
@@ -0,0 +1,135 @@
+# alumnos/tablero.py
+"""Estadísticas por grupo, semestre, carrera o materia para el tablero del personal.
+
+Todo se agrega en la BD con GROUP BY y conteos condicionales; Python solo
+arma las filas. Por alcance (dimensión + filtros) se hacen tres consultas:
+  - calificaciones: cuántas hay, con CF, aprobadas, reprobadas y promedios,
+  - histograma: calificaciones por (grupo, CF),
+  - alumnos: desde ResumenAlumno, cuántos y cuántos con alguna reprobada
+    (no aplica a la dimensión materia).
+Las materias que no cuentan para el promedio (alumnos.politica) se excluyen.
+
+El resultado se guarda en la caché con una llave que incluye la versión de
+las estadísticas (alumnos.cache), que cambia cada vez que se escriben
+resúmenes, es decir, con cualquier cambio de calificaciones.
+"""
+import hashlib
+
+from django.db.models import Avg, Count, Q
+
+from .cache import obtener_tablero, guardar_tablero, version_estadisticas
+from .models import Alumno, Calificacion, ResumenAlumno
+from .politica import politica_materias
+
+# dimensión: (campo de Calificacion, campo de ResumenAlumno, título)
+DIMENSIONES = {
+    'grupo': ('alumno__grupo', 'alumno__grupo', 'Grupo'),
+    'semestre': ('alumno__semestre', 'alumno__semestre', 'Semestre'),
+    'carrera': ('alumno__carrera', 'alumno__carrera', 'Carrera'),
+    'materia': ('materia__codigo', None, 'Materia'),
+}
+FILTROS = ('semestre', 'grupo', 'carrera')
+
+APROBATORIA = 6
+# Calificaciones finales posibles con la regla de Calificacion (<6 se guarda como 5)
+ESCALA = range(5, 11)
+
+
+def limpiar_filtros(filtros):
+    """Solo los filtros conocidos y con valor"""
+    return {nombre: valor for nombre, valor in (filtros or {}).items() if nombre in FILTROS and valor}
+
+
+def _en_cache(alcance, calcular):
+    """Resultado del alcance desde la caché (la llave lleva la versión de las estadísticas)"""
+    resumen = hashlib.md5(repr(alcance).encode('utf-8')).hexdigest()
+    clave = f"tablero:{version_estadisticas()}:{resumen}"
+    resultado = obtener_tablero(clave)
+    if resultado is None:
+        resultado = calcular()
+        guardar_tablero(clave, resultado)
+    return resultado
+
+
+def tablero(dimension='grupo', filtros=None):
+    """Filas del tablero desde la caché; si no están (o cambió la versión) se calculan"""
+    filtros = limpiar_filtros(filtros)
+    return _en_cache((dimension, sorted(filtros.items())), lambda: calcular_tablero(dimension, filtros))
+
+
+def opciones_filtros():
+    """{filtro: [valores]} para los selectores del tablero (una consulta, en caché)"""
+    def calcular():
+        opciones = {nombre: set() for nombre in FILTROS}
+        for fila in Alumno.objects.values_list(*FILTROS).distinct().order_by():
+            for nombre, valor in zip(FILTROS, fila):
+                if valor:
+                    opciones[nombre].add(valor)
+        return {nombre: sorted(valores) for nombre, valores in opciones.items()}
+    return _en_cache('opciones', calcular)
+
+
+def calcular_tablero(dimension='grupo', filtros=None):
+    """Filas del tablero para la dimensión, con los filtros {semestre, grupo, carrera} indicados"""
+    campo, campo_resumen, _ = DIMENSIONES[dimension]
+    por_alumno = {f'alumno__{nombre}': valor for nombre, valor in limpiar_filtros(filtros).items()}
+
+    calificaciones = Calificacion.objects.exclude(
+        materia_id__in=politica_materias().sin_promedio
+    ).filter(**por_alumno)
+    # En la dimensión materia el nombre va en el GROUP BY junto con el código (es único)
+    agrupar = [campo, 'materia__nombre'] if dimension == 'materia' else [campo]
+    agregados = calificaciones.values(*agrupar).annotate(
+        calificaciones=Count('id'),
+        con_final=Count('id', filter=Q(calificacion_final__isnull=False)),
+        aprobadas=Count('id', filter=Q(calificacion_final__gte=APROBATORIA)),
+        reprobadas=Count('id', filter=Q(calificacion_final__lt=APROBATORIA)),
+        promedio_final=Avg('calificacion_final'),
+        promedio_parciales=Avg('promedio_parciales'),
+    ).order_by(campo)
+
+    filas = {}
+    for datos in agregados:
+        clave = datos.pop(campo)
+        nombre = datos.pop('materia__nombre', None)
+        datos.update(
+            clave=clave,
+            etiqueta=f"{clave} {nombre}" if nombre else (clave or '(sin dato)'),
+            tasa_aprobacion=round(datos['aprobadas'] / datos['con_final'], 4) if datos['con_final'] else None,
+            histograma={},
+            alumnos=datos['calificaciones'] if dimension == 'materia' else None,
+            alumnos_con_reprobadas=datos['reprobadas'] if dimension == 'materia' else None,
+        )
+        filas[clave] = datos
+
+    # Histograma de CF (son enteros de 5 a 10) contado en la BD
+    histograma = calificaciones.filter(calificacion_final__isnull=False).values(
+        campo, 'calificacion_final'
+    ).annotate(n=Count('id')).order_by()
+    for datos in histograma:
+        fila = filas.get(datos[campo])
+        if fila is not None:
+            calificacion = int(datos['calificacion_final'])
+            fila['histograma'][calificacion] = fila['histograma'].get(calificacion, 0) + datos['n']
+
+    # Alumnos desde los resúmenes (una fila por alumno y materias_reprobadas ya contadas)
+    if campo_resumen is not None:
+        resumenes = ResumenAlumno.objects.filter(**por_alumno).values(campo_resumen).annotate(
+            alumnos=Count('alumno_id'),
+            con_reprobadas=Count('alumno_id', filter=Q(materias_reprobadas__gt=0)),
+        ).order_by()
+        for datos in resumenes:
+            fila = filas.get(datos[campo_resumen])
+            if fila is not None:
+                fila['alumnos'] = datos['alumnos']
+                fila['alumnos_con_reprobadas'] = datos['con_reprobadas']
+
+    for fila in filas.values():
+        conteos = fila['histograma']
+        maximo = max(conteos.values(), default=0)
+        fila['histograma'] = [
+            {'calificacion': calificacion, 'n': conteos.get(calificacion, 0),  # alto: % de la barra más alta
+             'alto': round(100 * conteos.get(calificacion, 0) / maximo) if maximo else 0}
+            for calificacion in sorted(set(ESCALA) | set(conteos))
+        ]
+    return list(filas.values())
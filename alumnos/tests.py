@@ -1,3 +1,1117 @@
-from django.test import TestCase
+import io
+import itertools
+import json
+import os
+import re
+import tempfile
+from datetime import timedelta
+from unittest import skipUnless
+from decimal import Decimal, ROUND_HALF_UP
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections, router, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from calificaciones import servidor
+from calificaciones.replicas import COOKIE_PRIMARIA, ReplicasMiddleware, lecturas_en_replica
+from calificaciones.postgresql_pool import estadisticas_pools
+from . import calculos, hojas, sinteticos
+from .management.commands._importacion import ComandoImportacion
+from .management.commands.benchmark import Command as Benchmark
+from .management.commands.importar_excel import Command as ImportarExcel
+from . import exportacion
+from .cache import estadisticas, reiniciar_estadisticas
+from .catalogo import CLAVE_VERSION, cargar_catalogo, catalogo_materias
+from .importacion import ImportadorMasivo, importar_libro, materias_de_hojas
+from .instrumentacion import limpiar_registros, registros_recientes
+from .lectura import leer_hoja_por_bloques
+from .limites import reiniciar_limites
+from .models import Alumno, Materia, MateriaPlan, Calificacion, ResumenAlumno
+from .politica import politica_materias
+from .resumen import recalcular_resumenes
+from .validacion import ERRORES, validar_libro
+from .views import construir_datos_calificaciones
+
+
+class ImportadorMasivoTests(TestCase):
+    materias = {'C1022': 'CIENCIAS NATURALES I', 'C1061': 'PENSAMIENTO MATEMÁTICO I'}
+
+    def registro(self, matricula, **calificaciones):
+        return {
+            'matricula': matricula,
+            'alumno': {'primer_nombre': 'ANA', 'primer_apellido': 'PÉREZ', 'semestre': 'PRIMERO'},
+            'calificaciones': calificaciones,
+        }
+
+    def test_calcula_igual_que_save(self):
+        valores = {'p1': Decimal('5.5'), 'p2': Decimal('6.5'), 'p3': Decimal('7.0'), 'examen_final': Decimal('6.5')}
+        ImportadorMasivo(self.materias).importar([self.registro('1001', C1022=valores)])
+
+        calificacion = Calificacion.objects.get(alumno__matricula='1001', materia__codigo='C1022')
+        esperado = Calificacion(**valores)
+        esperado.actualizar_calculados()
+        self.assertEqual(calificacion.promedio_parciales, esperado.promedio_parciales)
+        self.assertEqual(calificacion.calificacion_final, esperado.calificacion_final)
+
+    def test_actualiza_existentes_y_omite_materias_vacias(self):
+        materia = Materia.objects.create(codigo='C1022', nombre='CIENCIAS NATURALES I')
+        alumno = Alumno.objects.create(matricula='1002', primer_nombre='LUIS')
+        Calificacion.objects.create(alumno=alumno, materia=materia, p1=Decimal('9.0'))
+
+        importador = ImportadorMasivo(self.materias, tamano_lote=1)
+        importador.importar([
+            self.registro('1002', C1022={'p1': Decimal('4.0')}, C1061={'p1': None}),
+            self.registro('1003', C1061={'p1': Decimal('8.0'), 'examen_final': Decimal('9.0')}),
+        ])
+
+        self.assertEqual(importador.stats['alumnos_creados'], 1)
+        self.assertEqual(importador.stats['alumnos_actualizados'], 1)
+        self.assertEqual(importador.stats['calificaciones_creadas'], 1)
+        self.assertEqual(importador.stats['calificaciones_actualizadas'], 1)
+        self.assertEqual(Calificacion.objects.count(), 2)
+        self.assertEqual(Alumno.objects.get(matricula='1002').primer_nombre, 'ANA')
+        self.assertEqual(Calificacion.objects.get(alumno=alumno).promedio_parciales, Decimal('5.0'))
+
+    def test_incremental_solo_escribe_cambios(self):
+        registros = [
+            self.registro('1004', C1022={'p1': Decimal('8.0'), 'examen_final': Decimal('9.0')}),
+            self.registro('1005', C1022={'p1': Decimal('7.0')}, C1061={'p2': Decimal('6.0')}),
+        ]
+        ImportadorMasivo(self.materias).importar(registros)
+        fechas = dict(Calificacion.objects.values_list('id', 'fecha_actualizacion'))
+        versiones = dict(ResumenAlumno.objects.values_list('alumno_id', 'version'))
+
+        importador = ImportadorMasivo(self.materias, incremental=True)
+        with CaptureQueriesContext(connection) as consultas:
+            importador.importar(registros)
+        self.assertFalse([q for q in consultas.captured_queries if q['sql'].startswith(('INSERT', 'UPDATE'))])
+        self.assertEqual(importador.stats['alumnos_sin_cambios'], 2)
+        self.assertEqual(importador.stats['calificaciones_sin_cambios'], 3)
+
+        registros[1]['calificaciones']['C1061']['p2'] = Decimal('9.0')
+        importador = ImportadorMasivo(self.materias, incremental=True)
+        importador.importar(registros)
+        self.assertEqual(importador.stats['calificaciones_actualizadas'], 1)
+        self.assertEqual(importador.stats['alumnos_actualizados'], 0)
+        self.assertEqual(importador.stats['alumnos_sin_cambios'], 1)
+
+        cambiada = Calificacion.objects.get(alumno__matricula='1005', materia__codigo='C1061')
+        self.assertEqual(cambiada.p2, Decimal('9.0'))
+        self.assertNotEqual(cambiada.fecha_actualizacion, fechas[cambiada.id])
+        sin_cambios = Calificacion.objects.exclude(id=cambiada.id)
+        self.assertEqual({c.id: c.fecha_actualizacion for c in sin_cambios}, {c.id: fechas[c.id] for c in sin_cambios})
+        alumno_sin_cambios = Alumno.objects.get(matricula='1004').id
+        self.assertEqual(ResumenAlumno.objects.get(alumno_id=alumno_sin_cambios).version, versiones[alumno_sin_cambios])
+
+
+class CalculosVectorizadosTests(SimpleTestCase):
+    """Compara alumnos.calculos contra los métodos del modelo en todas las combinaciones de décimas"""
+    valores = [None] + [Decimal(d).scaleb(-1) for d in range(0, 101)]
+
+    @staticmethod
+    def a_decimas(valores):
+        return np.array([np.nan if v is None else float(v.scaleb(1)) for v in valores])
+
+    def test_promedio_parciales_todas_las_combinaciones(self):
+        combinaciones = list(itertools.product(self.valores, repeat=3))
+        p1, p2, p3 = (self.a_decimas(columna) for columna in zip(*combinaciones))
+        promedio, recalcula = calculos.promedio_parciales(p1, p2, p3)
+
+        calificacion = Calificacion()
+        for i, (v1, v2, v3) in enumerate(combinaciones):
+            calificacion.p1, calificacion.p2, calificacion.p3 = v1, v2, v3
+            esperado_recalcula = any([v1, v2, v3])
+            self.assertEqual(bool(recalcula[i]), esperado_recalcula)
+            if esperado_recalcula:
+                esperado = calificacion.calcular_promedio_parciales()
+                obtenido = calculos.decimas_a_calificacion(promedio[i])
+                if obtenido != esperado or str(obtenido) != str(esperado):
+                    self.fail(f'P1={v1} P2={v2} P3={v3}: {obtenido} != {esperado}')
+
+    def test_calificacion_final_todas_las_combinaciones(self):
+        combinaciones = list(itertools.product(self.valores, repeat=2))
+        promedio, examen = (self.a_decimas(columna) for columna in zip(*combinaciones))
+        final = calculos.calificacion_final(promedio, examen)
+
+        calificacion = Calificacion()
+        for i, (pp, ef) in enumerate(combinaciones):
+            calificacion.promedio_parciales, calificacion.examen_final = pp, ef
+            esperado = calificacion.calcular_calificacion_final()
+            obtenido = calculos.decimas_a_calificacion(final[i])
+            if obtenido != esperado or str(obtenido) != str(esperado):
+                self.fail(f'PP={pp} EF={ef}: {obtenido} != {esperado}')
+
+    def test_columna_a_decimas_igual_que_convertir_a_decimal(self):
+        convertir = hojas.convertir_a_decimal
+        celdas = [7.3, 7.25, 7.35, 6, '8,5', ' 9.0 ', '', 'abc', None, np.nan, 10.04999]
+        obtenidas = calculos.columna_a_decimas(pd.Series(celdas, dtype=object))
+        numericas = calculos.columna_a_decimas(pd.Series([7.3, 7.25, 7.35, 6.0, np.nan, 10.04999]))
+        for celda, decimas in zip(celdas, obtenidas):
+            self.assertEqual(calculos.decimas_a_decimal(decimas), convertir(celda), celda)
+        for celda, decimas in zip([7.3, 7.25, 7.35, 6.0, np.nan, 10.04999], numericas):
+            self.assertEqual(calculos.decimas_a_decimal(decimas), convertir(celda), celda)
+
+
+# En pruebas no existe el manifest de collectstatic
+sin_manifest = override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+
+
+@sin_manifest
+class AlumnoAdminTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        materias = [Materia.objects.create(codigo=codigo, nombre=codigo) for codigo in ('C1022', 'C1061', 'C1301')]
+        for i in range(5):
+            alumno = Alumno.objects.create(matricula=f'20{i}', primer_nombre='ANA', primer_apellido='PÉREZ')
+            for j, materia in enumerate(materias):
+                Calificacion.objects.create(
+                    alumno=alumno, materia=materia,
+                    p1=Decimal('6.5') + i, p2=Decimal('7.0') - j, p3=None if j == 1 else Decimal('8.5'),
+                    examen_final=Decimal('9.0') - i,
+                )
+
+    def test_promedios_con_la_politica_de_materias(self):
+        modelo_admin = admin.site._registry[Alumno]
+        request = RequestFactory().get('/admin/alumnos/alumno/')
+        for obj in modelo_admin.get_queryset(request):
+            # C1301 no cuenta para ningún promedio
+            califs = list(obj.calificaciones.exclude(materia__codigo='C1301'))
+            for columna, parciales in [
+                ('prom_1er_parcial_general', ['p1']),
+                ('prom_2do_parcial_general', ['p1', 'p2']),
+                ('prom_3er_parcial_general', ['p1', 'p2', 'p3']),
+            ]:
+                notas = [getattr(c, p) for c in califs for p in parciales if getattr(c, p) is not None]
+                esperado = (sum(notas) / len(notas)).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP)
+                self.assertEqual(getattr(modelo_admin, f'{columna}_display')(obj), str(esperado))
+            self.assertEqual(modelo_admin.prom_final_general_display(obj), f"{obj.prom_final_general:.1f}")
+            self.assertEqual(modelo_admin.prom_1er_parcial_general_display(obj),
+                             f"{Decimal(obj.prom_1er_parcial_general).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP)}")
+
+    def test_changelist_en_consultas_constantes(self):
+        def consultas():
+            with CaptureQueriesContext(connection) as capturadas:
+                response = self.client.get('/admin/alumnos/alumno/?o=9')
+            self.assertEqual(response.status_code, 200)
+            return len(capturadas)
+
+        antes = consultas()
+        for i in range(20):
+            Alumno.objects.create(matricula=f'30{i}')
+        self.assertEqual(consultas(), antes)
+
+    def test_banderas_de_varias_materias_recalculan_una_vez(self):
+        materias = list(Materia.objects.order_by('codigo'))
+        datos = {'form-TOTAL_FORMS': '3', 'form-INITIAL_FORMS': '3', '_save': 'Guardar'}
+        for i, materia in enumerate(materias):
+            datos[f'form-{i}-id'] = str(materia.pk)
+        # Solo C1301 cuenta para el promedio (antes contaban C1022 y C1061)
+        datos['form-2-cuenta_promedio'] = 'on'
+        with CaptureQueriesContext(connection) as capturadas:
+            response = self.client.post('/admin/alumnos/materia/', datos)
+        self.assertEqual(response.status_code, 302)
+        escrituras = [q for q in capturadas if 'alumnos_resumenalumno' in q['sql'] and not q['sql'].startswith('SELECT')]
+        self.assertEqual(len(escrituras), 1)
+        for calificacion in Calificacion.objects.filter(materia__codigo='C1301').select_related('alumno__resumen'):
+            self.assertEqual(calificacion.alumno.resumen.promedio_final, calificacion.calificacion_final)
+
+
+@sin_manifest
+class CalificacionAdminTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        self.materia = Materia.objects.create(codigo='C1022', nombre='CIENCIAS NATURALES I')
+        self.crear_calificaciones(0, 5)
+
+    def crear_calificaciones(self, desde, hasta):
+        for i in range(desde, hasta):
+            alumno = Alumno.objects.create(matricula=f'60{i:02d}')
+            Calificacion.objects.create(alumno=alumno, materia=self.materia, p1=Decimal('6.0'))
+
+    def guardar_lista(self, examen_final):
+        calificaciones = list(Calificacion.objects.order_by('pk'))
+        datos = {
+            'form-TOTAL_FORMS': str(len(calificaciones)),
+            'form-INITIAL_FORMS': str(len(calificaciones)),
+            '_save': 'Guardar',
+        }
+        for i, calificacion in enumerate(calificaciones):
+            datos.update({
+                f'form-{i}-id': str(calificacion.pk), f'form-{i}-p1': '9.0', f'form-{i}-p2': '8.0',
+                f'form-{i}-p3': '', f'form-{i}-examen_final': examen_final,
+            })
+        with CaptureQueriesContext(connection) as capturadas:
+            response = self.client.post('/admin/alumnos/calificacion/', datos)
+        return response, len(capturadas)
+
+    def test_changelist_en_consultas_constantes(self):
+        def consultas():
+            with CaptureQueriesContext(connection) as capturadas:
+                self.assertEqual(self.client.get('/admin/alumnos/calificacion/').status_code, 200)
+            return len(capturadas)
+
+        antes = consultas()
+        self.crear_calificaciones(5, 25)
+        self.assertEqual(consultas(), antes)
+
+    def test_guardado_masivo_recalcula_en_un_lote(self):
+        response, _ = self.guardar_lista('7.0')
+        self.assertEqual(response.status_code, 302)
+        for calificacion in Calificacion.objects.select_related('alumno__resumen'):
+            self.assertEqual((calificacion.promedio_parciales, calificacion.calificacion_final),
+                             (Decimal('9.0'), Decimal('8.0')))
+            self.assertEqual(calificacion.alumno.resumen.promedio_final, Decimal('8.00'))
+        self.assertEqual(LogEntry.objects.count(), 5)
+
+        # Las consultas no crecen con las filas de la página (la primera vez se lee el ContentType)
+        _, antes = self.guardar_lista('6.0')
+        self.crear_calificaciones(5, 25)
+        response, despues = self.guardar_lista('5.0')
+        self.assertEqual(despues, antes)
+        self.assertEqual(set(Calificacion.objects.values_list('calificacion_final', flat=True)), {Decimal('7.0')})
+
+    def test_un_error_no_guarda_ninguna_fila(self):
+        response, _ = self.guardar_lista('no')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Calificacion.objects.filter(p2__isnull=False).exists())
+
+
+class ResumenAlumnoTests(TestCase):
+    def setUp(self):
+        self.alumno = Alumno.objects.create(matricula='3001', semestre='TERCERO')
+        self.materias = {
+            codigo: Materia.objects.create(codigo=codigo, nombre=codigo)
+            for codigo in ('C3023', 'C3063', 'C3303', 'C1301')
+        }
+
+    def calificar(self, codigo, p1, examen_final):
+        return Calificacion.objects.create(
+            alumno=self.alumno, materia=self.materias[codigo], p1=Decimal(p1), examen_final=Decimal(examen_final)
+        )
+
+    def test_se_mantiene_con_save_y_delete(self):
+        self.calificar('C3023', '8.0', '9.0')
+        self.calificar('C3303', '4.0', '4.0')  # No cuenta en tercer semestre
+        reprobada = self.calificar('C3063', '5.0', '5.0')
+
+        resumen = ResumenAlumno.objects.get(alumno=self.alumno)
+        self.assertEqual(resumen.materias_contadas, 2)
+        self.assertEqual(resumen.materias_reprobadas, 1)
+        self.assertEqual(resumen.prom_1er_parcial, Decimal('6.5'))
+        self.assertEqual(resumen.promedio_final, Decimal('7.00'))
+
+        reprobada.delete()
+        resumen.refresh_from_db()
+        self.assertEqual(resumen.materias_contadas, 1)
+        self.assertEqual(resumen.materias_reprobadas, 0)
+        self.assertEqual(resumen.promedio_final, Decimal('9.00'))
+
+    def test_reconstruir_corrige_diferencias(self):
+        self.calificar('C3023', '8.0', '9.0')
+        ResumenAlumno.objects.filter(alumno=self.alumno).update(materias_contadas=7, promedio_final=1)
+        Calificacion.objects.filter(alumno=self.alumno).update(calificacion_final=Decimal('6.0'))
+
+        call_command('reconstruir_resumenes', stdout=io.StringIO())
+
+        resumen = ResumenAlumno.objects.get(alumno=self.alumno)
+        self.assertEqual(resumen.materias_contadas, 1)
+        self.assertEqual(resumen.promedio_final, Decimal('6.00'))
+
+    def test_propiedades_del_alumno_leen_el_resumen(self):
+        self.calificar('C3023', '8.0', '9.0')
+        self.calificar('C3063', '6.0', '7.0')
+        alumno = Alumno.objects.select_related('resumen').get(pk=self.alumno.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(alumno.prom_1er_parcial_general, 7.0)
+            self.assertEqual(alumno.prom_final_general, Decimal('8.00'))
+        # Sin fila de resumen se calcula igual
+        ResumenAlumno.objects.filter(alumno=self.alumno).delete()
+        self.assertEqual(Alumno.objects.get(pk=self.alumno.pk).prom_final_general, Decimal('8.00'))
+
+
+class PoliticaMateriasTests(TestCase):
+    def setUp(self):
+        self.alumno = Alumno.objects.create(matricula='3501', semestre='QUINTO')
+        self.materias = [Materia.objects.create(codigo=codigo, nombre=codigo) for codigo in ('C3023', 'C3303')]
+        for materia, final in zip(self.materias, ('8.0', '6.0')):
+            Calificacion.objects.create(alumno=self.alumno, materia=materia, p1=Decimal(final),
+                                        examen_final=Decimal(final))
+
+    def test_banderas_al_crear_e_importar(self):
+        self.assertEqual(politica_materias().sin_promedio, {self.materias[1].id})
+        ImportadorMasivo({'C1301': 'FORMACIÓN SOCIOEMOCIONAL I'}).cargar_materias()
+        c1301 = Materia.objects.get(codigo='C1301')
+        self.assertTrue(politica_materias().acreditada(c1301.id))
+        self.assertFalse(politica_materias().cuenta(c1301.id))
+
+    def test_cambiar_la_politica_recalcula_los_promedios(self):
+        # C3303 ya no depende del semestre del alumno
+        self.assertEqual(ResumenAlumno.objects.get(alumno=self.alumno).promedio_final, Decimal('8.00'))
+        self.assertEqual(self.alumno.prom_final_general, Decimal('8.00'))
+
+        materia = self.materias[1]
+        materia.cuenta_promedio = True
+        materia.save()
+        self.assertTrue(politica_materias().cuenta(materia.id))
+        self.assertEqual(ResumenAlumno.objects.get(alumno=self.alumno).promedio_final, Decimal('7.00'))
+        # Las propiedades leen el resumen guardado en la instancia
+        self.alumno.refresh_from_db()
+        self.assertEqual(self.alumno.prom_final_general, Decimal('7.00'))
+
+
+class CatalogoMateriasTests(TestCase):
+    def test_plan_de_estudios_de_la_migracion(self):
+        catalogo = cargar_catalogo()
+        self.assertEqual(len(catalogo.plan('PRIMERO')), 11)
+        ili = catalogo.plan('quinto', 'ili')
+        self.assertEqual(list(ili)[:2], ['C5100', 'C5101'])
+        self.assertEqual(ili['C5125'], 'DERECHOS DE LOS PUEBLOS INDÍGENAS')
+        self.assertEqual(catalogo.plan('QUINTO', 'DC')['C5125'], 'DERECHO DE LOS PUEBLOS INDÍGENAS')
+        with self.assertRaises(AttributeError):
+            catalogo.planes = {}
+
+    def test_materias_de_las_hojas_desde_el_plan(self):
+        materias = materias_de_hojas(['QUINTO SEMESTRE DC', 'QUINTO SEMESTRE ILI'])
+        # Dicts simples: viajan a los procesos hijos de importar_libro
+        self.assertIs(type(materias['QUINTO SEMESTRE ILI']), dict)
+        self.assertEqual(materias['QUINTO SEMESTRE ILI']['C5125'], 'DERECHOS DE LOS PUEBLOS INDÍGENAS')
+        self.assertNotIn('C5100', materias['QUINTO SEMESTRE DC'])
+
+        plan = MateriaPlan.objects.get(semestre='PRIMERO', carrera='', codigo='C1022')
+        plan.nombre = 'RENOMBRADA'
+        plan.save()
+        self.assertEqual(materias_de_hojas(['PRIMER SEMESTRE'])['PRIMER SEMESTRE']['C1022'], 'RENOMBRADA')
+        for plan in MateriaPlan.objects.filter(semestre='TERCERO'):
+            plan.delete()
+        with self.assertRaises(ValueError):
+            materias_de_hojas(['TERCER SEMESTRE'])
+
+
+class CatalogoInvalidacionTests(TransactionTestCase):
+    # Sin la transacción de TestCase: los cambios se confirman y publican una versión nueva.
+    # Las vistas pueden leer de una réplica (DATABASE_REPLICA_URLS)
+    serialized_rollback = True
+    databases = '__all__'
+
+    def test_importacion_sin_consultas_e_invalidacion_por_version(self):
+        nombres = {'C1022': 'CIENCIAS NATURALES I', 'C1301': 'FORMACIÓN SOCIOEMOCIONAL I'}
+        ImportadorMasivo(nombres).cargar_materias()
+        version = cache.get(CLAVE_VERSION)
+        self.assertIsNotNone(version)
+        with self.assertNumQueries(0):
+            materias = ImportadorMasivo(nombres).cargar_materias()
+            self.assertFalse(politica_materias().cuenta(materias['C1301'].id))
+
+        materia = Materia.objects.get(codigo='C1022')
+        materia.nombre = 'CIENCIAS NATURALES'
+        materia.save()
+        self.assertNotEqual(cache.get(CLAVE_VERSION), version)
+        self.assertEqual(catalogo_materias().por_codigo['C1022'].nombre, 'CIENCIAS NATURALES')
+
+    def test_pagina_con_los_nombres_del_plan_sin_leer_materias(self):
+        alumno = Alumno.objects.create(matricula='5001', semestre='QUINTO', carrera='ILI')
+        materia = Materia.objects.create(codigo='C5125', nombre='DERECHO DE LOS PUEBLOS INDÍGENAS')
+        Calificacion.objects.create(alumno=alumno, materia=materia, p1=Decimal('8.0'), examen_final=Decimal('9.0'))
+        recalcular_resumenes([alumno.id])
+        catalogo_materias()
+        with CaptureQueriesContext(connection) as capturadas:
+            datos = construir_datos_calificaciones(alumno, ResumenAlumno.objects.get(alumno=alumno))
+        self.assertEqual(datos['materias'][0]['nombre'], 'DERECHOS DE LOS PUEBLOS INDÍGENAS')
+        self.assertFalse([c for c in capturadas if 'alumnos_materia' in c['sql']])
+
+    def test_cambios_revertidos_no_llegan_al_catalogo(self):
+        catalogo_materias()
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Materia.objects.create(codigo='C9999', nombre='PRUEBA')
+                # Este hilo ve su cambio; el catálogo compartido todavía no
+                self.assertIn('C9999', catalogo_materias().por_codigo)
+                raise RuntimeError
+        self.assertNotIn('C9999', catalogo_materias().por_codigo)
+        MateriaPlan.objects.create(semestre='PRIMERO', codigo='C9998', nombre='OPTATIVA', orden=20)
+        self.assertEqual(list(catalogo_materias().plan('PRIMERO'))[-1], 'C9998')
+
+    def alumno_con_ciencias(self):
+        alumno = Alumno.objects.create(matricula='5002', semestre='PRIMERO')
+        materia = Materia.objects.create(codigo='C1022', nombre='CIENCIAS NATURALES I')
+        Calificacion.objects.create(alumno=alumno, materia=materia, p1=Decimal('8.0'))
+
+    def renombrar_ciencias(self):
+        plan = MateriaPlan.objects.get(semestre='PRIMERO', carrera='', codigo='C1022')
+        plan.nombre = 'RENOMBRADA'
+        plan.save()
+
+    @sin_manifest
+    def test_renombrar_en_el_plan_cambia_la_pagina_en_cache(self):
+        self.alumno_con_ciencias()
+        self.client.post('/login/', {'matricula': '5002'})
+        primera = self.client.get('/calificaciones/')
+        self.assertNotContains(primera, 'RENOMBRADA')
+        self.renombrar_ciencias()
+        segunda = self.client.get('/calificaciones/', headers={'If-None-Match': primera['ETag']})
+        self.assertContains(segunda, 'RENOMBRADA')
+        self.assertNotEqual(segunda['ETag'], primera['ETag'])
+
+    @sin_manifest
+    @override_settings(ROOT_URLCONF='calificaciones.urls_asgi')
+    async def test_renombrar_en_el_plan_cambia_la_pagina_asincrona(self):
+        await sync_to_async(self.alumno_con_ciencias)()
+        await self.async_client.post('/login/', {'matricula': '5002'})
+        primera = await self.async_client.get('/calificaciones/')
+        self.assertNotContains(primera, 'RENOMBRADA')
+        await sync_to_async(self.renombrar_ciencias)()
+        segunda = await self.async_client.get('/calificaciones/', headers={'If-None-Match': primera['ETag']})
+        self.assertContains(segunda, 'RENOMBRADA')
+        self.assertNotEqual(segunda['ETag'], primera['ETag'])
+
+
+@sin_manifest
+class CalificacionesViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reiniciar_estadisticas()
+        self.alumno = Alumno.objects.create(matricula='4001', primer_nombre='ANA', semestre='PRIMERO')
+        self.calificacion = Calificacion.objects.create(
+            alumno=self.alumno, materia=Materia.objects.create(codigo='C1022', nombre='CIENCIAS NATURALES I'),
+            p1=Decimal('8.0'), examen_final=Decimal('9.0'),
+        )
+        self.client.post('/login/', {'matricula': '4001'})
+
+    def test_cache_versionada(self):
+        self.assertEqual(self.client.get('/calificaciones/').context['promedio_final'], Decimal('9.0'))
+        self.assertEqual(self.client.get('/calificaciones/').context['promedio_final'], Decimal('9.0'))
+        self.assertEqual(estadisticas()['aciertos'], 1)
+
+        # Guardar una calificación cambia la versión: la siguiente visita recalcula
+        self.calificacion.examen_final = Decimal('5.0')
+        self.calificacion.save()
+        self.assertEqual(self.client.get('/calificaciones/').context['promedio_final'], Decimal('7.0'))
+        self.assertEqual(estadisticas()['fallos'], 2)
+
+    def test_get_condicional_sin_recalcular(self):
+        for url in ('/calificaciones/', '/api/calificaciones/'):
+            response = self.client.get(url)
+            etag = response['ETag']
+            with CaptureQueriesContext(connection) as capturadas:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            # Sesión y alumno con su resumen; nada de calificaciones ni render. El catálogo (versión
+            # del ETag) no cuenta: dentro de TestCase sus cambios no se confirman y se relee cada vez
+            self.assertEqual(len([q for q in capturadas if 'alumnos_materia' not in q['sql']]), 2)
+            self.assertFalse([q for q in capturadas if 'alumnos_calificacion' in q['sql']])
+
+        datos = self.client.get('/api/calificaciones/').json()
+        self.assertEqual((datos['alumno']['matricula'], datos['materias'][0]['codigo'], datos['promedio_final']),
+                         ('4001', 'C1022', '9.0'))
+
+        self.calificacion.examen_final = Decimal('5.0')
+        self.calificacion.save()
+        response = self.client.get('/api/calificaciones/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['promedio_final'], '7.0')
+
+    def test_cambiar_muestra_acreditada_invalida_pagina_y_etag(self):
+        response = self.client.get('/calificaciones/')
+        etag = response['ETag']
+        self.assertEqual(response.context['filas'][0]['final'], '9.0')
+
+        materia = self.calificacion.materia
+        materia.muestra_acreditada = True
+        materia.save()
+        response = self.client.get('/calificaciones/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['filas'][0]['final'], 'A')
+
+    def test_borrar_materia_recalcula_resumen_y_etag(self):
+        for codigo, final in (('C1081', '6.0'), ('C1041', '7.0')):
+            Calificacion.objects.create(alumno=self.alumno, materia=Materia.objects.create(codigo=codigo, nombre=codigo),
+                                        p1=Decimal(final), examen_final=Decimal(final))
+        response = self.client.get('/calificaciones/')
+        etag, version = response['ETag'], ResumenAlumno.objects.get(alumno=self.alumno).version
+        self.assertEqual(response.context['promedio_final'], Decimal('7.3'))
+
+        self.calificacion.materia.delete()
+        resumen = ResumenAlumno.objects.get(alumno=self.alumno)
+        self.assertEqual((resumen.promedio_final, resumen.materias_contadas), (Decimal('6.50'), 2))
+        self.assertNotEqual(resumen.version, version)
+        response = self.client.get('/calificaciones/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['promedio_final'], Decimal('6.5'))
+
+        # Borrado masivo desde el admin
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        self.client.post('/admin/alumnos/materia/', {
+            'action': 'delete_selected', 'post': 'yes',
+            '_selected_action': [Materia.objects.get(codigo='C1081').pk],
+        })
+        self.assertFalse(Materia.objects.filter(codigo='C1081').exists())
+        self.assertEqual(ResumenAlumno.objects.get(alumno=self.alumno).promedio_final, Decimal('7.00'))
+
+    def test_modelo_de_presentacion(self):
+        fila = self.client.get('/calificaciones/').context['filas'][0]
+        # p1 8.0 -> 8, sin p2/p3, PP 8.0, EF 9, CF 9.0
+        self.assertEqual(fila['celdas'], (
+            ('calificacion-circle aprobado', '8'), (None, None), (None, None),
+            ('promedio-materia aprobado', '8.0'), ('calificacion-circle aprobado', '9'),
+        ))
+        self.assertEqual((fila['clase_final'], fila['final']), ('calificacion-final-circle aprobado', '9.0'))
+        self.assertNotIn('filas', self.client.get('/api/calificaciones/').json())
+
+    def test_api_sin_sesion(self):
+        self.client.get('/logout/')
+        self.assertEqual(self.client.get('/api/calificaciones/').status_code, 401)
+
+    def test_estadisticas_solo_personal(self):
+        self.assertEqual(self.client.get('/estado/cache/').status_code, 302)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        self.assertIn('tasa_aciertos', self.client.get('/estado/cache/').json())
+        self.assertIsInstance(self.client.get('/estado/bd/').json(), dict)
+
+
+@sin_manifest
+class TableroTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        materias = [Materia.objects.create(codigo=codigo, nombre=codigo) for codigo in ('C1022', 'C1301')]
+        for i, (grupo, finales) in enumerate([('101', ('9.0', '4.0')), ('101', ('7.0', '8.0')), ('102', ('5.0', '9.0'))]):
+            alumno = Alumno.objects.create(matricula=f'70{i}', grupo=grupo, semestre='PRIMERO')
+            for materia, final in zip(materias, finales):
+                Calificacion.objects.create(alumno=alumno, materia=materia, p1=Decimal(final),
+                                            examen_final=Decimal(final))
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+
+    def test_agregados_por_grupo_sin_materias_que_no_cuentan(self):
+        filas = {fila['clave']: fila for fila in self.client.get('/estadisticas/').context['filas']}
+        # C1301 no cuenta para el promedio: solo C1022
+        self.assertEqual((filas['101']['alumnos'], filas['101']['con_final'], filas['101']['aprobadas']), (2, 2, 2))
+        self.assertEqual(filas['101']['promedio_final'], 8.0)
+        self.assertEqual((filas['102']['reprobadas'], filas['102']['alumnos_con_reprobadas'],
+                          filas['102']['tasa_aprobacion']), (1, 1, 0.0))
+        self.assertEqual({barra['calificacion']: barra['n'] for barra in filas['101']['histograma']},
+                         {5: 0, 6: 0, 7: 1, 8: 0, 9: 1, 10: 0})
+
+    def test_cache_por_alcance_invalidada_al_cambiar_calificaciones(self):
+        url = '/estadisticas/?por=materia&grupo=101'
+        self.assertEqual(self.client.get(url).context['filas'][0]['aprobadas'], 2)
+        with CaptureQueriesContext(connection) as capturadas:
+            self.client.get(url)
+        self.assertFalse([q for q in capturadas if 'alumnos_calificacion' in q['sql']])
+
+        calificacion = Calificacion.objects.get(alumno__matricula='700', materia__codigo='C1022')
+        calificacion.p1 = calificacion.examen_final = Decimal('3.0')
+        calificacion.save()
+        self.assertEqual(self.client.get(url).context['filas'][0]['aprobadas'], 1)
+
+    def test_solo_personal(self):
+        self.client.logout()
+        self.assertEqual(self.client.get('/estadisticas/').status_code, 302)
+
+
+@sin_manifest
+class InstrumentacionTests(TestCase):
+    def setUp(self):
+        limpiar_registros()
+        Alumno.objects.create(matricula='5001', primer_nombre='ANA')
+
+    @override_settings(INSTRUMENTACION_ACTIVA=True, INSTRUMENTACION_UMBRAL_MS=0)
+    def test_registra_tiempos_y_consultas(self):
+        with self.assertLogs('alumnos.instrumentacion', 'WARNING'):
+            self.client.post('/login/', {'matricula': '5001'})
+            self.client.get('/calificaciones/')
+
+        registro = registros_recientes()[0]
+        self.assertEqual(registro['vista'], 'calificaciones')
+        self.assertGreater(registro['consultas'], 0)
+        self.assertIn('render', registro['secciones'])
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        self.assertContains(self.client.get('/estado/lentas/?minimo=0'), '/calificaciones/')
+
+    def test_apagada_no_registra(self):
+        self.client.post('/login/', {'matricula': '5001'})
+        self.client.get('/calificaciones/')
+        self.assertEqual(registros_recientes(), [])
+
+
+@skipUnless(settings.DATABASE_REPLICAS, 'requiere DATABASE_REPLICA_URLS')
+@sin_manifest
+class InstrumentacionReplicaTests(TransactionTestCase):
+    # Fuera de una transacción de prueba para que el router mande las lecturas a la réplica
+    databases = '__all__'
+
+    @override_settings(INSTRUMENTACION_ACTIVA=True)
+    def test_cuenta_las_consultas_de_la_replica(self):
+        Alumno.objects.create(matricula='5001', primer_nombre='ANA')
+        self.client.post('/login/', {'matricula': '5001'})
+        limpiar_registros()
+        replica = connections[settings.DATABASE_REPLICAS[0]]
+        with CaptureQueriesContext(connection) as primaria, CaptureQueriesContext(replica) as leidas:
+            self.client.get('/calificaciones/')
+        self.assertGreater(len(leidas), 0)
+        self.assertEqual(registros_recientes()[0]['consultas'], len(primaria) + len(leidas))
+
+
+@sin_manifest
+class LoginTests(TestCase):
+    def test_matricula_sin_distinguir_mayusculas(self):
+        Alumno.objects.create(matricula=' ab123 ', primer_nombre='ANA')
+        ImportadorMasivo({}).importar([{'matricula': 'cd456', 'alumno': {'primer_nombre': 'LUIS'}, 'calificaciones': {}}])
+        self.assertEqual(
+            dict(Alumno.objects.values_list('matricula', 'matricula_normalizada')),
+            {' ab123 ': 'AB123', 'cd456': 'CD456'},
+        )
+
+        respuesta = self.client.post('/login/', {'matricula': 'Cd456'})
+        self.assertRedirects(respuesta, '/calificaciones/', fetch_redirect_response=False)
+        self.assertEqual(self.client.session['alumno_matricula'], 'cd456')
+
+    def test_busqueda_por_indice(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.post('/login/', {'matricula': 'x1'})
+        self.assertIn('"matricula_normalizada" = ', consultas.captured_queries[0]['sql'])
+        self.assertNotIn('LIKE', consultas.captured_queries[0]['sql'])
+
+    def test_recursos_locales_sin_cdn(self):
+        Alumno.objects.create(matricula='801')
+        self.client.post('/login/', {'matricula': '801'})
+        for url in ('/login/', '/calificaciones/'):
+            html = self.client.get(url).content.decode()
+            self.assertNotIn('https://', html)
+            self.assertNotIn('<style>', html)
+            recursos = re.findall(r'(?:href|src)="/static/([^"]+)"', html)
+            self.assertIn('vendor/bootstrap/bootstrap.min.css', recursos)
+            for ruta in recursos:
+                self.assertIsNotNone(finders.find(ruta), ruta)
+
+
+@sin_manifest
+@override_settings(ROOT_URLCONF='calificaciones.urls_asgi')
+class VistasAsincronasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        limpiar_registros()
+        alumno = Alumno.objects.create(matricula='4101', primer_nombre='ANA')
+        Calificacion.objects.create(alumno=alumno, materia=Materia.objects.create(codigo='C1022', nombre='CIENCIAS'),
+                                    p1=Decimal('8.0'), examen_final=Decimal('9.0'))
+
+    async def test_login_calificaciones_y_logout(self):
+        respuesta = await self.async_client.post('/login/', {'matricula': '4101'})
+        self.assertEqual((respuesta.status_code, respuesta['Location']), (302, '/calificaciones/'))
+
+        respuesta = await self.async_client.get('/calificaciones/')
+        self.assertEqual(respuesta.context['promedio_final'], Decimal('9.0'))
+        self.assertIn('private', respuesta['Cache-Control'])
+        respuesta = await self.async_client.get('/calificaciones/', headers={'If-None-Match': respuesta['ETag']})
+        self.assertEqual(respuesta.status_code, 304)
+
+        await self.async_client.get('/logout/')
+        respuesta = await self.async_client.get('/calificaciones/')
+        self.assertEqual(respuesta['Location'], '/login/')
+        respuesta = await self.async_client.post('/login/', {'matricula': 'x1'})
+        self.assertContains(respuesta, "Matrícula &#x27;x1&#x27; no encontrada")
+
+    @override_settings(INSTRUMENTACION_ACTIVA=True)
+    async def test_instrumentacion_cuenta_consultas_del_orm_asincrono(self):
+        await self.async_client.post('/login/', {'matricula': '4101'})
+        await self.async_client.get('/calificaciones/')
+        registro = registros_recientes()[0]
+        self.assertEqual(registro['vista'], 'calificaciones')
+        # Sesión, alumno con resumen y calificaciones (primera visita: sin caché)
+        self.assertGreaterEqual(registro['consultas'], 3)
+        self.assertIn('render', registro['secciones'])
+
+    def test_configuracion_del_servidor(self):
+        self.assertEqual(
+            servidor.configuracion({'SERVIDOR': 'asgi', 'PORT': '9000'}, nucleos=2),
+            {'bind': '0.0.0.0:9000', 'workers': 2, 'worker_connections': 100, 'keepalive': 5,
+             'wsgi_app': 'calificaciones.asgi:application', 'worker_class': 'calificaciones.servidor.TrabajadorASGI'},
+        )
+        wsgi = servidor.configuracion({'WEB_CONCURRENCY': '3', 'SERVIDOR_HILOS': '8'}, nucleos=2)
+        self.assertEqual((wsgi['workers'], wsgi['worker_class'], wsgi['threads']), (3, 'gthread', 8))
+        with self.assertRaises(ValueError):
+            servidor.configuracion({'SERVIDOR': 'uwsgi'})
+
+    def test_cadena_de_middleware_asincrona(self):
+        # Ningún middleware obliga a pasar la solicitud por un hilo
+        manejador = ASGIHandler()
+        self.assertTrue(iscoroutinefunction(manejador._middleware_chain))
+        for ruta in settings.MIDDLEWARE:
+            self.assertTrue(getattr(import_string(ruta), 'async_capable', False), ruta)
+
+
+@skipUnless(connection.settings_dict['ENGINE'] == 'calificaciones.postgresql_pool',
+            'requiere PostgreSQL con DB_POOL=True')
+class PoolConexionesTests(TestCase):
+    def test_pool_y_sentencias_preparadas(self):
+        Alumno.objects.create(matricula='9001', matricula_normalizada='9001')
+        for _ in range(3):
+            Alumno.objects.get(matricula_normalizada='9001')
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM pg_prepared_statements WHERE statement LIKE %s",
+                           ['%"matricula_normalizada" = $1%'])
+            self.assertEqual(cursor.fetchone()[0], 1)
+        metricas = estadisticas_pools()['default']
+        self.assertGreaterEqual(metricas['prestamos'], 1)
+        self.assertLessEqual(metricas['en_uso'], metricas['maximo'])
+
+
+@sin_manifest
+class LimitesLoginTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reiniciar_limites()
+        Alumno.objects.create(matricula='230000001', matricula_normalizada='230000001')
+
+    def tearDown(self):
+        reiniciar_limites()
+
+    @override_settings(LOGIN_LIMITE_IP='2/60')
+    def test_por_ip_solo_cuentan_los_fallos(self):
+        for _ in range(3):
+            self.assertEqual(self.client.post('/login/', {'matricula': '230000001'}).status_code, 302)
+        for _ in range(2):
+            self.assertEqual(self.client.post('/login/', {'matricula': '999'}).status_code, 200)
+        with CaptureQueriesContext(connection) as capturadas:
+            respuesta = self.client.post('/login/', {'matricula': '230000001'})
+        self.assertEqual(respuesta.status_code, 429)
+        self.assertEqual(int(respuesta['Retry-After']), 30)
+        self.assertEqual(len(capturadas), 0)
+        # Otra dirección no comparte la cubeta
+        self.assertEqual(self.client.post('/login/', {'matricula': '230000001'}, REMOTE_ADDR='10.0.0.2').status_code, 302)
+
+    @override_settings(LOGIN_LIMITE_PREFIJO='1/60')
+    def test_barrido_de_matriculas_desde_varias_ip(self):
+        self.assertEqual(self.client.post('/login/', {'matricula': '990000001'}, REMOTE_ADDR='10.0.0.1').status_code, 200)
+        self.assertEqual(self.client.post('/login/', {'matricula': '990000002'}, REMOTE_ADDR='10.0.0.2').status_code, 429)
+        self.assertEqual(self.client.post('/login/', {'matricula': '230000001'}, REMOTE_ADDR='10.0.0.3').status_code, 302)
+
+    @override_settings(LOGIN_LIMITE_PREFIJO='1/60')
+    def test_prefijo_agotado_no_bloquea_a_los_alumnos_del_bloque(self):
+        self.assertEqual(self.client.post('/login/', {'matricula': '230000999'}, REMOTE_ADDR='10.0.0.1').status_code, 200)
+        self.assertEqual(self.client.post('/login/', {'matricula': '230000998'}, REMOTE_ADDR='10.0.0.2').status_code, 429)
+        self.assertEqual(self.client.post('/login/', {'matricula': '230000001'}, REMOTE_ADDR='10.0.0.3').status_code, 302)
+
+    @override_settings(LOGIN_LIMITE_PREFIJO='1/60', ROOT_URLCONF='calificaciones.urls_asgi')
+    async def test_prefijo_agotado_asincrono(self):
+        respuesta = await self.async_client.post('/login/', {'matricula': '230000999'}, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(respuesta.status_code, 200)
+        respuesta = await self.async_client.post('/login/', {'matricula': '230000998'}, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(respuesta.status_code, 429)
+        respuesta = await self.async_client.post('/login/', {'matricula': '230000001'}, REMOTE_ADDR='10.0.0.3')
+        self.assertEqual(respuesta.status_code, 302)
+
+    @override_settings(LOGIN_LIMITE_IP='1/60', LOGIN_IP_META='HTTP_X_FORWARDED_FOR')
+    def test_detras_del_proxy_cuenta_la_ip_que_agrega(self):
+        # Todas llegan desde el proxy (misma REMOTE_ADDR); el cliente puede inventar las primeras
+        self.client.post('/login/', {'matricula': '999'}, HTTP_X_FORWARDED_FOR='1.2.3.4, 200.0.0.1')
+        respuesta = self.client.post('/login/', {'matricula': '999'}, HTTP_X_FORWARDED_FOR='5.6.7.8, 200.0.0.1')
+        self.assertEqual(respuesta.status_code, 429)
+        respuesta = self.client.post('/login/', {'matricula': '999'}, HTTP_X_FORWARDED_FOR='200.0.0.2')
+        self.assertEqual(respuesta.status_code, 200)
+
+    @override_settings(LOGIN_LIMITE_IP='1/60', LOGIN_LIMITE_COMPARTIDO=True)
+    def test_cubetas_compartidas_en_la_cache(self):
+        self.client.post('/login/', {'matricula': '999'})
+        self.assertIsNotNone(cache.get('limite:ip:127.0.0.1'))
+        reiniciar_limites()  # otro proceso: el estado sigue en la caché
+        self.assertEqual(self.client.post('/login/', {'matricula': '999'}).status_code, 429)
+
+    @override_settings(LOGIN_CONCURRENCIA_MAXIMA=0, ROOT_URLCONF='calificaciones.urls_asgi')
+    async def test_descarte_con_el_proceso_saturado(self):
+        respuesta = await self.async_client.post('/login/', {'matricula': '230000001'})
+        self.assertEqual((respuesta.status_code, respuesta['Retry-After']), (429, '1'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicasTests(SimpleTestCase):
+    # El router solo decide el alias: estas pruebas no consultan ninguna BD
+    def test_solo_lecturas_de_alumnos_dentro_del_bloque(self):
+        self.assertEqual(Alumno.objects.all().db, 'default')
+        with lecturas_en_replica():
+            self.assertEqual(Alumno.objects.all().db, 'replica1')
+            self.assertEqual(Calificacion.objects.all().db, 'replica1')
+            self.assertEqual(Session.objects.all().db, 'default')
+            self.assertEqual(User.objects.all().db, 'default')
+            # Después de una escritura la solicitud lee lo que escribió
+            self.assertEqual(router.db_for_write(Alumno), 'default')
+            self.assertEqual(Alumno.objects.all().db, 'default')
+        self.assertEqual(Alumno.objects.all().db, 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_sin_replicas_todo_va_a_la_primaria(self):
+        with lecturas_en_replica():
+            self.assertEqual(Alumno.objects.all().db, 'default')
+
+    def solicitud(self, vista, staff, cookies=None):
+        bases = []
+
+        def get_response(request):
+            with lecturas_en_replica():
+                bases.append(Alumno.objects.all().db)
+                vista()
+            return HttpResponse()
+
+        request = RequestFactory().get('/')
+        request.COOKIES.update(cookies or {})
+        request.user = User(is_staff=staff)
+        return ReplicasMiddleware(get_response)(request), bases[0]
+
+    def test_el_personal_lee_de_la_primaria_despues_de_guardar(self):
+        respuesta, base = self.solicitud(lambda: router.db_for_write(Materia), staff=True)
+        self.assertEqual(base, 'replica1')
+        self.assertEqual(respuesta.cookies[COOKIE_PRIMARIA]['max-age'], 30)
+        # El alumno escribe su sesión, pero no fija la primaria
+        respuesta, _ = self.solicitud(lambda: router.db_for_write(Session), staff=False)
+        self.assertNotIn(COOKIE_PRIMARIA, respuesta.cookies)
+
+        respuesta, base = self.solicitud(lambda: None, staff=True, cookies={COOKIE_PRIMARIA: '1'})
+        self.assertEqual(base, 'default')
+        self.assertNotIn(COOKIE_PRIMARIA, respuesta.cookies)
+
+
+class LimpiarSesionesTests(TestCase):
+    def test_borra_solo_vencidas_por_lotes(self):
+        ahora = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f'vencida{i}', session_data='', expire_date=ahora - timedelta(days=1))
+        Session.objects.create(session_key='vigente', session_data='', expire_date=ahora + timedelta(days=1))
+
+        salida = io.StringIO()
+        call_command('limpiar_sesiones', lote=2, stdout=salida)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['vigente'])
+        self.assertIn('5 sesiones vencidas borradas', salida.getvalue())
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_login_con_cookies_firmadas(self):
+        Alumno.objects.create(matricula='6001', primer_nombre='ANA')
+        self.client.post('/login/', {'matricula': '6001'})
+        self.assertEqual(self.client.session['alumno_matricula'], '6001')
+        self.assertFalse(Session.objects.exists())
+
+
+class DatosSinteticosTests(TestCase):
+    def test_libro_generado_se_importa_con_los_comandos(self):
+        libro = sinteticos.generar_libro(10, semilla=7)
+        self.assertEqual({h: len(df) for h, df in libro.items()}, sinteticos.repartir(10))
+        self.assertIn('C5262\nES', libro['QUINTO SEMESTRE ILI'].columns)
+
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, 'sinteticos.xlsx')
+            sinteticos.guardar_libro(libro, ruta)
+            avisos = io.StringIO()
+            call_command('importar_excel', ruta, '--masivo', stdout=io.StringIO(), stderr=avisos)
+            self.assertIn('--masivo está obsoleto', avisos.getvalue())
+            call_command('importar_quinto_semestre', ruta, stdout=io.StringIO())
+
+        self.assertEqual(Alumno.objects.count(), 10)
+        self.assertEqual(Alumno.objects.filter(carrera='ILI').count(), 2)
+        codigos = set().union(*sinteticos.materias_por_hoja().values())
+        self.assertEqual(set(Materia.objects.values_list('codigo', flat=True)), codigos)
+        self.assertTrue(Calificacion.objects.filter(materia__codigo='C5262', alumno__carrera='ILI').exists())
+
+    def test_los_comandos_declaran_sus_hojas(self):
+        class SinHojas(ComandoImportacion):
+            pass
+
+        with self.assertRaises(ImproperlyConfigured):
+            SinHojas()
+        self.assertEqual(ImportarExcel().hojas_a_importar({'semestre': 'TERCERO'}), ['TERCER SEMESTRE'])
+
+
+class LecturaPorBloquesTests(TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, 'sinteticos.xlsx')
+        sinteticos.guardar_libro(sinteticos.generar_libro(20, semilla=3), self.ruta)
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def contenido(self):
+        return list(Calificacion.objects.order_by('alumno__matricula', 'materia__codigo').values_list(
+            'alumno__matricula', 'alumno__grupo', 'materia__codigo', 'p1', 'p2', 'p3', 'examen_final',
+            'promedio_parciales', 'calificacion_final',
+        ))
+
+    def test_bloques_con_columnas_normalizadas(self):
+        bloques = list(leer_hoja_por_bloques(self.ruta, 'PRIMER SEMESTRE', hojas.normalizar_columnas, tamano_bloque=2))
+        self.assertEqual([len(b) for b in bloques], [2, 2, 1])
+        self.assertIn('C1022_P1', bloques[0].columns)
+
+    def test_streaming_importa_igual_que_hoja_completa(self):
+        call_command('importar_excel', self.ruta, stdout=io.StringIO())
+        call_command('importar_quinto_semestre', self.ruta, stdout=io.StringIO())
+        esperado = self.contenido()
+
+        Alumno.objects.all().delete()
+        call_command('importar_excel', self.ruta, '--streaming', '--bloque', '2', stdout=io.StringIO())
+        call_command('importar_quinto_semestre', self.ruta, '--streaming', '--bloque', '2', stdout=io.StringIO())
+        self.assertEqual(self.contenido(), esperado)
+
+    def test_procesos_hijos_importan_igual(self):
+        # Las hojas se leen en procesos hijos con las materias que resolvió este proceso
+        list(importar_libro(self.ruta, list(hojas.FORMATOS), procesos=1))
+        esperado = self.contenido()
+
+        Alumno.objects.all().delete()
+        list(importar_libro(self.ruta, list(hojas.FORMATOS), procesos=2))
+        self.assertEqual(self.contenido(), esperado)
+
+
+
+@sin_manifest
+class BenchmarkTests(TransactionTestCase):
+    # Los datos de la migración (plan de estudios) vuelven al terminar. Las vistas pueden leer
+    # de una réplica (DATABASE_REPLICA_URLS)
+    serialized_rollback = True
+    databases = '__all__'
+
+    def test_dos_tamanos_sin_perder_el_plan(self):
+        comando = Benchmark(stdout=io.StringIO())
+        comando.options = {'semilla': 1, 'solicitudes': 2, 'lote': 50}
+        with tempfile.TemporaryDirectory() as directorio:
+            comando.directorio = directorio
+            for tamano in (8, 12):
+                resultado = comando.medir_tamano(tamano)
+        self.assertEqual(resultado['importar_libro_paralelo']['filas'], 12)
+        self.assertEqual(Alumno.objects.count(), 12)
+        self.assertTrue(MateriaPlan.objects.exists())
+
+class FormatosHojaTests(SimpleTestCase):
+    def test_normalizar_columnas_de_todas_las_hojas(self):
+        self.assertEqual(
+            hojas.normalizar_columnas(['C1022P1', 'C3023 P1', 'C5300\nP1', 'C5262<br>ES', ' MATRÍCULA ', 'NOMBRE\n(S)', 7]),
+            ['C1022_P1', 'C3023_P1', 'C5300_P1', 'C5262_ES', 'MATRÍCULA', 'NOMBRE_(S)', '7'],
+        )
+
+    def test_datos_alumno_segun_formato(self):
+        fila = {'PRIMER APELLIDO': 'PÉREZ', 'NOMBRE (S)': 'ANA MARÍA', 'GRUPO': 501, 'SEXO': 'm', 'SEMESTRE': 'QUINTO'}
+        datos = hojas.datos_alumno(fila, hojas.FORMATOS['QUINTO SEMESTRE ILI'])
+        self.assertEqual((datos['semestre'], datos['carrera'], datos['segundo_nombre'], datos['sexo']),
+                         ('QUINTO', 'ILI', 'MARÍA', 'M'))
+        self.assertNotIn('carrera', hojas.datos_alumno(fila, hojas.FORMATOS['PRIMER SEMESTRE']))
+
+
+class ValidacionTests(TestCase):
+    def setUp(self):
+        libro = sinteticos.generar_libro(8, semilla=5)
+        primero = libro['PRIMER SEMESTRE']
+        primero.loc[0, 'C1022P1'] = 12.5
+        primero['C1061P2'] = primero['C1061P2'].astype(object)
+        primero.loc[1, 'C1061P2'] = 'NP'
+        primero.loc[0, 'C1022PP'] = 3.0
+        libro['TERCER SEMESTRE'].loc[0, 'MATRÍCULA'] = primero.loc[1, 'MATRÍCULA']
+        libro['QUINTO SEMESTRE DC'] = libro['QUINTO SEMESTRE DC'].drop(columns=['C5300\nEF'])
+        libro['NOTAS'] = pd.DataFrame({'A': [1]})
+
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, 'errores.xlsx')
+        sinteticos.guardar_libro(libro, self.ruta)
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def test_reporte_del_libro_completo(self):
+        reporte = validar_libro(self.ruta).como_dict()
+        self.assertFalse(reporte['valido'])
+        self.assertEqual(reporte['filas'], sinteticos.repartir(8))
+        errores = {tipo: cantidad for tipo, cantidad in reporte['resumen'].items() if tipo in ERRORES}
+        self.assertEqual(errores, {
+            'columna_faltante': 1,
+            'valor_no_numerico': 1,
+            'fuera_de_rango': 1,
+            'matricula_duplicada': 2,
+        })
+        # El PP escrito a mano (y los que cambian por el 12.5 y el NP) no coincide con la regla
+        self.assertGreaterEqual(reporte['resumen']['pp_no_coincide'], 1)
+        self.assertEqual(reporte['resumen']['hoja_desconocida'], 1)
+        problemas = {p['tipo']: p for p in reporte['problemas']}
+        self.assertEqual((problemas['fuera_de_rango']['fila'], problemas['fuera_de_rango']['columna'],
+                          problemas['fuera_de_rango']['valor']), (2, 'C1022_P1', 12.5))
+        self.assertEqual(problemas['valor_no_numerico']['valor'], 'NP')
+        self.assertEqual(problemas['columna_faltante']['columna'], 'C5300_EF')
+        self.assertEqual(problemas['hoja_desconocida']['hoja'], 'NOTAS')
+
+    def test_test_y_validar_no_tocan_la_bd(self):
+        ruta_reporte = os.path.join(self.directorio.name, 'reporte.json')
+        # importar_excel solo valida PRIMER y TERCER SEMESTRE
+        with self.assertRaisesMessage(CommandError, '4 errores'):
+            call_command('importar_excel', self.ruta, '--test', '--reporte', ruta_reporte, stdout=io.StringIO())
+        with open(ruta_reporte, encoding='utf-8') as archivo:
+            self.assertEqual(json.load(archivo)['resumen']['matricula_duplicada'], 2)
+        with self.assertRaises(CommandError):
+            call_command('importar_libro', self.ruta, '--validar', stdout=io.StringIO())
+        self.assertFalse(Alumno.objects.exists())
+
+
+class ExportacionTests(TestCase):
+    def setUp(self):
+        materia = Materia.objects.create(codigo='C1022', nombre='CIENCIAS NATURALES I')
+        for i in range(3):
+            alumno = Alumno.objects.create(matricula=f'500{i}', primer_apellido='PÉREZ', semestre='PRIMERO')
+            Calificacion.objects.create(alumno=alumno, materia=materia, p1=Decimal('8.5'), examen_final=Decimal(7 + i))
+        self.directorio = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def test_csv_por_lotes(self):
+        partes = list(exportacion.csv_por_partes(exportacion.filas_calificaciones(tamano_lote=2), tamano_lote=2))
+        # Encabezado sin esperar a la BD, luego un bloque por lote
+        self.assertEqual(len(partes), 3)
+        self.assertTrue(partes[0].startswith('\ufeffMATRÍCULA,PRIMER APELLIDO'))
+        filas = ''.join(partes[1:]).splitlines()
+        self.assertEqual([f.split(',')[0] for f in filas], ['5000', '5001', '5002'])
+        self.assertIn(',C1022,CIENCIAS NATURALES I,8.5,,,9.0,7.0,8.0,', filas[0])
+
+    def test_accion_del_admin_envia_por_partes(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        ids = Calificacion.objects.filter(alumno__matricula__in=['5000', '5002']).values_list('pk', flat=True)
+        response = self.client.post('/admin/alumnos/calificacion/', {
+            'action': 'exportar_csv', '_selected_action': [str(pk) for pk in ids],
+        })
+        self.assertTrue(response.streaming)
+        contenido = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual([f.split(',')[0] for f in contenido], ['MATRÍCULA', '5000', '5002'])
+
+    def test_comando_xlsx_y_parquet(self):
+        ruta = os.path.join(self.directorio.name, 'calificaciones.xlsx')
+        call_command('exportar_calificaciones', ruta, stdout=io.StringIO())
+        filas = list(load_workbook(ruta, read_only=True)['CALIFICACIONES'].values)
+        self.assertEqual(list(filas[0]), exportacion.ENCABEZADOS)
+        self.assertEqual([fila[0] for fila in filas[1:]], ['5000', '5001', '5002'])
+        self.assertEqual(filas[3][15], Decimal('9.0'))
+
+        # Lo que no cabe en una hoja sigue en otra, con su encabezado
+        with open(ruta, 'wb') as archivo:
+            exportacion.escribir_xlsx(exportacion.filas_calificaciones(), archivo, filas_por_hoja=2)
+        libro = load_workbook(ruta, read_only=True)
+        self.assertEqual(libro.sheetnames, ['CALIFICACIONES', 'CALIFICACIONES 2'])
+        self.assertEqual([fila[0] for fila in libro['CALIFICACIONES 2'].values], ['MATRÍCULA', '5002'])
+
+        if exportacion.pq is None:
+            return
+        ruta = os.path.join(self.directorio.name, 'calificaciones.parquet')
+        call_command('exportar_calificaciones', ruta, '--lote', '2', stdout=io.StringIO())
+        tabla = exportacion.pq.read_table(ruta)
+        self.assertEqual(tabla.num_rows, 3)
+        self.assertEqual(tabla.column('CF').to_pylist(), [Decimal('8.0'), Decimal('9.0'), Decimal('9.0')])
@@ -5,5 +5,10 @@ urlpatterns = [
     path('', views.login_view, name='login'),
     path('login/', views.login_view, name='login'),
     path('calificaciones/', views.calificaciones_view, name='calificaciones'),
+    path('api/calificaciones/', views.api_calificaciones_view, name='api_calificaciones'),
     path('logout/', views.logout_view, name='logout'),
+    path('estado/cache/', views.cache_estadisticas_view, name='cache_estadisticas'),
+    path('estado/bd/', views.pool_estadisticas_view, name='pool_estadisticas'),
+    path('estadisticas/', views.tablero_view, name='tablero'),
+    path('estado/lentas/', views.solicitudes_lentas_view, name='solicitudes_lentas'),
 ]
\ No newline at end of file
@@ -0,0 +1,236 @@
+# alumnos/validacion.py
+"""Validación del libro de calificaciones completo sin escribir en la BD (modo --test).
+
+Cada hoja se lee por bloques (alumnos.lectura, con python-calamine si está
+instalado) y se revisa columna por columna con NumPy/pandas:
+  - hoja_faltante / columna_faltante: la hoja o una columna de una materia de
+    FORMATOS no está en el libro,
+  - valor_no_numerico: la celda tiene algo que no se puede leer como número
+    (la importación lo guardaría vacío),
+  - fuera_de_rango: calificación menor que 0 o mayor que 10,
+  - matricula_duplicada: la misma matrícula (sin distinguir mayúsculas) en
+    más de una fila del libro (la importación se queda con la última),
+  - pp_no_coincide / cf_no_coincide: el PP o la CF escritos en la hoja no son
+    los que calcula la regla de Calificacion (la importación usa los calculados),
+  - sin_matricula: fila con calificaciones pero sin matrícula (se descarta),
+  - hoja_desconocida: hoja del libro que no está en FORMATOS (no se importa).
+
+Los primeros cinco son errores; los demás, avisos. El reporte es un
+diccionario listo para json.dump. Las materias de cada hoja salen del plan de
+estudios (el catálogo de alumnos.catalogo, lo único que se lee de la BD).
+"""
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from .calculos import TIPOS_CALIFICACION, calcular_hoja, columna_a_decimas
+from .catalogo import catalogo_materias
+from .hojas import FORMATOS, hojas_del_libro, normalizar_columnas, obtener_matricula
+from .lectura import MOTOR_RAPIDO, leer_hoja_por_bloques
+
+ERRORES = ('hoja_faltante', 'columna_faltante', 'valor_no_numerico', 'fuera_de_rango', 'matricula_duplicada')
+AVISOS = ('pp_no_coincide', 'cf_no_coincide', 'sin_matricula', 'hoja_desconocida')
+
+# Rango válido en décimas (0.0 a 10.0)
+MINIMO_DECIMAS = 0
+MAXIMO_DECIMAS = 100
+
+# Filas de la hoja que ocupa el encabezado (la fila 1 de Excel)
+FILA_ENCABEZADO = 1
+
+# Tamaño de bloque de lectura: la validación solo guarda las matrículas, no la hoja
+TAMANO_BLOQUE_VALIDACION = 20000
+
+
+def columnas_de_materia(codigo, formato):
+    """{campo: columna} que la hoja debe traer para la materia (P1-P3, EF, PP y CF)"""
+    alias = formato.alias.get(codigo, {})
+    columnas = {
+        campo: alias.get(campo, f'{codigo}_{tipo}')
+        for campo, tipo in TIPOS_CALIFICACION.items()
+    }
+    columnas['promedio_parciales'] = alias.get('promedio_parciales', f'{codigo}_PP')
+    columnas['calificacion_final'] = alias.get('calificacion_final', f'{codigo}_CF')
+    return columnas
+
+
+def _celdas_con_valor(serie):
+    """Celdas no vacías (los textos en blanco cuentan como vacíos)"""
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.notna().to_numpy()
+    return (serie.notna() & (serie.astype(str).str.strip() != '')).to_numpy()
+
+
+def _valor(valor):
+    """Valor de la celda apto para JSON"""
+    if valor is None or (isinstance(valor, float) and np.isnan(valor)):
+        return None
+    if isinstance(valor, (np.integer, np.floating)):
+        return valor.item()
+    if isinstance(valor, (int, float, str, bool)):
+        return valor
+    return str(valor)
+
+
+class ReporteValidacion:
+    """Acumula los problemas encontrados. Guarda el detalle de hasta maximo_detalles
+       problemas y el conteo de todos"""
+
+    def __init__(self, ruta, maximo_detalles=1000):
+        self.ruta = ruta
+        self.maximo_detalles = maximo_detalles
+        self.conteo = Counter()
+        self.problemas = []
+        self.filas = {}
+
+    def agregar(self, tipo, hoja, filas=(None,), matriculas=None, columna=None, valores=None, esperados=None):
+        """Registra un problema por cada fila indicada (filas de Excel, 1 = encabezado)"""
+        self.conteo[tipo] += len(filas)
+        espacio = self.maximo_detalles - len(self.problemas)
+        for i, fila in enumerate(filas[:max(espacio, 0)]):
+            self.problemas.append({
+                'tipo': tipo,
+                'nivel': 'error' if tipo in ERRORES else 'aviso',
+                'hoja': hoja,
+                'fila': None if fila is None else int(fila),
+                'matricula': None if matriculas is None else matriculas[i],
+                'columna': columna,
+                'valor': None if valores is None else _valor(valores[i]),
+                'esperado': None if esperados is None else _valor(esperados[i]),
+            })
+
+    @property
+    def errores(self):
+        return sum(self.conteo[tipo] for tipo in ERRORES)
+
+    @property
+    def avisos(self):
+        return sum(self.conteo[tipo] for tipo in AVISOS)
+
+    @property
+    def valido(self):
+        return self.errores == 0
+
+    def como_dict(self):
+        return {
+            'archivo': self.ruta,
+            'valido': self.valido,
+            'errores': self.errores,
+            'avisos': self.avisos,
+            'filas': self.filas,
+            'resumen': {tipo: self.conteo[tipo] for tipo in ERRORES + AVISOS if self.conteo[tipo]},
+            'problemas': self.problemas,
+            'detalles_omitidos': sum(self.conteo.values()) - len(self.problemas),
+        }
+
+
+def validar_libro(ruta, nombres_hojas=None, maximo_detalles=1000, tamano_bloque=TAMANO_BLOQUE_VALIDACION):
+    """Valida las hojas indicadas (por defecto todas las de FORMATOS que tenga el libro).
+       Devuelve un ReporteValidacion; de la BD solo lee el plan de estudios"""
+    reporte = ReporteValidacion(ruta, maximo_detalles)
+    en_libro = hojas_del_libro(ruta)
+    for hoja in en_libro:
+        if hoja not in FORMATOS:
+            reporte.agregar('hoja_desconocida', hoja)
+    if nombres_hojas is None:
+        nombres_hojas = [hoja for hoja in en_libro if hoja in FORMATOS]
+
+    # (hoja, fila, matrícula normalizada) de todo el libro, para las duplicadas
+    matriculas = []
+    catalogo = catalogo_materias()
+    for nombre in nombres_hojas:
+        if nombre not in en_libro:
+            reporte.agregar('hoja_faltante', nombre)
+            continue
+        formato = FORMATOS[nombre]
+        matriculas.extend(validar_hoja(ruta, formato, formato.materias_del_plan(catalogo), reporte, tamano_bloque))
+
+    if matriculas:
+        todas = pd.DataFrame(matriculas, columns=['hoja', 'fila', 'matricula'])
+        repetidas = todas[todas['matricula'].duplicated(keep=False)]
+        for hoja, grupo in repetidas.groupby('hoja', sort=False):
+            reporte.agregar('matricula_duplicada', hoja, grupo['fila'].tolist(),
+                            grupo['matricula'].tolist(), 'MATRÍCULA')
+    return reporte
+
+
+def validar_hoja(ruta, formato, materias, reporte, tamano_bloque=TAMANO_BLOQUE_VALIDACION):
+    """Valida una hoja bloque por bloque (materias: {codigo: nombre}). Devuelve [(hoja, fila, matrícula normalizada)]"""
+    hoja = formato.nombre
+    matriculas = []
+    filas_leidas = 0
+    columnas_revisadas = False
+    for df in leer_hoja_por_bloques(ruta, hoja, normalizar_columnas, tamano_bloque, motor=MOTOR_RAPIDO):
+        # Fila de Excel de cada fila del bloque
+        filas = np.arange(len(df)) + filas_leidas + FILA_ENCABEZADO + 1
+        filas_leidas += len(df)
+
+        if not columnas_revisadas:
+            columnas_revisadas = True
+            faltantes = [] if 'MATRÍCULA' in df.columns else ['MATRÍCULA']
+            for codigo in materias:
+                faltantes += [c for c in columnas_de_materia(codigo, formato).values() if c not in df.columns]
+            for columna in faltantes:
+                reporte.agregar('columna_faltante', hoja, columna=columna)
+        if 'MATRÍCULA' not in df.columns:
+            continue
+
+        no_vacias = df.notna().any(axis=1).to_numpy()
+        texto = df['MATRÍCULA'].map(obtener_matricula)
+        # Mismo criterio que hojas.limpiar_dataframe
+        con_matricula = (texto != '').to_numpy() & ~texto.str.startswith('C').to_numpy()
+        # Una fila de la hoja sin matrícula no se importa: avisar solo si trae calificaciones
+        columnas_calificacion = [
+            c for codigo in materias for c in columnas_de_materia(codigo, formato).values()
+            if c in df.columns
+        ]
+        con_calificaciones = df[columnas_calificacion].notna().any(axis=1).to_numpy()
+        sin_matricula = no_vacias & ~con_matricula & con_calificaciones & (texto == '').to_numpy()
+        if sin_matricula.any():
+            reporte.agregar('sin_matricula', hoja, filas[sin_matricula].tolist())
+
+        validas = no_vacias & con_matricula
+        if not validas.any():
+            continue
+        df = df[validas]
+        filas = filas[validas]
+        normalizadas = texto[validas].str.upper().tolist()
+        matriculas.extend(zip([hoja] * len(filas), filas.tolist(), normalizadas))
+        validar_calificaciones(df, filas, texto[validas].tolist(), formato, materias, reporte)
+    reporte.filas[hoja] = filas_leidas
+    return matriculas
+
+
+def validar_calificaciones(df, filas, matriculas, formato, materias, reporte):
+    """Rango, valores ilegibles y PP/CF contra la regla, materia por materia"""
+    hoja = formato.nombre
+    calculadas = calcular_hoja(df, list(materias), columnas_especiales=formato.alias)
+    for codigo in materias:
+        for campo, columna in columnas_de_materia(codigo, formato).items():
+            if columna not in df.columns:
+                continue
+            original = df[columna]
+            decimas = columna_a_decimas(original)
+            con_valor = _celdas_con_valor(original)
+            leidas = ~np.isnan(decimas)
+
+            ilegibles = np.flatnonzero(con_valor & ~leidas)
+            if len(ilegibles):
+                reporte.agregar('valor_no_numerico', hoja, filas[ilegibles].tolist(),
+                                [matriculas[i] for i in ilegibles], columna,
+                                original.to_numpy()[ilegibles])
+
+            fuera = np.flatnonzero(leidas & ((decimas < MINIMO_DECIMAS) | (decimas > MAXIMO_DECIMAS)))
+            if len(fuera):
+                reporte.agregar('fuera_de_rango', hoja, filas[fuera].tolist(),
+                                [matriculas[i] for i in fuera], columna, decimas[fuera] / 10)
+
+            if campo in ('promedio_parciales', 'calificacion_final'):
+                esperado = calculadas[codigo][campo].to_numpy()
+                distintas = np.flatnonzero(leidas & ~np.isnan(esperado) & (decimas != esperado))
+                if len(distintas):
+                    tipo = 'pp_no_coincide' if campo == 'promedio_parciales' else 'cf_no_coincide'
+                    reporte.agregar(tipo, hoja, filas[distintas].tolist(),
+                                    [matriculas[i] for i in distintas], columna,
+                                    decimas[distintas] / 10, esperado[distintas] / 10)
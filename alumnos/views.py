@@ -1,9 +1,33 @@
 # alumnos/views.py - VERSIÓN CORREGIDA
+import logging
+from calendar import timegm
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from .models import Alumno, Calificacion
+from django.conf import settings
+from .models import Alumno, Calificacion, ResumenAlumno, normalizar_matricula
+from .catalogo import catalogo_materias, resolver_materias
+from .resumen import recalcular_resumenes
+from .cache import clave_calificaciones, obtener_contexto, guardar_contexto, estadisticas
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.formats import localize
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from calificaciones.postgresql_pool import estadisticas_pools
+from calificaciones.replicas import en_replica
+from .instrumentacion import instrumentar, registros_recientes
+from .limites import limitar_login
+from .tablero import DIMENSIONES, FILTROS, opciones_filtros, tablero
 from decimal import Decimal, ROUND_HALF_UP
 
+logger = logging.getLogger(__name__)
+
+@instrumentar('login')
+@limitar_login
+@en_replica
 def login_view(request):
     error = None
     if request.method == 'POST':
@@ -12,18 +36,23 @@ def login_view(request):
             error = "Por favor ingresa una matrícula"
         else:
             try:
-                alumno = Alumno.objects.get(matricula__iexact=matricula)
-                request.session.update({
-                    'alumno_matricula': alumno.matricula,
-                    'alumno_nombre': alumno.nombre_completo(),
-                    'alumno_id': alumno.id,
-                    'alumno_semestre': alumno.semestre  # Guardar semestre en sesión
-                })
+                # Búsqueda por la columna normalizada: una sola consulta por índice
+                alumno = Alumno.objects.get(matricula_normalizada=normalizar_matricula(matricula))
+                request.session.update(datos_de_sesion(alumno))
                 return redirect('calificaciones')
             except Alumno.DoesNotExist:
                 error = f"Matrícula '{matricula}' no encontrada"
     return render(request, 'alumnos/login.html', {'error': error})
 
+def datos_de_sesion(alumno):
+    """Lo que el login guarda en la sesión del alumno"""
+    return {
+        'alumno_matricula': alumno.matricula,
+        'alumno_nombre': alumno.nombre_completo(),
+        'alumno_id': alumno.id,
+        'alumno_semestre': alumno.semestre  # Guardar semestre en sesión
+    }
+
 def formatear_calif(valor):
     """<6 = 5, >=6 redondea (.5 sube, .4 baja)"""
     if valor is None:
@@ -40,202 +69,334 @@ def formatear_calif(valor):
         redondeado = decimal_valor.quantize(Decimal('1'), rounding=ROUND_HALF_UP)
         return int(redondeado)
         
-    except Exception as e:
-        print(f"Error en formatear_calif({valor}): {str(e)}")
+    except Exception:
+        logger.warning("Error en formatear_calif(%r)", valor, exc_info=True)
         return None
 
-def es_tercer_semestre(semestre):
-    """Determina si el semestre es tercero (compatible con texto y número)"""
-    if semestre is None:
-        return False
-    
-    # Convertir a string para comparaciones
-    semestre_str = str(semestre).upper().strip()
-    
-    # Verificar si es tercer semestre
-    return (semestre_str == '3' or 
-            semestre_str == 'TERCERO' or 
-            semestre_str == '3RO' or
-            'TERCERO' in semestre_str)
+def alumno_de_sesion(request):
+    """Alumno de la sesión con su resumen (una consulta), leído una vez por solicitud:
+       lo comparten las validaciones de ETag/Last-Modified y la vista"""
+    if not hasattr(request, '_alumno_sesion'):
+        matricula = request.session.get('alumno_matricula')
+        request._alumno_sesion = (
+            Alumno.objects.select_related('resumen').filter(matricula=matricula).first() if matricula else None
+        )
+    return request._alumno_sesion
+
+def _resumen_de_sesion(request):
+    alumno = alumno_de_sesion(request)
+    return getattr(alumno, 'resumen', None) if alumno is not None else None
+
+def etag_calificaciones(request):
+    # La versión del resumen cambia con cualquier cambio de calificaciones, del alumno o de las
+    # banderas de política de sus materias (Materia.save recalcula los resúmenes afectados);
+    # la del catálogo, con los nombres del plan de estudios
+    resumen = _resumen_de_sesion(request)
+    if resumen is None:
+        return None
+    return f'"{resumen.alumno_id}-{resumen.version}-{catalogo_materias().version}"'
+
+def ultima_modificacion(request):
+    # El resumen se reescribe después de cada cambio de calificaciones (también al borrarlas)
+    resumen = _resumen_de_sesion(request)
+    return resumen.fecha_actualizacion if resumen is not None else None
 
+def datos_de_alumno(request, alumno):
+    """Contexto de calificaciones del alumno (sin el alumno), desde la caché versionada"""
+    # Promedios precalculados (ResumenAlumno), leídos junto con el alumno
+    try:
+        resumen = alumno.resumen
+    except ResumenAlumno.DoesNotExist:
+        recalcular_resumenes([alumno.id])
+        resumen = ResumenAlumno.objects.get(alumno=alumno)
+
+    # La versión del resumen cambia con cada cambio de calificaciones, del alumno
+    # o de las banderas de política de una de sus materias (Materia.save); la del
+    # catálogo, con los nombres de materias y del plan de estudios
+    clave = clave_calificaciones(alumno.matricula, resumen.version, catalogo_materias().version)
+    datos = obtener_contexto(clave)
+    if datos is None:
+        with request.medicion.seccion('calculo'):
+            datos = construir_datos_calificaciones(alumno, resumen)
+        guardar_contexto(clave, datos)
+    return datos
+
+# condition responde 304 antes de entrar a la vista si el navegador ya tiene esta versión;
+# private/no-cache: nada de cachés compartidas y el navegador siempre pregunta
+@instrumentar('calificaciones')
+@en_replica
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=etag_calificaciones, last_modified_func=ultima_modificacion)
 def calificaciones_view(request):
     if not request.session.get('alumno_matricula'):
         return redirect('login')
     
     try:
-        alumno = Alumno.objects.get(matricula=request.session['alumno_matricula'])
-        semestre_alumno = request.session.get('alumno_semestre')
-        
-        # Determinar si es tercer semestre
-        excluir_c3303 = es_tercer_semestre(semestre_alumno)
+        alumno = alumno_de_sesion(request)
+        if alumno is None:
+            raise Alumno.DoesNotExist
+        context = {'alumno': alumno, **datos_de_alumno(request, alumno)}
+        with request.medicion.seccion('render'):
+            return render(request, 'alumnos/calificaciones.html', context)
         
-        # Obtener todas las calificaciones
-        calificaciones = Calificacion.objects.filter(alumno=alumno).select_related('materia')
+    except Alumno.DoesNotExist:
+        messages.error(request, "Alumno no encontrado en la base de datos")
+        return redirect('login')
+    except Exception as e:
+        logger.exception("Error en calificaciones_view (matrícula %s)", request.session.get('alumno_matricula'))
+        messages.error(request, f"Error al cargar calificaciones: {str(e)}")
+        return redirect('login')
+
+@instrumentar('api_calificaciones')
+@en_replica
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=etag_calificaciones, last_modified_func=ultima_modificacion)
+def api_calificaciones_view(request):
+    """Los mismos datos de la página de calificaciones en JSON (solo lectura)"""
+    alumno = alumno_de_sesion(request)
+    if alumno is None:
+        return JsonResponse({'error': 'Inicia sesión con tu matrícula'}, status=401)
+    datos = {clave: valor for clave, valor in datos_de_alumno(request, alumno).items() if clave != 'filas'}
+    return JsonResponse({
+        'alumno': {
+            'matricula': alumno.matricula,
+            'nombre': alumno.nombre_completo(),
+            'semestre': alumno.semestre,
+            'grupo': alumno.grupo,
+        },
+        **datos,
+    })
+
+def construir_datos_calificaciones(alumno, resumen):
+    """Arma el contexto de la página (sin el alumno); es lo que se guarda en caché"""
+    # Obtener todas las calificaciones; las materias salen del catálogo del proceso (sin join)
+    calificaciones = list(Calificacion.objects.filter(alumno=alumno))
+    catalogo = resolver_materias({calif.materia_id for calif in calificaciones})
+    politica = catalogo.politica
+    # Nombres de las materias como aparecen en el plan de estudios del alumno
+    plan = catalogo.plan(alumno.semestre, alumno.carrera)
+    
+    materias_data = []
+    
+    for calif in calificaciones:
+        # Materia que se muestra como 'A' (banderas de Materia, compiladas en alumnos.politica)
+        es_sin_promedio = politica.acreditada(calif.materia_id)
         
-        materias_data = []
-        calificaciones_para_promedio = []  # Calificaciones que SÍ cuentan para promedios
+        # Parciales formateados
+        p1 = formatear_calif(calif.p1) if calif.p1 is not None else None
+        p2 = formatear_calif(calif.p2) if calif.p2 is not None else None
+        p3 = formatear_calif(calif.p3) if calif.p3 is not None else None
         
-        for calif in calificaciones:
-            es_c1301 = calif.materia.codigo == 'C1301'
-            es_c3303 = calif.materia.codigo == 'C3303'
-            
-            # Determinar si es materia sin promedio (mostrar 'A')
-            es_sin_promedio = es_c1301 or (es_c3303 and excluir_c3303)
-            
-            # Parciales formateados
-            p1 = formatear_calif(calif.p1) if calif.p1 is not None else None
-            p2 = formatear_calif(calif.p2) if calif.p2 is not None else None
-            p3 = formatear_calif(calif.p3) if calif.p3 is not None else None
-            
-            # Promedio de parciales (ya calculado automáticamente en el modelo)
-            prom_parciales = calif.promedio_parciales
-            
-            # Examen Final (EF del Excel)
-            examen_final = formatear_calif(calif.examen_final) if calif.examen_final is not None else None
-            
-            # Calificación Final (ya calculada automáticamente en el modelo)
-            calif_final = calif.calificacion_final
-            
-            # Para C1301 y C3303 (si es tercer semestre) mostrar 'A'
-            if es_sin_promedio:
-                calif_final_display = 'A'
-            else:
-                calif_final_display = calif_final
-            
-            materia_data = {
-                'nombre': calif.materia.nombre,
-                'codigo': calif.materia.codigo,
-                'parcial1': p1,
-                'parcial2': p2,
-                'parcial3': p3,
-                'promedio_parciales': prom_parciales,
-                'examen_final': examen_final,
-                'calificacion_final': calif_final_display,
-                'es_c1301': es_c1301,
-                'es_c3303': es_c3303,
-                'es_sin_promedio': es_sin_promedio,  # ¡ESTO ES LO QUE FALTABA!
-                'estado': calif.estado,
-            }
-            
-            materias_data.append(materia_data)
-            
-            # Determinar si la materia cuenta para promedios
-            # C1301 nunca cuenta para promedios
-            if not es_c1301:
-                # C3303 solo cuenta si NO es tercer semestre
-                if es_c3303:
-                    if not excluir_c3303:  # Si NO excluimos C3303, entonces sí cuenta
-                        calificaciones_para_promedio.append(calif)
-                else:
-                    # Para todas las demás materias (que no sean C1301 ni C3303)
-                    calificaciones_para_promedio.append(calif)
-            else:
-                # Para depuración: mostrar que C1301 no cuenta
-                print(f"Materia {calif.materia.codigo} (C1301) excluida de promedios")
+        # Promedio de parciales (ya calculado automáticamente en el modelo)
+        prom_parciales = calif.promedio_parciales
         
-        # DEPURACIÓN: Mostrar qué materias se están considerando
-        print(f"\n=== MATERIAS PARA PROMEDIOS ===")
-        for calif in calificaciones_para_promedio:
-            print(f"- {calif.materia.codigo}: {calif.calificacion_final}")
+        # Examen Final (EF del Excel)
+        examen_final = formatear_calif(calif.examen_final) if calif.examen_final is not None else None
         
-        # Calcular promedios de parciales usando solo las calificaciones que cuentan
-        from django.db.models import Avg
+        # Calificación Final (ya calculada automáticamente en el modelo)
+        calif_final = calif.calificacion_final
         
-        if calificaciones_para_promedio:
-            # Calcular promedios de parciales
-            p1_valores = [calif.p1 for calif in calificaciones_para_promedio if calif.p1 is not None]
-            p2_valores = [calif.p2 for calif in calificaciones_para_promedio if calif.p2 is not None]
-            p3_valores = [calif.p3 for calif in calificaciones_para_promedio if calif.p3 is not None]
-            
-            prom_1er_parcial = sum(p1_valores) / len(p1_valores) if p1_valores else None
-            prom_2do_parcial = sum(p2_valores) / len(p2_valores) if p2_valores else None
-            prom_3er_parcial = sum(p3_valores) / len(p3_valores) if p3_valores else None
+        # Materias acreditadas (p. ej. formación socioemocional): mostrar 'A'
+        if es_sin_promedio:
+            calif_final_display = 'A'
         else:
-            prom_1er_parcial = None
-            prom_2do_parcial = None
-            prom_3er_parcial = None
-        
-        # CALCULAR PROMEDIO FINAL CORRECTAMENTE
-        prom_final_general = None
-        
-        if calificaciones_para_promedio:
-            # Obtener solo las calificaciones finales que existen y no son nulas
-            califs_finales_valores = []
-            materias_incluidas = []
-            for calif in calificaciones_para_promedio:
-                if calif.calificacion_final is not None:
-                    califs_finales_valores.append(calif.calificacion_final)
-                    materias_incluidas.append(calif.materia.codigo)
-            
-            if califs_finales_valores:
-                # Sumar todas las calificaciones finales
-                suma_califs_finales = sum(califs_finales_valores)
-                
-                # Contar cuántas materias se están promediando
-                cantidad_materias = len(califs_finales_valores)
-                
-                # Calcular el promedio
-                prom_final_general = suma_califs_finales / cantidad_materias
-                
-                print(f"\n=== CÁLCULO PROMEDIO FINAL ===")
-                print(f"Semestre: {semestre_alumno}")
-                print(f"¿Excluir C3303? {excluir_c3303}")
-                print(f"Materias para promedio: {cantidad_materias}")
-                print(f"Materias específicas: {materias_incluidas}")
-                print(f"Calificaciones finales: {califs_finales_valores}")
-                print(f"Suma total: {suma_califs_finales}")
-                print(f"Promedio calculado: {prom_final_general}")
-        
-        # Formatear promedios de parciales (con regla especial)
-        prom_1er_formateado = formatear_calif(prom_1er_parcial) if prom_1er_parcial is not None else None
-        prom_2do_formateado = formatear_calif(prom_2do_parcial) if prom_2do_parcial is not None else None
-        prom_3er_formateado = formatear_calif(prom_3er_parcial) if prom_3er_parcial is not None else None
+            calif_final_display = calif_final
         
-        # Promedio final - VALOR EXACTO con precisión decimal
-        prom_final_exacto = None
-        if prom_final_general is not None:
-            # Usar Decimal para redondeo preciso a 1 decimal
-            try:
-                prom_final_exacto = Decimal(str(prom_final_general)).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP)
-            except:
-                # Fallback si hay error
-                prom_final_exacto = round(prom_final_general, 1)
-        
-        # Depuración (opcional - remover después)
-        print(f"\n=== RESUMEN FINAL ===")
-        print(f"Alumno: {alumno.matricula}")
-        print(f"Semestre: {semestre_alumno}")
-        print(f"¿Excluir C3303? {excluir_c3303}")
-        print(f"Total materias: {calificaciones.count()}")
-        print(f"Materias para promedios: {len(calificaciones_para_promedio)}")
-        print(f"Promedio 1er parcial: {prom_1er_parcial} -> {prom_1er_formateado}")
-        print(f"Promedio 2do parcial: {prom_2do_parcial} -> {prom_2do_formateado}")
-        print(f"Promedio 3er parcial: {prom_3er_parcial} -> {prom_3er_formateado}")
-        print(f"Promedio final general: {prom_final_general} -> {prom_final_exacto}")
-        
-        context = {
-            'alumno': alumno,
-            'materias': materias_data,
-            'prom_1er_parcial': prom_1er_formateado,
-            'prom_2do_parcial': prom_2do_formateado,
-            'prom_3er_parcial': prom_3er_formateado,
-            'promedio_final': prom_final_exacto,
-            'excluir_c3303': excluir_c3303,
-            'cantidad_materias_promedio': len(calificaciones_para_promedio),  # Para depuración
+        materia = catalogo.por_id[calif.materia_id]
+        materia_data = {
+            'nombre': plan.get(materia.codigo) or materia.nombre,
+            'codigo': materia.codigo,
+            'parcial1': p1,
+            'parcial2': p2,
+            'parcial3': p3,
+            'promedio_parciales': prom_parciales,
+            'examen_final': examen_final,
+            'calificacion_final': calif_final_display,
+            'cuenta_promedio': politica.cuenta(calif.materia_id),
+            'es_sin_promedio': es_sin_promedio,
+            'estado': calif.estado,
         }
         
-        return render(request, 'alumnos/calificaciones.html', context)
-        
-    except Alumno.DoesNotExist:
+        materias_data.append(materia_data)
+    
+    prom_1er_parcial = resumen.prom_1er_parcial
+    prom_2do_parcial = resumen.prom_2do_parcial
+    prom_3er_parcial = resumen.prom_3er_parcial
+    prom_final_general = resumen.prom_final
+    
+    # Formatear promedios de parciales (con regla especial)
+    prom_1er_formateado = formatear_calif(prom_1er_parcial) if prom_1er_parcial is not None else None
+    prom_2do_formateado = formatear_calif(prom_2do_parcial) if prom_2do_parcial is not None else None
+    prom_3er_formateado = formatear_calif(prom_3er_parcial) if prom_3er_parcial is not None else None
+    
+    # Promedio final - VALOR EXACTO con precisión decimal
+    prom_final_exacto = None
+    if prom_final_general is not None:
+        # Usar Decimal para redondeo preciso a 1 decimal
+        try:
+            prom_final_exacto = Decimal(str(prom_final_general)).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP)
+        except:
+            # Fallback si hay error
+            prom_final_exacto = round(prom_final_general, 1)
+    
+    return {
+        'materias': materias_data,
+        'filas': filas_de_presentacion(materias_data),
+        'prom_1er_parcial': prom_1er_formateado,
+        'prom_2do_parcial': prom_2do_formateado,
+        'prom_3er_parcial': prom_3er_formateado,
+        'promedio_final': prom_final_exacto,
+        'cantidad_materias_promedio': resumen.materias_contadas,  # Para depuración
+    }
+
+def celda(valor, clase):
+    """Celda de calificación ya resuelta para la plantilla: (clase CSS completa, texto).
+       El texto ya va localizado como lo mostraría la plantilla (formatear números en cada
+       render es lo más caro de la página). Sin valor (o 0) la clase es None y se muestra un guion"""
+    if valor is None or not valor > 0:
+        return (None, None)
+    return (f"{clase} {'aprobado' if valor >= 6 else 'reprobado'}", localize(valor))
+
+def filas_de_presentacion(materias):
+    """Modelo de presentación de la tabla: por materia, las celdas con su clase CSS y valor.
+       Se calcula junto con el contexto (y se guarda en la caché), así la plantilla no compara nada"""
+    filas = []
+    for materia in materias:
+        if materia['es_sin_promedio']:
+            # Materias acreditadas: se muestran con letra
+            clase_final, final = 'promedio-materia letra', 'A'
+        else:
+            clase_final, final = celda(materia['calificacion_final'], 'calificacion-final-circle')
+        filas.append({
+            'nombre': materia['nombre'],
+            'cuenta_promedio': materia['cuenta_promedio'],
+            'celdas': (
+                celda(materia['parcial1'], 'calificacion-circle'),
+                celda(materia['parcial2'], 'calificacion-circle'),
+                celda(materia['parcial3'], 'calificacion-circle'),
+                celda(materia['promedio_parciales'], 'promedio-materia'),
+                celda(materia['examen_final'], 'calificacion-circle'),
+            ),
+            'clase_final': clase_final,
+            'final': final,
+        })
+    return filas
+
+@staff_member_required
+def cache_estadisticas_view(request):
+    """Aciertos/fallos de la caché de calificaciones en este proceso (solo personal)"""
+    return JsonResponse(estadisticas())
+
+@staff_member_required
+def pool_estadisticas_view(request):
+    """Préstamos, esperas y saturación de los pools de conexiones de este proceso (solo personal)"""
+    return JsonResponse(estadisticas_pools())
+
+@staff_member_required
+def solicitudes_lentas_view(request):
+    """Solicitudes lentas recientes registradas por la instrumentación (solo personal)"""
+    umbral = getattr(settings, 'INSTRUMENTACION_UMBRAL_MS', 500)
+    try:
+        minimo = float(request.GET.get('minimo', umbral))
+    except ValueError:
+        minimo = umbral
+    context = {
+        'title': 'Solicitudes lentas',
+        'activa': getattr(settings, 'INSTRUMENTACION_ACTIVA', False),
+        'minimo': minimo,
+        'registros': registros_recientes(minimo),
+    }
+    return render(request, 'alumnos/solicitudes_lentas.html', context)
+
+@staff_member_required
+@en_replica
+def tablero_view(request):
+    """Aprobación, promedios y distribución de CF por grupo, semestre, carrera o materia (solo personal)"""
+    dimension = request.GET.get('por', 'grupo')
+    if dimension not in DIMENSIONES:
+        dimension = 'grupo'
+    filtros = {nombre: request.GET.get(nombre, '') for nombre in FILTROS}
+    context = {
+        'title': 'Estadísticas de calificaciones',
+        'dimension': dimension,
+        'titulo_dimension': DIMENSIONES[dimension][2],
+        'dimensiones': {clave: datos[2] for clave, datos in DIMENSIONES.items()},
+        'selectores': [(nombre, valores, filtros[nombre]) for nombre, valores in opciones_filtros().items()],
+        'filas': tablero(dimension, filtros),
+    }
+    return render(request, 'alumnos/tablero.html', context)
+
+def logout_view(request):
+    request.session.flush()
+    return redirect('login')
+
+# Vistas asíncronas del alumno: las usa el servidor ASGI (calificaciones.urls_asgi).
+# Django 4.2 todavía no tiene API asíncrona de sesiones (aget/aset) ni versiones async
+# de condition/cache_control: la sesión se carga con sync_to_async (después se lee en
+# memoria) y el GET condicional se resuelve aquí con get_conditional_response.
+
+async def valor_de_sesion(request, clave):
+    """request.session.get fuera del event loop: la primera lectura carga la sesión (BD o caché)"""
+    return await sync_to_async(request.session.get)(clave)
+
+@instrumentar('login')
+@limitar_login
+@en_replica
+async def login_async_view(request):
+    error = None
+    if request.method == 'POST':
+        matricula = request.POST.get('matricula', '').strip()
+        if not matricula:
+            error = "Por favor ingresa una matrícula"
+        else:
+            try:
+                alumno = await Alumno.objects.aget(matricula_normalizada=normalizar_matricula(matricula))
+                await sync_to_async(request.session.update)(datos_de_sesion(alumno))
+                return redirect('calificaciones')
+            except Alumno.DoesNotExist:
+                error = f"Matrícula '{matricula}' no encontrada"
+    return render(request, 'alumnos/login.html', {'error': error})
+
+@instrumentar('calificaciones')
+@en_replica
+async def calificaciones_async_view(request):
+    """calificaciones_view para ASGI: mismos encabezados (ETag, Last-Modified, private/no-cache)"""
+    respuesta = await _calificaciones_async(request)
+    patch_cache_control(respuesta, private=True, no_cache=True)
+    return respuesta
+
+async def _calificaciones_async(request):
+    matricula = await valor_de_sesion(request, 'alumno_matricula')
+    if not matricula:
+        return redirect('login')
+    alumno = await Alumno.objects.select_related('resumen').filter(matricula=matricula).afirst()
+    if alumno is None:
         messages.error(request, "Alumno no encontrado en la base de datos")
         return redirect('login')
+    request._alumno_sesion = alumno  # etag_calificaciones/ultima_modificacion ya no consultan
+
+    # El catálogo puede consultar la caché o la BD al revisar su versión
+    etag = await sync_to_async(etag_calificaciones)(request)
+    modificado = ultima_modificacion(request)
+    modificado = timegm(modificado.utctimetuple()) if modificado else None
+    respuesta = get_conditional_response(request, etag=etag, last_modified=modificado)
+    if respuesta is not None:
+        return respuesta
+
+    try:
+        datos = await sync_to_async(datos_de_alumno)(request, alumno)
+        with request.medicion.seccion('render'):
+            respuesta = render(request, 'alumnos/calificaciones.html', {'alumno': alumno, **datos})
     except Exception as e:
-        print(f"Error en calificaciones_view: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
+        logger.exception("Error en calificaciones_async_view (matrícula %s)", matricula)
         messages.error(request, f"Error al cargar calificaciones: {str(e)}")
         return redirect('login')
+    if etag:
+        respuesta.headers['ETag'] = quote_etag(etag)
+    if modificado:
+        respuesta.headers['Last-Modified'] = http_date(modificado)
+    return respuesta
 
-def logout_view(request):
-    request.session.flush()
-    return redirect('login')
\ No newline at end of file
+async def logout_async_view(request):
+    await sync_to_async(request.session.flush)()
+    return redirect('login')
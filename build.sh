@@ -6,6 +6,10 @@ pip install -r requirements.txt
 
 echo "=== APLICANDO MIGRACIONES ==="
 python manage.py migrate
+python manage.py createcachetable
+
+echo "=== ACTUALIZANDO RESUMENES DE ALUMNOS ==="
+python manage.py reconstruir_resumenes
 
 echo "=== RECOLECTANDO ARCHIVOS ESTATICOS ==="
 python manage.py collectstatic --noinput
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'calificaciones.settings')
+# Vistas asíncronas del alumno y conexiones a la BD por solicitud (ver settings)
+os.environ.setdefault('SERVIDOR', 'asgi')
 
 application = get_asgi_application()
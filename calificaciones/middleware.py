@@ -0,0 +1,36 @@
+"""
+Middleware del proyecto.
+
+WhiteNoise 6 solo declara modo síncrono: bajo ASGI Django ejecutaría ese
+middleware (y con él toda la cadena de abajo) en un hilo, y las vistas
+asíncronas volverían al event loop con async_to_sync en cada solicitud.
+Esta subclase atiende los dos modos con la misma lógica.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from whitenoise import middleware
+
+
+class WhiteNoiseMiddleware(middleware.WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            # Solo abre el archivo; el servidor ASGI lo envía por partes
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,52 @@
+"""
+Backend de PostgreSQL con pool de conexiones por proceso (psycopg 3 + psycopg_pool).
+
+Django 4.2 no tiene pool propio (llega en 5.1 con la misma opción OPTIONS['pool']).
+Aquí cada alias tiene un psycopg_pool.ConnectionPool compartido por todos los
+hilos del proceso: connect() toma una conexión del pool y close() la devuelve,
+así que con CONN_MAX_AGE = 0 cada solicitud la usa solo mientras corre. Las
+conexiones del pool viven entre solicitudes, con lo que también sus sentencias
+preparadas (OPTIONS 'server_side_binding' y 'prepare_threshold').
+
+    OPTIONS = {'pool': {'min_size': 2, 'max_size': 4, 'timeout': 10}, ...}
+
+estadisticas_pools() resume préstamos, esperas y saturación de cada pool.
+"""
+import threading
+
+# {(alias, bd, host, puerto, usuario): ConnectionPool} de este proceso (los llena base.py)
+pools = {}
+candado = threading.Lock()
+
+
+def cerrar_pools(alias=None):
+    """Cierra los pools (de un alias o todos) de este proceso"""
+    with candado:
+        for clave in [clave for clave in pools if alias is None or clave[0] == alias]:
+            pools.pop(clave).close()
+
+
+def estadisticas_pools():
+    """{alias: métricas} de los pools de este proceso.
+       prestamos: conexiones entregadas; esperas: préstamos que tuvieron que esperar a que se
+       liberara una; agotados: esperas que vencieron (timeout); saturacion: en uso / máximo"""
+    resultado = {}
+    for (alias, nombre, *_), pool in list(pools.items()):
+        datos = pool.get_stats()
+        tamano = datos.get('pool_size', 0)
+        en_uso = tamano - datos.get('pool_available', 0)
+        resultado[alias] = {
+            'bd': nombre,
+            'minimo': pool.min_size,
+            'maximo': pool.max_size,
+            'abiertas': tamano,
+            'en_uso': en_uso,
+            'saturacion': round(en_uso / pool.max_size, 4) if pool.max_size else None,
+            'prestamos': datos.get('requests_num', 0),
+            'esperas': datos.get('requests_queued', 0),
+            'espera_ms': datos.get('requests_wait_ms', 0),
+            'en_espera': datos.get('requests_waiting', 0),
+            'agotados': datos.get('requests_errors', 0),
+            'conexiones_creadas': datos.get('connections_num', 0),
+        }
+    return resultado
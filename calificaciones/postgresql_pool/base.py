@@ -0,0 +1,82 @@
+"""Backend de calificaciones.postgresql_pool (ver el paquete)"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base, creation
+from django.utils.asyncio import async_unsafe
+
+from . import candado, cerrar_pools, pools
+
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError:  # dependencia opcional
+    ConnectionPool = None
+
+
+def _pool(alias, conn_params, opciones):
+    """Pool del alias en este proceso; se crea con la primera conexión"""
+    clave = (alias, conn_params.get('dbname'), conn_params.get('host'), conn_params.get('port'),
+             conn_params.get('user'))
+    pool = pools.get(clave)
+    if pool is not None:
+        return pool
+    with candado:
+        if clave not in pools:
+            pools[clave] = ConnectionPool(
+                kwargs=conn_params,
+                min_size=opciones.get('min_size', 2),
+                max_size=opciones.get('max_size', 4),
+                timeout=opciones.get('timeout', 10),
+                max_idle=opciones.get('max_idle', 600),
+                name=alias,
+                open=True,
+            )
+        return pools[clave]
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Las conexiones inactivas de los pools no dejarían borrar la BD de pruebas; las réplicas
+        # espejo (TEST['MIRROR']) tienen su propio pool sobre la misma BD
+        cerrar_pools(self.connection.alias)
+        for alias, nombre, *_ in list(pools):
+            if nombre == test_database_name:
+                cerrar_pools(alias)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+    _pool = None  # pool del que salió la conexión actual
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        opciones = self.settings_dict['OPTIONS'].get('pool')
+        # La conexión auxiliar sin BD (p. ej. al crear la BD de pruebas) no usa el pool
+        if not opciones or self.alias == NO_DB_ALIAS:
+            return super().get_new_connection(conn_params)
+        if ConnectionPool is None:
+            raise ImproperlyConfigured("OPTIONS['pool'] requiere psycopg 3 y psycopg_pool (pip install psycopg_pool)")
+        if self.settings_dict['CONN_MAX_AGE'] != 0:
+            raise ImproperlyConfigured("Con OPTIONS['pool'] CONN_MAX_AGE debe ser 0 (el pool conserva las conexiones)")
+
+        pool = _pool(self.alias, conn_params, opciones if isinstance(opciones, dict) else {})
+        conexion = pool.getconn()
+        self._pool = pool
+        nivel = self.settings_dict['OPTIONS'].get('isolation_level')
+        self.isolation_level = base.IsolationLevel(nivel) if nivel is not None else base.IsolationLevel.READ_COMMITTED
+        if nivel is not None:
+            conexion.isolation_level = self.isolation_level
+        return conexion
+
+    def _close(self):
+        if self._pool is None:
+            return super()._close()
+        pool, self._pool = self._pool, None
+        # El pool revierte una transacción abierta y descarta las conexiones rotas
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
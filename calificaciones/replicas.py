@@ -0,0 +1,147 @@
+"""
+Lecturas en réplicas de la BD.
+
+Con DATABASE_REPLICA_URLS (ver settings) hay alias 'replica1', 'replica2'...
+El router manda a una réplica solo las lecturas de los modelos de alumnos
+hechas dentro de en_replica / lecturas_en_replica (la página y la API del
+alumno, el login y el tablero; la exportación con --replica). Todo lo demás
+(admin, importadores, sesiones, usuarios) y todas las escrituras van a la
+primaria.
+
+Leer lo que se acaba de escribir:
+  - en la misma solicitud, después de la primera escritura todas las
+    lecturas van a la primaria (y también dentro de una transacción),
+  - si quien escribió es del personal, su navegador recibe la cookie
+    leer_primaria y durante REPLICA_FIJAR_SEGUNDOS sus solicitudes leen de la
+    primaria aunque la réplica vaya atrasada.
+El estado de la solicitud viaja en una ContextVar (sirve con WSGI y ASGI).
+"""
+import functools
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+COOKIE_PRIMARIA = 'leer_primaria'
+# Modelos que se replican y que las vistas pueden leer de una réplica
+APPS_REPLICADAS = {'alumnos'}
+
+
+class EstadoSolicitud:
+    __slots__ = ('replica', 'fijada', 'escribio')
+
+    def __init__(self, fijada=False):
+        self.replica = None  # alias para las lecturas; None = primaria
+        self.fijada = fijada  # cookie leer_primaria
+        self.escribio = False
+
+
+_estado = ContextVar('estado_replicas', default=None)
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+@contextmanager
+def lecturas_en_replica():
+    """Dentro del bloque las lecturas de alumnos van a una réplica (si hay y no se fijó la primaria)"""
+    estado = _estado.get()
+    token = None
+    if estado is None:  # fuera de una solicitud (comandos)
+        estado = EstadoSolicitud()
+        token = _estado.set(estado)
+    anterior = estado.replica
+    if not estado.fijada and replicas():
+        estado.replica = random.choice(replicas())
+    try:
+        yield
+    finally:
+        estado.replica = anterior
+        if token is not None:
+            _estado.reset(token)
+
+
+def en_replica(vista):
+    """Decorador de vistas de solo lectura (síncronas o asíncronas)"""
+    if iscoroutinefunction(vista):
+        @functools.wraps(vista)
+        async def envoltura_asincrona(request, *args, **kwargs):
+            with lecturas_en_replica():
+                return await vista(request, *args, **kwargs)
+        return envoltura_asincrona
+
+    @functools.wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        with lecturas_en_replica():
+            return vista(request, *args, **kwargs)
+    return envoltura
+
+
+class RouterReplicas:
+    def db_for_read(self, model, **hints):
+        estado = _estado.get()
+        if estado is None or estado.replica is None or estado.escribio:
+            return None
+        if model._meta.app_label not in APPS_REPLICADAS:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return estado.replica
+
+    def db_for_write(self, model, **hints):
+        estado = _estado.get()
+        if estado is not None:
+            estado.escribio = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Lo leído de una réplica se puede relacionar (y guardar) con lo de la primaria
+        bases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in bases and obj2._state.db in bases:
+            return True
+        return None
+
+
+def _fijar_primaria(respuesta):
+    respuesta.set_cookie(COOKIE_PRIMARIA, '1', max_age=getattr(settings, 'REPLICA_FIJAR_SEGUNDOS', 30),
+                         httponly=True, samesite='Lax')
+
+
+class ReplicasMiddleware:
+    """Estado de réplicas por solicitud; después de una escritura del personal fija la primaria.
+       Va después de AuthenticationMiddleware"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        estado = EstadoSolicitud(fijada=COOKIE_PRIMARIA in request.COOKIES)
+        token = _estado.set(estado)
+        try:
+            respuesta = self.get_response(request)
+        finally:
+            _estado.reset(token)
+        if estado.escribio and replicas() and request.user.is_staff:
+            _fijar_primaria(respuesta)
+        return respuesta
+
+    async def __acall__(self, request):
+        estado = EstadoSolicitud(fijada=COOKIE_PRIMARIA in request.COOKIES)
+        token = _estado.set(estado)
+        try:
+            respuesta = await self.get_response(request)
+        finally:
+            _estado.reset(token)
+        if estado.escribio and replicas() and await sync_to_async(lambda: request.user.is_staff)():
+            _fijar_primaria(respuesta)
+        return respuesta
@@ -0,0 +1,64 @@
+"""
+Configuración de gunicorn para servir el portal con WSGI o con ASGI.
+
+    gunicorn -c python:calificaciones.servidor                  # WSGI (por defecto)
+    SERVIDOR=asgi gunicorn -c python:calificaciones.servidor    # ASGI (pip install uvicorn-worker)
+
+Variables de entorno:
+  SERVIDOR             'wsgi' o 'asgi'
+  WEB_CONCURRENCY      procesos; por defecto uno por núcleo
+  SERVIDOR_HILOS       hilos por proceso con WSGI (trabajador gthread), 4 por defecto
+  SERVIDOR_CONEXIONES  conexiones por proceso, 100 por defecto. Con ASGI es el límite de
+                       solicitudes en curso: las que sobran reciben 503 en lugar de esperar
+  PORT                 puerto (Render lo define), 8000 por defecto
+
+Con WSGI cada proceso atiende SERVIDOR_HILOS solicitudes a la vez; con ASGI un
+event loop por proceso atiende todas y el ORM corre en un hilo por solicitud.
+"""
+import os
+
+try:
+    from uvicorn_worker import UvicornWorker
+except ImportError:  # dependencia opcional
+    UvicornWorker = None
+
+SERVIDORES = ('wsgi', 'asgi')
+
+
+def configuracion(entorno=os.environ, nucleos=None):
+    """Ajustes de gunicorn {nombre: valor} para el servidor de entorno['SERVIDOR']"""
+    servidor = entorno.get('SERVIDOR', 'wsgi')
+    if servidor not in SERVIDORES:
+        raise ValueError(f"SERVIDOR debe ser 'wsgi' o 'asgi', no {servidor!r}")
+    nucleos = nucleos or os.cpu_count() or 1
+    ajustes = {
+        'bind': f"0.0.0.0:{entorno.get('PORT', '8000')}",
+        'workers': int(entorno.get('WEB_CONCURRENCY', nucleos)),
+        'worker_connections': int(entorno.get('SERVIDOR_CONEXIONES', '100')),
+        'keepalive': 5,
+    }
+    if servidor == 'asgi':
+        ajustes.update(
+            wsgi_app='calificaciones.asgi:application',
+            worker_class='calificaciones.servidor.TrabajadorASGI',
+        )
+    else:
+        ajustes.update(
+            wsgi_app='calificaciones.wsgi:application',
+            worker_class='gthread',
+            threads=int(entorno.get('SERVIDOR_HILOS', '4')),
+        )
+    return ajustes
+
+
+if UvicornWorker is not None:
+    class TrabajadorASGI(UvicornWorker):
+        """Trabajador de uvicorn que respeta worker_connections (limit_concurrency de uvicorn)"""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.config.limit_concurrency = self.cfg.worker_connections
+
+
+# gunicorn lee los ajustes como variables de este módulo (ignora los demás nombres)
+globals().update(configuracion())
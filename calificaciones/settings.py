@@ -35,16 +35,21 @@ INSTALLED_APPS = [
 # ¡NO COMENTES EL MIDDLEWARE DE CSRF! Es esencial para seguridad
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # <-- AGREGA ESTO para archivos estáticos
+    'calificaciones.middleware.WhiteNoiseMiddleware',  # <-- AGREGA ESTO para archivos estáticos (WhiteNoise con modo async)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',  # <-- DESCOMENTA ESTA LÍNEA
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'calificaciones.replicas.ReplicasMiddleware',  # lecturas en réplicas (después de la autenticación)
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'calificaciones.urls'
+# Servidor: 'wsgi' (por defecto, gunicorn calificaciones.wsgi) o 'asgi' (lo fija calificaciones.asgi).
+# Con 'asgi' login, calificaciones y logout del alumno son vistas asíncronas (calificaciones.urls_asgi)
+# Configuración de gunicorn para los dos: calificaciones/servidor.py
+SERVIDOR = os.environ.get('SERVIDOR', 'wsgi')
+ROOT_URLCONF = 'calificaciones.urls_asgi' if SERVIDOR == 'asgi' else 'calificaciones.urls'
 
 TEMPLATES = [
     {
@@ -61,6 +66,17 @@ TEMPLATES = [
     },
 ]
 
+# En producción las plantillas se compilan una vez por proceso (cargador con caché explícito);
+# en desarrollo se leen de disco para ver los cambios sin reiniciar
+if not DEBUG:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'calificaciones.wsgi.application'
 
 # Database
@@ -78,10 +94,115 @@ DATABASES = {
 import dj_database_url
 if os.environ.get('DATABASE_URL'):
     DATABASES['default'] = dj_database_url.config(
-        conn_max_age=600,
+        # Bajo ASGI el ORM corre en un hilo por solicitud: conexiones persistentes quedarían huérfanas
+        conn_max_age=0 if SERVIDOR == 'asgi' else 600,
         conn_health_checks=True,
     )
 
+# Réplicas de lectura (opcional): DATABASE_REPLICA_URLS con una o más URLs separadas por comas.
+# La página, la API y el login del alumno y el tablero leen los datos de alumnos de una réplica;
+# las escrituras y lo demás van a la primaria (calificaciones.replicas). Después de que alguien del
+# personal guarda algo, su navegador lee de la primaria durante REPLICA_FIJAR_SEGUNDOS
+DATABASE_REPLICAS = []
+for numero, url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')), 1):
+    DATABASES[f'replica{numero}'] = {
+        **dj_database_url.parse(url.strip(), conn_max_age=0 if SERVIDOR == 'asgi' else 600, conn_health_checks=True),
+        # En las pruebas la réplica es la misma BD de pruebas que la primaria
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{numero}')
+DATABASE_ROUTERS = ['calificaciones.replicas.RouterReplicas']
+REPLICA_FIJAR_SEGUNDOS = int(os.environ.get('REPLICA_FIJAR_SEGUNDOS', '30'))
+
+# Perfil con pool (opcional, solo PostgreSQL): DB_POOL=True con pip install "psycopg[binary]" psycopg_pool
+#   Los hilos de cada proceso comparten un pool de DB_POOL_MIN a DB_POOL_MAX conexiones
+#   (calificaciones.postgresql_pool) y las consultas que se repiten (matrícula del login,
+#   calificaciones del alumno) se preparan en el servidor desde su ejecución DB_PREPARE_THRESHOLD
+#   (también en las réplicas). Métricas del pool: /estado/bd/ (solo personal)
+for base_datos in DATABASES.values():
+    if base_datos['ENGINE'] != 'django.db.backends.postgresql' or os.environ.get('DB_POOL', 'False') != 'True':
+        continue
+    base_datos.update(ENGINE='calificaciones.postgresql_pool', CONN_MAX_AGE=0)
+    base_datos.setdefault('OPTIONS', {}).update(
+        pool={
+            'min_size': int(os.environ.get('DB_POOL_MIN', '2')),
+            'max_size': int(os.environ.get('DB_POOL_MAX', '4')),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        },
+        server_side_binding=True,
+        prepare_threshold=int(os.environ.get('DB_PREPARE_THRESHOLD', '2')),
+    )
+
+# Caché (página de calificaciones del alumno)
+# CACHE_BACKEND: 'locmem' (por defecto), 'file' o 'db'. No requiere servicios externos.
+# Con 'db' hay que crear la tabla: python manage.py createcachetable
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+}
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+CACHE_LOCATIONS = {
+    'locmem': 'calificaciones',
+    'file': os.path.join(BASE_DIR, 'cache'),
+    'db': 'cache_calificaciones',
+}
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': os.environ.get('CACHE_LOCATION', CACHE_LOCATIONS[CACHE_BACKEND]),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '10000'))},
+    }
+}
+CALIFICACIONES_CACHE_ALIAS = 'default'
+CALIFICACIONES_CACHE_TIMEOUT = int(os.environ.get('CALIFICACIONES_CACHE_TIMEOUT', '3600'))
+# Segundos que se guardan las estadísticas del tablero (/estadisticas/) de cada alcance
+ESTADISTICAS_CACHE_TIMEOUT = int(os.environ.get('ESTADISTICAS_CACHE_TIMEOUT', '600'))
+
+# Cada cuántos segundos revisa cada proceso si cambió el catálogo de materias y el plan de
+# estudios (alumnos.catalogo); con una caché compartida solo lo relee si cambió la versión
+CATALOGO_MATERIAS_TTL = int(os.environ.get('CATALOGO_MATERIAS_TTL', '30'))
+
+# Sesiones: SESSION_MODE elige dónde se guardan
+#   'db' (por defecto)    una fila por sesión; cada login escribe en la BD
+#   'cached_db'           escribe en la BD pero las lecturas salen de la caché
+#   'cache'               solo caché (usar CACHE_BACKEND 'file' o 'db' con varios procesos)
+#   'signed_cookies'      sin almacenamiento en el servidor; los datos van firmados en la cookie
+#                         (requiere la misma SECRET_KEY en todos los procesos)
+# Las filas vencidas se borran con: python manage.py limpiar_sesiones
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_MODE = os.environ.get('SESSION_MODE', 'db')
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+SESSION_CACHE_ALIAS = 'default'
+SESSION_COOKIE_AGE = int(os.environ.get('SESSION_COOKIE_AGE', str(60 * 60 * 24 * 14)))
+
+# Límites del login del alumno (alumnos.limites). Formato 'intentos/segundos': solo cuentan los
+# intentos fallidos; al pasarse se responde 429 con Retry-After sin consultar la BD.
+# Toda una escuela puede salir por una sola IP (NAT): la cubeta de la IP es mucho más grande
+# que la del prefijo, que es la que frena los barridos
+LOGIN_LIMITES = os.environ.get('LOGIN_LIMITES', 'True') == 'True'
+LOGIN_LIMITE_IP = os.environ.get('LOGIN_LIMITE_IP', '300/60')
+LOGIN_LIMITE_PREFIJO = os.environ.get('LOGIN_LIMITE_PREFIJO', '60/60')
+LOGIN_PREFIJO_LONGITUD = int(os.environ.get('LOGIN_PREFIJO_LONGITUD', '6'))
+# Logins simultáneos por proceso; los que sobran reciben 429 de inmediato
+LOGIN_CONCURRENCIA_MAXIMA = int(os.environ.get('LOGIN_CONCURRENCIA_MAXIMA', '16'))
+# True: las cubetas van en la caché de Django (compartidas entre procesos con CACHE_BACKEND 'db' o 'file')
+LOGIN_LIMITE_COMPARTIDO = os.environ.get('LOGIN_LIMITE_COMPARTIDO', 'False') == 'True'
+# En Render REMOTE_ADDR es el proxy (la misma para todos): ahí se usa la dirección que él agrega
+# a X-Forwarded-For
+LOGIN_IP_META = os.environ.get('LOGIN_IP_META', 'HTTP_X_FORWARDED_FOR' if RENDER_EXTERNAL_HOSTNAME else 'REMOTE_ADDR')
+
+# Instrumentación de las vistas del alumno (apagada por defecto)
+# Guarda en memoria las últimas solicitudes; las lentas se ven en /estado/lentas/
+INSTRUMENTACION_ACTIVA = os.environ.get('INSTRUMENTACION', 'False') == 'True'
+INSTRUMENTACION_UMBRAL_MS = float(os.environ.get('INSTRUMENTACION_UMBRAL_MS', '500'))
+INSTRUMENTACION_TAMANO = int(os.environ.get('INSTRUMENTACION_TAMANO', '200'))
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -0,0 +1,19 @@
+"""
+URLs del servidor ASGI (SERVIDOR=asgi, lo fija calificaciones.asgi).
+
+Las mismas que calificaciones.urls, pero login, calificaciones y logout del
+alumno son las vistas asíncronas; el resto de las vistas (admin, API,
+tablero) siguen siendo síncronas y Django las ejecuta en un hilo.
+"""
+
+from django.urls import path
+
+from alumnos import views
+from . import urls
+
+urlpatterns = [
+    path('', views.login_async_view, name='login'),
+    path('login/', views.login_async_view, name='login'),
+    path('calificaciones/', views.calificaciones_async_view, name='calificaciones'),
+    path('logout/', views.logout_async_view, name='logout'),
+] + urls.urlpatterns
@@ -0,0 +1,78 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Efecto hover mejorado para las tarjetas
+    document.querySelectorAll('.detail-card').forEach(card => {
+        card.addEventListener('mouseenter', function() {
+            this.style.zIndex = '10';
+        });
+
+        card.addEventListener('mouseleave', function() {
+            this.style.zIndex = '1';
+        });
+    });
+
+    // Efecto hover en las calificaciones circulares
+    document.querySelectorAll('.calificacion-circle, .calificacion-final-circle').forEach(circle => {
+        circle.addEventListener('mouseenter', function() {
+            this.style.transform = 'scale(1.08)';
+        });
+
+        circle.addEventListener('mouseleave', function() {
+            this.style.transform = 'scale(1)';
+        });
+    });
+
+    // Efecto hover en promedios de materia
+    document.querySelectorAll('.promedio-materia').forEach(item => {
+        item.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-2px)';
+        });
+
+        item.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0)';
+        });
+    });
+
+    // Añadir tooltips a las calificaciones
+    document.querySelectorAll('.calificacion-circle, .calificacion-final-circle').forEach(circle => {
+        const score = circle.textContent.trim();
+        const aprobado = circle.classList.contains('aprobado');
+        const reprobado = circle.classList.contains('reprobado');
+
+        let tooltipText = `Calificación: ${score}`;
+        if (aprobado) {
+            tooltipText += ' (Aprobado)';
+        } else if (reprobado) {
+            tooltipText += ' (No aprobado)';
+        }
+
+        circle.setAttribute('title', tooltipText);
+        circle.setAttribute('data-bs-toggle', 'tooltip');
+    });
+
+    // Añadir tooltips a los promedios de materia
+    document.querySelectorAll('.promedio-materia').forEach(item => {
+        if (!item.classList.contains('letra')) {
+            const score = item.textContent.trim();
+            const aprobado = item.classList.contains('aprobado');
+            const reprobado = item.classList.contains('reprobado');
+
+            let tooltipText = `Promedio: ${score}`;
+            if (aprobado) {
+                tooltipText += ' (Aprobado)';
+            } else if (reprobado) {
+                tooltipText += ' (No aprobado)';
+            }
+
+            item.setAttribute('title', tooltipText);
+            item.setAttribute('data-bs-toggle', 'tooltip');
+        }
+    });
+
+    // Inicializar tooltips de Bootstrap si están disponibles
+    if (typeof bootstrap !== 'undefined' && bootstrap.Tooltip) {
+        var tooltipTriggerList = [].slice.call(document.querySelectorAll('[data-bs-toggle="tooltip"]'));
+        var tooltipList = tooltipTriggerList.map(function (tooltipTriggerEl) {
+            return new bootstrap.Tooltip(tooltipTriggerEl);
+        });
+    }
+});
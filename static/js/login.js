@@ -0,0 +1,235 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const form = document.getElementById('loginForm');
+    const submitBtn = document.getElementById('submitBtn');
+    const matriculaInput = document.getElementById('matriculaInput');
+    const logo = document.querySelector('.logo-corner');
+
+    // Efecto flotante sutil en el logo
+    function startLogoFloat() {
+        logo.style.animation = 'float 4s ease-in-out infinite';
+    }
+
+    function stopLogoFloat() {
+        logo.style.animation = '';
+    }
+
+    logo.addEventListener('mouseenter', function() {
+        stopLogoFloat();
+    });
+
+    logo.addEventListener('mouseleave', function() {
+        startLogoFloat();
+    });
+
+    // Iniciar efecto flotante
+    startLogoFloat();
+
+    // Efectos en el input de matrícula
+    matriculaInput.addEventListener('focus', function() {
+        this.style.transform = 'translateY(-2px)';
+        this.style.boxShadow = '0 12px 30px rgba(59, 130, 246, 0.15)';
+    });
+
+    matriculaInput.addEventListener('blur', function() {
+        this.style.transform = 'translateY(0)';
+        if (this.value.trim().length === 0) {
+            this.style.boxShadow = 'inset 0 2px 4px rgba(0, 0, 0, 0.02)';
+        }
+    });
+
+    // Validación en tiempo real
+    matriculaInput.addEventListener('input', function() {
+        let value = this.value.trim().replace(/[^\d]/g, '');
+
+        // Solo permitir números
+        if (value !== this.value) {
+            this.value = value;
+        }
+
+        // Efecto visual basado en longitud
+        if (value.length > 0) {
+            // Color de borde según validación
+            if (value.length >= 8 && value.length <= 12) {
+                this.style.borderColor = 'var(--secondary-blue)';
+                this.style.boxShadow = '0 0 0 3px rgba(59, 130, 246, 0.1)';
+            } else if (value.length > 0) {
+                this.style.borderColor = '#f59e0b';
+                this.style.boxShadow = '0 0 0 3px rgba(245, 158, 11, 0.1)';
+            }
+        } else {
+            this.style.borderColor = '#e5e7eb';
+            this.style.boxShadow = 'inset 0 2px 4px rgba(0, 0, 0, 0.02)';
+        }
+    });
+
+    // Formatear matrícula al perder foco
+    matriculaInput.addEventListener('blur', function() {
+        const value = this.value.trim().replace(/[^\d]/g, '');
+        if (value.length >= 2) {
+            // Formato: 2024-001-234
+            const formatted = value.replace(/(\d{4})(\d{3})(\d{3,})/, '$1-$2-$3');
+            if (formatted !== value && formatted.match(/\d{4}-\d{3}-\d{3,}/)) {
+                this.value = formatted;
+            }
+        }
+    });
+
+    // Manejo del envío del formulario
+    form.addEventListener('submit', function(e) {
+        if (!submitBtn.disabled) {
+            const matricula = matriculaInput.value.trim().replace(/[^\d]/g, '');
+
+            // Validación
+            if (matricula.length === 0) {
+                e.preventDefault();
+                showError('Por favor ingresa tu número de matrícula');
+                return;
+            }
+
+            if (matricula.length < 2) {
+                e.preventDefault();
+                showError('La matrícula debe tener al menos 8 dígitos');
+                return;
+            }
+
+            if (matricula.length > 12) {
+                e.preventDefault();
+                showError('La matrícula no puede exceder 12 dígitos');
+                return;
+            }
+
+            // Mostrar estado de carga
+            submitBtn.disabled = true;
+            const originalHTML = submitBtn.innerHTML;
+            submitBtn.innerHTML = `
+                <div class="spinner"></div>
+                <span>Verificando acceso...</span>
+            `;
+            submitBtn.style.background = 'linear-gradient(135deg, #4b5563, #6b7280)';
+
+            // Efecto de pulso en el logo durante la carga
+            logo.style.animation = 'float 1s ease-in-out infinite';
+        }
+    });
+
+    // Función para mostrar errores
+    function showError(message) {
+        // Remover error anterior si existe
+        const existingError = document.getElementById('validationError');
+        if (existingError) {
+            existingError.remove();
+        }
+
+        // Crear nuevo mensaje de error
+        const errorDiv = document.createElement('div');
+        errorDiv.id = 'validationError';
+        errorDiv.className = 'error-message';
+        errorDiv.innerHTML = `
+            <i class="bi bi-exclamation-triangle"></i>
+            <div>${message}</div>
+        `;
+
+        // Insertar antes del botón
+        submitBtn.parentNode.insertBefore(errorDiv, submitBtn);
+
+        // Efecto de shake en el input
+        matriculaInput.style.animation = 'shake 0.5s ease-in-out';
+        matriculaInput.style.borderColor = '#dc2626';
+        setTimeout(() => {
+            matriculaInput.style.animation = '';
+        }, 500);
+
+        matriculaInput.focus();
+    }
+
+    // Remover mensajes de error al escribir
+    matriculaInput.addEventListener('input', function() {
+        const validationError = document.getElementById('validationError');
+        const serverError = document.getElementById('errorMessage');
+
+        [validationError, serverError].forEach(error => {
+            if (error) {
+                error.style.opacity = '0';
+                error.style.transform = 'translateY(-10px)';
+                setTimeout(() => {
+                    if (error.parentNode) {
+                        error.parentNode.removeChild(error);
+                    }
+                }, 300);
+            }
+        });
+    });
+
+    // Auto-seleccionar matrícula al hacer clic
+    matriculaInput.addEventListener('click', function() {
+        if (this.value.length > 0) {
+            this.select();
+        }
+    });
+});
+
+// Estilos dinámicos - LIMPIADO EL PROBLEMA DEL NOMBRE DUPLICADO
+const style = document.createElement('style');
+style.textContent = `
+    .spinner {
+        width: 20px;
+        height: 20px;
+        border: 3px solid rgba(255, 255, 255, 0.3);
+        border-radius: 50%;
+        border-top-color: white;
+        animation: spin 1s linear infinite;
+    }
+
+    @keyframes spin {
+        to { transform: rotate(360deg); }
+    }
+
+    @keyframes shake {
+        0%, 100% { transform: translateX(0); }
+        10%, 30%, 50%, 70%, 90% { transform: translateX(-5px); }
+        20%, 40%, 60%, 80% { transform: translateX(5px); }
+    }
+
+    /* Logo alternativo si no carga - CORREGIDO */
+    .logo-corner.error {
+        display: none;
+    }
+
+    /* REMOVIDO el CSS que causaba el duplicado en móvil */
+
+    /* Mejoras de accesibilidad */
+    @media (prefers-reduced-motion: reduce) {
+        * {
+            animation-duration: 0.01ms !important;
+            animation-iteration-count: 1 !important;
+            transition-duration: 0.01ms !important;
+        }
+    }
+`;
+document.head.appendChild(style);
+
+// Manejo de error en logo
+window.addEventListener('load', function() {
+    const logoImg = document.querySelector('.logo-corner');
+    if (logoImg) {
+        logoImg.onerror = function() {
+            this.classList.add('error');
+            this.src = '';
+            // Si el logo falla, crear un placeholder simple
+            const placeholder = document.createElement('div');
+            placeholder.className = 'logo-placeholder';
+            placeholder.style.width = '120px';
+            placeholder.style.height = '120px';
+            placeholder.style.background = 'linear-gradient(135deg, var(--primary-blue), var(--secondary-blue))';
+            placeholder.style.borderRadius = '10px';
+            placeholder.style.display = 'flex';
+            placeholder.style.alignItems = 'center';
+            placeholder.style.justifyContent = 'center';
+            placeholder.style.color = 'white';
+            placeholder.style.fontWeight = 'bold';
+            placeholder.style.fontSize = '1.5rem';
+            placeholder.textContent = 'CSEIO';
+            this.parentNode.insertBefore(placeholder, this.nextSibling);
+        };
+    }
+});